@@ -0,0 +1,117 @@
+"""
+Compares the peak memory and run time of `generate_excel_file` in the default mode, which keeps the
+whole workbook in memory until it is saved, and in constant memory mode, which writes it row by row.
+Every run is a fresh process so the peak resident set size of one run does not hide the next.
+
+    python benchmarks/excel_benchmark.py --parts 100 1000 10000
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from instrumentation import get_peak_memory  # noqa: E402
+from program_directory import make_program_directory  # noqa: E402
+
+MODES: list[str] = ["default", "constant_memory"]
+UNIQUE_IMAGES: int = 64
+
+
+def run_child(part_count: int, mode: str, directory: str) -> None:
+    """It generates one quote and prints what it cost as JSON, this runs in its own process."""
+    # Where the process memory can not be measured, only the Python allocations traced from here on are.
+    if get_peak_memory()[1] == "traced":
+        import tracemalloc
+
+        tracemalloc.start()
+
+    sys.argv = [os.path.join(directory, "main.py")]
+    os.chdir(directory)
+    import main
+    from PIL import Image
+
+    from models import Nest, Part, Quote
+    from thumbnails import ThumbnailStore
+
+    thumbnails = ThumbnailStore()
+    images = []
+    for i in range(UNIQUE_IMAGES):
+        image_buffer = io.BytesIO()
+        Image.new("RGB", (100, 100), (i * 4, 128, 255 - i * 4)).save(image_buffer, "JPEG")
+        images.append(image_buffer.getvalue())
+    for i in range(part_count):
+        thumbnails.add(images[i % UNIQUE_IMAGES], "jpeg", str(i % UNIQUE_IMAGES))
+
+    quote = Quote()
+    for first in range(0, part_count, 50):
+        parts = range(first, min(first + 50, part_count))
+        quote.add_nest(
+            Nest(
+                quantity_multiplier=1,
+                scrap_percentage=12.5,
+                sheet_dim="120.000x60.000",
+                material_id="ST",
+                gauge_id="016",
+                parts=[
+                    Part(f"BRACKET-{i:05d}", 1 + i % 40, 1.5 + i % 20, 0.25 * (i % 80), 10.0 + i % 900, 5.5 + i % 400, 0.5 + i % 30, i)
+                    for i in parts
+                ],
+            ),
+            file_name=f"nest-{first // 50}.pdf",
+            material="Mild Steel",
+            gauge="16 Gauge",
+            cutting_with="CO2",
+        )
+    baseline, _ = get_peak_memory()
+    start = time.perf_counter()
+    main.generate_excel_file(
+        quote,
+        "quote",
+        file_name=f"{mode}-{part_count}",
+        thumbnails=thumbnails,
+        constant_memory=mode == "constant_memory",
+    )
+    seconds = time.perf_counter() - start
+    peak, kind = get_peak_memory()
+    size = os.path.getsize(os.path.join(directory, "quotes", f"{mode}-{part_count}.xlsm"))
+    print(json.dumps({"seconds": seconds, "peak": peak, "baseline": baseline, "kind": kind, "size": size}))
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--parts", type=int, nargs="+", default=[100, 1000, 10000], help="part counts to try")
+    arg_parser.add_argument("--child", nargs=3, metavar=("PARTS", "MODE", "DIRECTORY"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(int(args.child[0]), args.child[1], args.child[2])
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_program_directory(directory)
+        print(f"{'parts':>7} {'mode':<16} {'time':>9} {'peak':>10} {'workbook':>10} {'file':>9}")
+        for part_count in args.parts:
+            for mode in MODES:
+                output = subprocess.run(
+                    [sys.executable, os.path.realpath(__file__), "--child", str(part_count), mode, directory],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    f"{part_count:>7} {mode:<16} {result['seconds']:8.2f}s "
+                    f"{result['peak']:6.1f} MiB {result['peak'] - result['baseline']:6.1f} MiB "
+                    f"{result['size'] / 1024 / 1024:5.1f} MiB"
+                    + (" (traced)" if result["kind"] == "traced" else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures how long `import main` takes with `python -X importtime`, and checks that none of the heavy
+libraries are imported with it. They are only imported by the stage that needs them.
+
+    python benchmarks/import_benchmark.py --repeat 5 --max-ms 100
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from program_directory import make_program_directory
+
+# Imported by the stage that needs them, never by `import main`.
+HEAVY_MODULES: list[str] = [
+    "fitz",
+    "pymupdf",
+    "numpy",
+    "PIL",
+    "tkinter",
+    "xlsxwriter",
+    "rich",
+    "alive_progress",
+]
+
+
+def import_main(main_path: str) -> list[tuple[str, int, int]]:
+    """
+    It imports main in a new interpreter, the way it is imported as a script from the program directory
+
+    Args:
+      main_path (str): The fake main.py of a program directory, so config.py finds its settings.
+
+    Returns:
+      list[tuple[str, int, int]]: The name, self time and cumulative time in microseconds of every module
+    that was imported.
+    """
+    package_directory = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    code = f"import sys; sys.argv = [{main_path!r}]; sys.path.insert(0, {package_directory!r}); import main"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, cumulative_time, name = line[len("import time:") :].split("|")
+        if not self_time.strip().isdigit():
+            continue  # the header line
+        modules.append((name.strip(), int(self_time), int(cumulative_time)))
+    return modules
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=5, help="imports to run, the fastest is reported")
+    arg_parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    arg_parser.add_argument("--max-ms", type=float, default=None, help="fail if importing main takes longer")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        main_path = make_program_directory(directory)
+        runs = [import_main(main_path) for _ in range(args.repeat)]
+
+    def main_time(modules: list[tuple[str, int, int]]) -> int:
+        return next(cumulative_time for name, _, cumulative_time in modules if name == "main")
+
+    fastest = min(runs, key=main_time)
+    main_ms = main_time(fastest) / 1000
+    print(f"import main: {main_ms:.1f} ms (fastest of {args.repeat})")
+    print(f"{'self':>9} {'cumulative':>11}  module")
+    for name, self_time, cumulative_time in sorted(fastest, key=lambda module: module[1], reverse=True)[: args.top]:
+        print(f"{self_time / 1000:>7.1f}ms {cumulative_time / 1000:>9.1f}ms  {name}")
+
+    failed = False
+    heavy_imports = sorted(
+        {name for name, _, _ in fastest if name.split(".")[0] in HEAVY_MODULES}, key=lambda name: name.count(".")
+    )
+    if heavy_imports:
+        print(f"FAIL: importing main imports {', '.join(heavy_imports[:10])}")
+        failed = True
+    if args.max_ms is not None and main_ms > args.max_ms:
+        print(f"FAIL: importing main took {main_ms:.1f} ms, more than {args.max_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares the single-pass `NestReportParser` with the old way of running every field regex over the
+report text, which re-read output.txt for every field, and with the same report fed page by page to
+`NestReportParser.parse_pages`.
+
+    python benchmarks/parser_benchmark.py --parts 2000 --repeat 20
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from nest_parser import NestReportParser  # noqa: E402
+from synthetic_nest import make_nest_report_pages  # noqa: E402
+
+# The field regexes main.py used before the single-pass parser.
+LEGACY_REGEXES: list[str] = [
+    r"(PROGRAMME RUNS:  \/  SCRAP: \d{1,}|PROGRAM RUNS:  \/  SCRAP: \d{1,})",
+    r"(PROGRAMME RUNS:  \/  SCRAP: \d{1,}  \/  \d{1,}.\d{1,} %|PROGRAM RUNS:  \/  SCRAP: \d{1,}  \/  \d{1,}.\d{1,} %)",
+    r"BLANK: (\d{1,}\.\d{1,} x \d{1,}\.\d{1,}) x \d{1,}\.\d{1,}",
+    r"MATERIAL ID \(SHEET\): .{1,} ?-(\d{1,})",
+    r"MATERIAL ID \(SHEET\): .{1,} ?-(\d{1,})",
+    r"MATERIAL ID \(SHEET\): (?=.*(ST|SS|AL)-)",
+    r"(GEOFILE NAME: [a-zA-z]:\\[\w\W]{1,300}\.geo|GEOFILE NAME: [a-zA-Z]:\\[\w\W]{1,300}\.GEO)",
+    r"(  NUMBER: \d{1,})",
+    r"(MACHINING TIME: \d{1,}.\d{1,} min)",
+    r"(WEIGHT: \d{1,}.\d{1,} lb)",
+    r"(SURFACE: \d{1,}.\d{1,}  in2)",
+    r"(CUTTING LENGTH: \d{1,}.\d{1,}  in|CUTTING LENGTH: \d{1,}  in)",
+    r"(PIERCING TIME \d{1,}.\d{1,}  s)",
+    r"(PART NUMBER: \d{1,})",
+]
+
+
+def legacy_parse_from_file(path: str) -> list[list[str]]:
+    results = []
+    for regex in LEGACY_REGEXES:
+        with open(path, "r") as f:
+            text = f.read()
+        items = []
+        for match in re.finditer(regex, text, re.MULTILINE):
+            items.extend(iter(match.groups()))
+        results.append(items)
+    return results
+
+
+def legacy_parse(text: str) -> list[list[str]]:
+    results = []
+    for regex in LEGACY_REGEXES:
+        items = []
+        for match in re.finditer(regex, text, re.MULTILINE):
+            items.extend(iter(match.groups()))
+        results.append(items)
+    return results
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--parts", type=int, default=2000, help="part blocks in the synthetic report")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="runs of each parser")
+    args = arg_parser.parse_args()
+
+    pages_text = make_nest_report_pages(args.parts)
+    text = "".join(pages_text).replace(" \n", " ")
+    parser = NestReportParser()
+    nest = parser.parse(text)
+    assert len(nest.parts) == args.parts, f"parsed {len(nest.parts)} of {args.parts} parts"
+    page_by_page = parser.parse_pages(pages_text)
+    assert list(map(repr, page_by_page.parts)) == list(map(repr, nest.parts)), "parsing page by page found other parts"
+    shared_line = parser.parse_pages(make_nest_report_pages(args.parts, blank_on_material_line=True))
+    sheet = (shared_line.material_id, shared_line.gauge_id, shared_line.sheet_dim)
+    assert sheet == (nest.material_id, nest.gauge_id, nest.sheet_dim), "BLANK on the material ID line was not found"
+    print(f"{args.parts} parts, {len(text) / 1024:.0f} KiB of report text, best of {args.repeat} runs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "output.txt")
+        with open(path, "w") as f:
+            f.write(text)
+        timings = {
+            "legacy, output.txt per field": lambda: legacy_parse_from_file(path),
+            "legacy, in memory": lambda: legacy_parse(text),
+            "NestReportParser": lambda: parser.parse(text),
+            "NestReportParser, page by page": lambda: parser.parse_pages(pages_text),
+        }
+        results = {
+            name: min(timeit.repeat(function, number=1, repeat=args.repeat)) for name, function in timings.items()
+        }
+
+    single_pass = results["NestReportParser"]
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds * 1000:9.2f} ms  {seconds / single_pass:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Times a whole quote, from opening the nest report PDFs to saving the workbook, on synthetic TRUMPF
+style reports, and compares every stage against a saved baseline. Every run is a fresh process that
+makes the quote with `main.run_job` without the nest cache, so every PDF is parsed every time.
+
+    python benchmarks/pipeline_benchmark.py --pdfs 4 --parts 60 --save-baseline
+    python benchmarks/pipeline_benchmark.py --pdfs 4 --parts 60 --tolerance 0.2
+
+It exits with 1 when a stage got slower than the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from program_directory import make_program_directory  # noqa: E402
+from synthetic_nest import make_nest_pdf  # noqa: E402
+
+DEFAULT_BASELINE_PATH: str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "pipeline_baseline.json")
+# Stages shorter than this in the baseline are reported but never fail the run, they are mostly noise.
+NOISE_FLOOR_SECONDS: float = 0.01
+
+
+def run_child(directory: str, file_names: list[str]) -> None:
+    """It makes one quote and prints the profiler's report as JSON, this runs in its own process."""
+    sys.argv = [os.path.join(directory, "main.py")]
+    os.chdir(directory)
+    import main
+    from instrumentation import profiler
+
+    profiler.reset()
+    summary = main.run_job(main.QuoteJob("pipeline-benchmark", file_names, "Mild Steel", "quote"), use_cache=False)
+    report = profiler.get_report()
+    report["parts"] = summary["parts"]
+    print(json.dumps(report))
+
+
+def run_once(directory: str, file_names: list[str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.realpath(__file__), "--child", directory, *file_names],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def get_best_times(reports: list[dict]) -> dict[str, float]:
+    """
+    Returns:
+      dict[str, float]: The fastest time of the whole run and of every stage over the repeats, the
+    fastest is the one least disturbed by the rest of the machine.
+    """
+    best = {"total": min(report["wall_seconds"] for report in reports)}
+    for report in reports:
+        for name, stage in report["stages"].items():
+            best[name] = min(best.get(name, stage["seconds"]), stage["seconds"])
+    return best
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--pdfs", type=int, default=4, help="nest report PDFs in the quote")
+    arg_parser.add_argument("--parts", type=int, default=60, help="parts in every PDF")
+    arg_parser.add_argument("--parts-per-page", type=int, default=6, help="part blocks on every page")
+    arg_parser.add_argument("--image-size", type=int, default=200, help="width and height of the part drawings")
+    arg_parser.add_argument("--no-images", action="store_true", help="leave the part drawings out of the PDFs")
+    arg_parser.add_argument("--workers", type=int, default=1, help="the workers setting, 1 parses in one process")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs to make, the fastest is reported")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="the baseline to compare against")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="save this run as the baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="how much slower a stage may be, 0.2 is 20%%")
+    arg_parser.add_argument("--child", nargs="+", metavar="PATH", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1:])
+        return
+
+    parameters = {
+        "pdfs": args.pdfs,
+        "parts": args.parts,
+        "parts_per_page": args.parts_per_page,
+        "image_size": args.image_size,
+        "images": not args.no_images,
+        "workers": args.workers,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        make_program_directory(directory, workers=args.workers)
+        file_names = []
+        for i in range(args.pdfs):
+            file_name = os.path.join(directory, f"nest-{i}.pdf")
+            make_nest_pdf(
+                file_name,
+                args.parts,
+                parts_per_page=args.parts_per_page,
+                seed=i,
+                first_part=1 + i * args.parts,
+                images=not args.no_images,
+                image_size=args.image_size,
+            )
+            file_names.append(file_name)
+        reports = [run_once(directory, file_names) for _ in range(args.repeat)]
+
+    best = get_best_times(reports)
+    counters = reports[0]["counters"]
+    print(
+        f"{args.pdfs} PDFs, {counters.get('pages', 0)} pages, {reports[0]['parts']} parts, "
+        f"{counters.get('images', 0)} images, fastest of {args.repeat}"
+    )
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"parameters": parameters, "seconds": best}, f, indent=4)
+        print(f"Saved the baseline to {args.baseline}")
+
+    baseline = {}
+    if not args.save_baseline and os.path.isfile(args.baseline):
+        with open(args.baseline, "r") as f:
+            saved = json.load(f)
+        if saved["parameters"] != parameters:
+            print(f"WARNING: the baseline was made with {saved['parameters']}, the times are not comparable")
+        baseline = saved["seconds"]
+
+    regressions = []
+    print(f"{'stage':<16} {'time':>10} {'baseline':>10} {'change':>8}")
+    for name, seconds in sorted(best.items(), key=lambda item: item[1], reverse=True):
+        line = f"{name:<16} {seconds * 1000:8.1f}ms"
+        if name in baseline:
+            change = seconds / baseline[name] - 1 if baseline[name] else 0.0
+            line += f" {baseline[name] * 1000:8.1f}ms {change:+7.1%}"
+            if baseline[name] >= NOISE_FLOOR_SECONDS and change > args.tolerance:
+                regressions.append(name)
+                line += "  SLOWER"
+        print(line)
+
+    if regressions:
+        print(f"FAIL: {', '.join(regressions)} got more than {args.tolerance:.0%} slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+
+REPOSITORY_DIRECTORY: str = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+SHEET_NAMES: list[str] = ["304 SS", "409 SS", "Mild Steel", "Galvanneal", "Galvanized", "Aluminium", "Laser Grade Plate"]
+GAUGES: list[str] = ["20 Gauge", "18 Gauge", "16 Gauge", "14 Gauge", "12 Gauge", "10 Gauge"]
+
+
+def make_program_directory(directory: str, workers: int = 0) -> str:
+    """
+    It sets up a throwaway copy of the program directory, with its own global_variables.cfg and
+    price files, so main.py can be imported and run without the shop's network drive
+
+    Args:
+      directory (str): An empty directory to set it up in.
+      workers (int, optional): The workers setting, 0 is one per core and 1 parses in the main process.
+    Defaults to 0.
+
+    Returns:
+      str: The path main.py should think it was started from, assign it to sys.argv[0] before
+    importing main.
+    """
+    for file_name in ["macro.bin", "logo.png", "material_id.json"]:
+        shutil.copy(os.path.join(REPOSITORY_DIRECTORY, file_name), directory)
+    for folder in ["quotes", "worksheet", "excel files"]:
+        os.makedirs(os.path.join(directory, folder), exist_ok=True)
+
+    sheet_prices_path = os.path.join(directory, "sheet_prices.json")
+    with open(sheet_prices_path, "w") as f:
+        json.dump({"Price Per Pound": {name: {"price": 1.5 + i / 10} for i, name in enumerate(SHEET_NAMES)}}, f)
+    price_of_steel_path = os.path.join(directory, "price_of_steel.json")
+    with open(price_of_steel_path, "w") as f:
+        json.dump(
+            {
+                "pounds_per_square_foot": {
+                    name: {gauge: round(1 + j / 2 + i / 10, 2) for j, gauge in enumerate(GAUGES)}
+                    for i, name in enumerate(SHEET_NAMES)
+                }
+            },
+            f,
+        )
+
+    with open(os.path.join(directory, "global_variables.cfg"), "w") as f:
+        f.write(
+            "[GLOBAL VARIABLES]\n"
+            "nitrogen_cost_per_hour=250\n"
+            "co2_cost_per_hour=150\n"
+            f"materials={','.join(SHEET_NAMES)}\n"
+            f"gauges={','.join(GAUGES)}\n"
+            f"path_to_sheet_prices={sheet_prices_path}\n"
+            f"price_of_steel_information={price_of_steel_path}\n"
+            "size_of_picture=100\n"
+            "overhead=0.18\n"
+            "profit_margin=0.3\n"
+            f"path_to_save_quotes={os.path.join(directory, 'quotes')}\n"
+            f"path_to_save_workorders={os.path.join(directory, 'worksheet')}\n"
+            f"workers={workers}\n"
+        )
+    return os.path.join(directory, "main.py")
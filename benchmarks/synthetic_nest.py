@@ -0,0 +1,156 @@
+import random
+
+MATERIAL_IDS: list[str] = ["ST-025", "SS-018", "AL-012", "ST-050"]
+
+
+def make_part_block(part_number: int, rng: random.Random) -> str:
+    """
+    It makes the text of one part block the way a TRUMPF nest report prints it
+
+    Args:
+      part_number (int): The part number printed on the report, starting at 1.
+      rng (random.Random): Where the measurements come from.
+
+    Returns:
+      The text of the part block.
+    """
+    return (
+        f"PART NUMBER: {part_number}\n"
+        f"GEOFILE NAME: C:\\TRUMPF\\Parts\\Synthetic Job\\BRACKET-{part_number:04d}.GEO\n"
+        f"  NUMBER: {rng.randint(1, 40)}\n"
+        f"MACHINING TIME: {rng.uniform(0.1, 20):.2f} min\n"
+        f"WEIGHT: {rng.uniform(0.1, 80):.3f} lb\n"
+        f"SURFACE: {rng.uniform(1, 900):.2f}  in2\n"
+        f"CUTTING LENGTH: {rng.uniform(1, 400):.2f}  in\n"
+        f"PIERCING TIME {rng.uniform(0.1, 30):.2f}  s\n"
+        "DIMENSIONS: \n"
+        f"{rng.uniform(1, 60):.3f} x {rng.uniform(1, 60):.3f} in\n"
+        "CUSTOMER: \n"
+        "ORDER NUMBER: \n"
+        "DRAWING NUMBER: \n"
+        "COMMENT: \n"
+        "ROTATION: 0.00 deg  /  MIRRORED: NO\n"
+        "PRODUCTION PLAN: LASER CUT  /  STANDARD\n"
+        "---------------------------------------------------------------\n"
+    )
+
+
+def make_nest_report_pages(
+    part_count: int,
+    parts_per_page: int = 6,
+    seed: int = 0,
+    first_part: int = 1,
+    blank_on_material_line: bool = False,
+) -> list[str]:
+    """
+    It makes the text of every page of a multi-page nest report, like `fitz` would return it
+
+    Args:
+      part_count (int): How many part blocks the report has.
+      parts_per_page (int, optional): How many part blocks are printed on each page. Defaults to 6.
+      seed (int, optional): Seed for the measurements so runs can be compared. Defaults to 0.
+      first_part (int, optional): The part number of the first part block, reports that start at
+    different numbers have different parts. Defaults to 1.
+      blank_on_material_line (bool, optional): End the material ID line with " \n", like some reports
+    do, so BLANK ends up on the same line once " \n" is replaced with " ". Defaults to False.
+
+    Returns:
+      The text of every page, the first one is the sheet information.
+    """
+    rng = random.Random(seed)
+    pages: list[str] = [
+        "PRODUCTION PACKAGE\n"
+        "PROGRAM NAME: SYNTHETIC \n"
+        f"PROGRAM RUNS:  /  SCRAP: {rng.randint(1, 9)}  /  {rng.uniform(5, 40):.2f} %\n"
+        f"MATERIAL ID (SHEET): {rng.choice(MATERIAL_IDS)}{' ' if blank_on_material_line else ''}\n"
+        "BLANK: 120.000 x 60.000 x 0.250 in\n"
+        f"MACHINING TIME PROGRAM: {rng.uniform(10, 90):.2f} min\n"
+    ]
+    page = ""
+    for i, part_number in enumerate(range(first_part, first_part + part_count), start=1):
+        page += make_part_block(part_number, rng)
+        if i % parts_per_page == 0:
+            pages.append(f"{page}PAGE {len(pages) + 1}\n")
+            page = ""
+    if page:
+        pages.append(f"{page}PAGE {len(pages) + 1}\n")
+    return pages
+
+
+def make_nest_report_text(
+    part_count: int, parts_per_page: int = 6, seed: int = 0, blank_on_material_line: bool = False
+) -> str:
+    """
+    It makes the text of a multi-page nest report, like `fitz` would return it page after page
+
+    Args:
+      part_count (int): How many part blocks the report has.
+      parts_per_page (int, optional): How many part blocks are printed on each page. Defaults to 6.
+      seed (int, optional): Seed for the measurements so runs can be compared. Defaults to 0.
+      blank_on_material_line (bool, optional): See `make_nest_report_pages`. Defaults to False.
+
+    Returns:
+      The raw text of every page, concatenated.
+    """
+    pages = make_nest_report_pages(part_count, parts_per_page, seed, blank_on_material_line=blank_on_material_line)
+    return "".join(pages)
+
+
+def make_part_image(part_number: int, size: int) -> bytes:
+    """
+    Returns:
+      bytes: A JPEG drawing of a part, each part number gets its own.
+    """
+    import io
+
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(image)
+    inset = size // 8 + part_number % (size // 4)
+    draw.rectangle((inset, size // 8, size - size // 8, size - inset), outline="black", width=max(1, size // 50))
+    draw.ellipse((size // 3, size // 3, size // 3 + inset, size // 3 + inset), fill=(part_number * 37 % 256, 80, 160))
+    image_buffer = io.BytesIO()
+    image.save(image_buffer, "JPEG")
+    return image_buffer.getvalue()
+
+
+def make_nest_pdf(
+    path: str,
+    part_count: int,
+    parts_per_page: int = 6,
+    seed: int = 0,
+    first_part: int = 1,
+    images: bool = True,
+    image_size: int = 200,
+) -> None:
+    """
+    It writes a nest report PDF with the text of `make_nest_report_pages` and, like the real reports, a
+    drawing of every part on the page of its part block, plus the 48x48 icon the parser skips
+
+    Args:
+      path (str): Where to write the PDF.
+      part_count (int): How many part blocks the report has.
+      parts_per_page (int, optional): How many part blocks are printed on each page. Defaults to 6.
+      seed (int, optional): Seed for the measurements so runs can be compared. Defaults to 0.
+      first_part (int, optional): See `make_nest_report_pages`. Defaults to 1.
+      images (bool, optional): Embed the part drawings. Defaults to True.
+      image_size (int, optional): The width and height of the drawings in pixels. Defaults to 200.
+    """
+    import fitz  # PyMuPDF
+
+    icon = make_part_image(0, 48)
+    line_height = 7
+    with fitz.open() as pdf_file:
+        for page_index, page_text in enumerate(make_nest_report_pages(part_count, parts_per_page, seed, first_part)):
+            lines = page_text.count("\n") + 2
+            page = pdf_file.new_page(width=612, height=max(792, lines * line_height + 40))
+            page.insert_text((20, 20), page_text, fontsize=6, lineheight=line_height / 6)
+            if not images:
+                continue
+            page.insert_image(fitz.Rect(560, 10, 584, 34), stream=icon)
+            part_numbers = [int(line.split(": ")[1]) for line in page_text.splitlines() if line.startswith("PART NUMBER:")]
+            for j, part_number in enumerate(part_numbers):
+                top = 20 + j * 90
+                page.insert_image(fitz.Rect(420, top, 500, top + 80), stream=make_part_image(part_number, image_size))
+        pdf_file.save(path)
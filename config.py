@@ -0,0 +1,147 @@
+import configparser
+import functools
+import json
+import os
+import sys
+import threading
+
+program_directory = os.path.dirname(os.path.realpath(sys.argv[0]))
+
+
+class Config:
+    """The settings of global_variables.cfg.
+
+    The price files it points to are only read the first time they are needed, so a run that never
+    prices anything never touches the network drive they live on. They are read and forgotten together,
+    under a lock, so threads pricing while they are refreshed never see one without the other.
+    """
+
+    __slots__ = (
+        "nitrogen_cost_per_hour",
+        "co2_cost_per_hour",
+        "materials",
+        "gauges",
+        "path_to_sheet_prices",
+        "size_of_picture",
+        "workers",
+        "cache_size_mb",
+        "constant_memory_part_count",
+        "autosave_seconds",
+        "upload_host",
+        "upload_port",
+        "upload_protocol",
+        "upload_retries",
+        "upload_compress",
+        "upload_flush_seconds",
+        "profit_margin",
+        "overhead",
+        "path_to_save_quotes",
+        "path_to_save_workorders",
+        "price_of_steel_information_path",
+        "_sheet_prices",
+        "_price_of_steel_information",
+        "_price_file_times",
+        "_prices_lock",
+    )
+
+    def __init__(self, path: str) -> None:
+        global_variables = configparser.ConfigParser()
+        global_variables.read(path)
+        settings = global_variables["GLOBAL VARIABLES"]
+
+        self.nitrogen_cost_per_hour: float = float(settings["nitrogen_cost_per_hour"])
+        self.co2_cost_per_hour: float = float(settings["co2_cost_per_hour"])
+        # SS      304 SS,409 SS   Nitrogen
+        # ST      Mild Steel      CO2
+        # AL      Aluminium       Nitrogen
+        self.materials: list[str] = settings["materials"].split(",")
+        self.gauges: list[str] = settings["gauges"].split(",")
+        self.path_to_sheet_prices: str = settings["path_to_sheet_prices"]
+        self.size_of_picture: int = int(settings["size_of_picture"])
+        self.workers: int = int(settings.get("workers", "0"))
+        self.cache_size_mb: int = int(settings.get("cache_size_mb", "512"))
+        self.constant_memory_part_count: int = int(settings.get("constant_memory_part_count", "1000"))
+        # How long the review window waits after the last edit before saving the quote, 0 to only save
+        # when a button is pressed.
+        self.autosave_seconds: float = float(settings.get("autosave_seconds", "5"))
+        # The inventory server work orders are sent to. "framed" keeps one connection open and frames
+        # every batch with its length, "legacy" is for servers that still expect the FINSIHED! marker.
+        self.upload_host: str = settings.get("upload_host", "10.0.0.93")
+        self.upload_port: int = int(settings.get("upload_port", "80"))
+        self.upload_protocol: str = settings.get("upload_protocol", "legacy")
+        self.upload_retries: int = int(settings.get("upload_retries", "3"))
+        self.upload_compress: bool = settings.getboolean("upload_compress", False)
+        # Uploads are retried in the background, this is how long to wait for them before exiting. What
+        # is not sent by then stays in the outbox and is sent the next time.
+        self.upload_flush_seconds: float = float(settings.get("upload_flush_seconds", "30"))
+        self.profit_margin: float = float(settings["profit_margin"])
+        self.overhead: float = float(settings["overhead"])
+        self.path_to_save_quotes: str = settings["path_to_save_quotes"]
+        self.path_to_save_workorders: str = settings["path_to_save_workorders"]
+        self.price_of_steel_information_path: str = settings["price_of_steel_information"]
+        self._sheet_prices: dict | None = None
+        self._price_of_steel_information: dict | None = None
+        self._price_file_times: tuple[float, float] | None = None
+        self._prices_lock = threading.Lock()
+
+    def get_prices(self) -> tuple[dict, dict]:
+        """
+        Returns:
+          tuple[dict, dict]: The sheet prices and the price of steel information, from the same read of
+        the price files. Something that prices a whole quote should ask for them once.
+        """
+        with self._prices_lock:
+            if (sheet_prices := self._sheet_prices) is None:
+                with open(self.path_to_sheet_prices, "r") as f:
+                    sheet_prices = self._sheet_prices = json.load(f)
+            if (price_of_steel_information := self._price_of_steel_information) is None:
+                with open(self.price_of_steel_information_path, "r") as f:
+                    price_of_steel_information = self._price_of_steel_information = json.load(f)
+        return sheet_prices, price_of_steel_information
+
+    @property
+    def sheet_prices(self) -> dict:
+        """The "Price Per Pound" of every sheet material, read from `path_to_sheet_prices`."""
+        return self.get_prices()[0]
+
+    @property
+    def price_of_steel_information(self) -> dict:
+        """The "pounds_per_square_foot" of every sheet material and gauge."""
+        return self.get_prices()[1]
+
+    def _get_price_file_times(self) -> tuple[float, float]:
+        return (
+            os.path.getmtime(self.path_to_sheet_prices),
+            os.path.getmtime(self.price_of_steel_information_path),
+        )
+
+    def refresh_prices(self) -> bool:
+        """
+        It forgets the price files if they changed since they were read, for a program that keeps
+        running while the prices are updated, such as the quote daemon
+
+        Returns:
+          bool: True if they changed, they are read again the next time they are needed.
+        """
+        try:
+            price_file_times = self._get_price_file_times()
+        except OSError:
+            return False  # the network drive is gone, keep pricing with what was read
+        with self._prices_lock:
+            if price_file_times == self._price_file_times:
+                return False
+            changed = self._price_file_times is not None
+            self._price_file_times = price_file_times
+            if changed:
+                self._sheet_prices = None
+                self._price_of_steel_information = None
+        return changed
+
+
+@functools.cache
+def get_config() -> Config:
+    """
+    Returns:
+      Config: global_variables.cfg of the program directory, read the first time it is asked for.
+    """
+    return Config(f"{program_directory}/global_variables.cfg")
@@ -1,16 +1,33 @@
 import contextlib
+import io
+import itertools
+import math
 import re
 from datetime import datetime
 
 import xlsxwriter
-from openpyxl.utils.cell import column_index_from_string, get_column_letter
+from xlsxwriter.format import Format
+from xlsxwriter.utility import xl_cell_to_rowcol
+
+
+def get_cached_value(value):
+    """The value XlsxWriter should store for a formula, #N/A when it could not be calculated"""
+    if isinstance(value, float) and math.isnan(value):
+        return "#N/A"
+    return value
 
 
 class ExcelFile:
     """Create excel files easier with openpyxl"""
 
-    def __init__(self, file_name: str, program_directory: str) -> None:
-        self.workbook = xlsxwriter.Workbook(file_name)
+    def __init__(self, file_name: str, program_directory: str, constant_memory: bool = False) -> None:
+        """
+        Args:
+            file_name (str): Where to save the workbook
+            program_directory (str): The directory of the program
+            constant_memory (bool, optional): Flush every row to disk as soon as the next one is started, rows then have to be written in order. Defaults to False.
+        """
+        self.workbook = xlsxwriter.Workbook(file_name, {"constant_memory": constant_memory})
         self.workbook.set_properties(
             {
                 "title": "Laser Quote",
@@ -32,9 +49,31 @@ class ExcelFile:
         footer = "&RPage &P of &N"
         self.worksheet.set_footer(footer)
 
+        self.info_worksheet.set_column("J:J", 12)
+        self.info_worksheet.set_column("L:L", 12)
+
         self.cell_regex = r"^([A-Z]+)([1-9]\d*)$"
         self.file_name = file_name
         self.program_directory = program_directory
+        self.constant_memory = constant_memory
+        self.formats: dict[tuple, Format] = {}
+
+    def get_format(self, properties: dict) -> Format:
+        """Get the shared format for a set of properties, creating it the first time it is asked for
+
+        Args:
+            properties (dict): Any format properties XlsxWriter understands, such as {"bold": True}
+
+        Returns:
+            Format: The same Format object for the same properties, so a sheet with a thousand rows still has a handful of formats
+        """
+        key = tuple(sorted(properties.items()))
+        try:
+            return self.formats[key]
+        except KeyError:
+            cell_format = self.workbook.add_format(properties)
+            self.formats[key] = cell_format
+            return cell_format
 
     def parse_cell(self, cell: str):
         """Parses excel cell input such as "AD300"
@@ -50,37 +89,20 @@ class ExcelFile:
         if matches := re.search(self.cell_regex, cell):
             return (matches[1], int(matches[2]))
 
-    def add_list_to_sheet(self, cell: str, items: list, horizontal: bool = True) -> None:
+    def add_list_to_sheet(self, cell: str, items: list, horizontal: bool = True, values: list = None) -> None:
         """Adds a list of items to the specfied sheet
         Args:
             sheet_name (str): Name of the sheet you want to add a list to.
             cell (str): specfied cell location, such as "A1"
             items (list): any list of items you want to add to the excel sheet
             horizontal (bool, optional): Allows for inputing lists vertical(False) or horizontal(True). Defaults to True.
+            values (list, optional): The calculated value of each formula in a horizontal list, see `write_row`. Defaults to None.
         """
-        col, row = self.parse_cell(cell=cell)
+        row, col = xl_cell_to_rowcol(cell.upper())
         if horizontal:
-            col_index = column_index_from_string(col)
-            for item in items:
-                col_str = get_column_letter(col_index)
-                try:
-                    if item.is_integer():
-                        self.add_item_to_sheet(f"{col_str}{row}", item)
-                    elif not item.is_integer():
-                        self.add_item_to_sheet(f"{col_str}{row}", item)
-                except AttributeError:
-                    self.add_item_to_sheet(f"{col_str}{row}", item)
-                col_index += 1
+            self.write_row_to_sheet(row, col, items, values)
         else:
-            for item in items:
-                try:
-                    if item.is_integer():
-                        self.add_item_to_sheet(f"{col}{row}", item)
-                    elif not item.is_integer():
-                        self.add_item_to_sheet(f"{col}{row}", item)
-                except AttributeError:
-                    self.add_item_to_sheet(f"{col}{row}", item)
-                row += 1
+            self.write_column_to_sheet(row, col, items)
 
     def add_item_to_sheet(self, cell: str, item, number_format=None) -> None:
         """Add any item to any cell in the specified sheet
@@ -88,21 +110,59 @@ class ExcelFile:
             cell (str): Such as "A1"
             item (any): Any (item, str, int, float)
         """
-        col, row = self.parse_cell(cell=cell)
+        row, col = xl_cell_to_rowcol(cell.upper())
+        self.write_item_to_sheet(row, col, item)
 
-        cell_format = self.workbook.add_format()
-        self.info_worksheet.set_column("J:J", 12)
-        self.info_worksheet.set_column("L:L", 12)
+    def write_item_to_sheet(self, row: int, col: int, item, value=None) -> None:
+        """Add any item to any cell in the info sheet, by row and column index
+
+        Args:
+            row (int): Zero indexed row, such as 0 for "A1"
+            col (int): Zero indexed column, such as 0 for "A1"
+            item (any): Any (item, str, int, float)
+            value (any, optional): The calculated value of a formula, see `write_item`. Defaults to None.
+        """
+        cell_format = self.get_format({})
         with contextlib.suppress(Exception):
             if "NOW" in item:
-                cell_format = self.workbook.add_format({"num_format": "hh:mm:ss AM/PM"})
+                cell_format = self.get_format({"num_format": "hh:mm:ss AM/PM"})
         try:
             if item.is_integer():
-                self.info_worksheet.write(f"{col}{row}", int(item), cell_format)
+                self.info_worksheet.write(row, col, int(item), cell_format)
             elif not item.is_integer():
-                self.info_worksheet.write(f"{col}{row}", float(item), cell_format)
+                self.info_worksheet.write(row, col, float(item), cell_format)
         except AttributeError:
-            self.info_worksheet.write(f"{col}{row}", item, cell_format)
+            if value is None:
+                self.info_worksheet.write(row, col, item, cell_format)
+            else:
+                self.info_worksheet.write_formula(row, col, item, cell_format, get_cached_value(value))
+
+    def write_row_to_sheet(self, row: int, col: int, items: list, values: list = None) -> None:
+        """Add a whole row of items to the info sheet in one call, by row and column index
+
+        Args:
+            row (int): Zero indexed row of the first item
+            col (int): Zero indexed column of the first item
+            items (list): any list of items, None leaves that cell empty
+            values (list, optional): The calculated value of each formula, see `write_row`, it can be shorter than items. Defaults to None.
+        """
+        # zip would stop at the end of the shorter list and drop the rest of the row.
+        for item, value in itertools.zip_longest(items, values or []):
+            if item is not None:
+                self.write_item_to_sheet(row, col, item, value)
+            col += 1
+
+    def write_column_to_sheet(self, row: int, col: int, items: list) -> None:
+        """Add a whole column of items to the info sheet in one call, by row and column index
+
+        Args:
+            row (int): Zero indexed row of the first item
+            col (int): Zero indexed column of the first item
+            items (list): any list of items
+        """
+        for item in items:
+            self.write_item_to_sheet(row, col, item)
+            row += 1
 
     def set_row_hidden_sheet(self, cell: str, hidden: bool = True) -> None:
         """Hide row
@@ -123,66 +183,113 @@ class ExcelFile:
             items (list): any list of items you want to add to the excel sheet
             horizontal (bool, optional): Allows for inputing lists vertical(False) or horizontal(True). Defaults to True.
         """
-        col, row = self.parse_cell(cell=cell)
+        row, col = xl_cell_to_rowcol(cell.upper())
         if horizontal:
-            col_index = column_index_from_string(col)
-            for item in items:
-                col_str = get_column_letter(col_index)
-                self.add_item(f"{col_str}{row}", item)
-                col_index += 1
+            self.write_row(row, col, items)
         else:
-            for item in items:
-                self.add_item(f"{col}{row}", item)
-                row += 1
+            self.write_column(row, col, items)
 
-    def add_item(self, cell: str, item, number_format=None, totals: bool = False) -> None:
+    def add_item(self, cell: str, item, number_format=None, totals: bool = False, value=None) -> None:
         """Add any item to any cell in the excel work book
 
         Args:
             cell (str): Such as "A1"
             item (any): Any (item, str, int, float)
+            value (any, optional): The calculated value of a formula, see `write_item`. Defaults to None.
         """
-        col, row = self.parse_cell(cell=cell)
+        row, col = xl_cell_to_rowcol(cell.upper())
+        self.write_item(row, col, item, number_format, totals, value)
 
-        if number_format is None:
-            cell_format = self.workbook.add_format({"font_name": self.FONT_NAME})
-        else:
-            cell_format = self.workbook.add_format(
-                {"num_format": number_format, "font_name": self.FONT_NAME}
-            )
+    def get_cell_format(self, row: int, col: int, item, number_format=None, totals: bool = False) -> Format:
+        """Get the format of a cell on the main sheet, it depends on where the cell is and what is in it
+
+        Args:
+            row (int): Zero indexed row, such as 0 for "A1"
+            col (int): Zero indexed column, such as 0 for "A1"
+            item (any): Any (item, str, int, float)
+        """
+        text = str(item)
+        properties = {"font_name": self.FONT_NAME}
+        if number_format is not None:
+            properties["num_format"] = number_format
         if (
-            "Payment" not in str(item)
-            and "Received" not in str(item)
-            and "__" not in str(item)
+            "Payment" not in text
+            and "Received" not in text
+            and "__" not in text
         ):
-            cell_format.set_align("center")
-            cell_format.set_align("vcenter")
-            cell_format.set_text_wrap()
+            properties["align"] = "center"
+            properties["valign"] = "vcenter"
+            properties["text_wrap"] = True
         if (
-            "Total" in str(item)
-            or "Packing Slip" in str(item)
-            or "Order #" in str(item)
-            or "Ship To:" in str(item)
-            or "Date Shipped:" in str(item)
-            or "No Tax Included" in str(item)
-            or "=SUM(Table1[Price])" in str(item)
-            or "TEXTAFTER" in str(item)
+            "Total" in text
+            or "Packing Slip" in text
+            or "Order #" in text
+            or "Ship To:" in text
+            or "Date Shipped:" in text
+            or "No Tax Included" in text
+            or "TEXTAFTER" in text
+            or (totals and col == 10)  # The total price
         ):
-            cell_format.set_bold()
-        if col == "K" and row > 2 and "Tax" not in str(item):
-            cell_format.set_right(1)
+            properties["bold"] = True
+        if col == 10 and row > 1 and "Tax" not in text:  # Column K, from row 3 down
+            properties["right"] = 1
         if totals:
-            cell_format.set_top(6)
-            cell_format.set_bottom(1)
-            if col == "A":
-                cell_format.set_left(1)
+            properties["top"] = 6
+            properties["bottom"] = 1
+            if col == 0:
+                properties["left"] = 1
+        return self.get_format(properties)
+
+    def write_item(self, row: int, col: int, item, number_format=None, totals: bool = False, value=None) -> None:
+        """Add any item to any cell in the excel work book, by row and column index
+
+        Args:
+            row (int): Zero indexed row, such as 0 for "A1"
+            col (int): Zero indexed column, such as 0 for "A1"
+            item (any): Any (item, str, int, float)
+            value (any, optional): The calculated value of a formula, stored with it so the workbook opens already calculated, NaN is stored as #N/A. Defaults to None.
+        """
+        cell_format = self.get_cell_format(row, col, item, number_format, totals)
         try:
             if item.is_integer():
-                self.worksheet.write(f"{col}{row}", int(item), cell_format)
+                self.worksheet.write(row, col, int(item), cell_format)
             elif not item.is_integer():
-                self.worksheet.write(f"{col}{row}", float(item), cell_format)
+                self.worksheet.write(row, col, float(item), cell_format)
         except (TypeError, AttributeError):
-            self.worksheet.write(f"{col}{row}", item, cell_format)
+            if value is None:
+                self.worksheet.write(row, col, item, cell_format)
+            else:
+                self.worksheet.write_formula(row, col, item, cell_format, get_cached_value(value))
+
+    def write_row(
+        self, row: int, col: int, items: list, number_formats: list = None, totals: bool = False, values: list = None
+    ) -> None:
+        """Add a whole row of items in one call, by row and column index
+
+        Args:
+            row (int): Zero indexed row of the first item
+            col (int): Zero indexed column of the first item
+            items (list): any list of items, None leaves that cell empty
+            number_formats (list, optional): A number format for each item, None for no number format, it can be shorter than items. Defaults to None.
+            values (list, optional): The calculated value of each formula, None for items that are not formulas, it can be shorter than items. Defaults to None.
+        """
+        # zip would stop at the end of the shorter list and drop the rest of the row.
+        for item, number_format, value in itertools.zip_longest(items, number_formats or [], values or []):
+            if item is not None:
+                self.write_item(row, col, item, number_format, totals, value)
+            col += 1
+
+    def write_column(self, row: int, col: int, items: list, number_format=None, totals: bool = False) -> None:
+        """Add a whole column of items in one call, by row and column index
+
+        Args:
+            row (int): Zero indexed row of the first item
+            col (int): Zero indexed column of the first item
+            items (list): any list of items
+        """
+        for item in items:
+            self.write_item(row, col, item, number_format, totals)
+            row += 1
 
     def set_cell_width(self, cell: str, width: int) -> None:
         # sourcery skip: remove-unnecessary-cast
@@ -204,21 +311,41 @@ class ExcelFile:
         """
         _, row = self.parse_cell(cell=cell)
 
-        self.worksheet.set_row(row - 1, height)
+        self.set_row_height(row - 1, height)
 
-    def add_image(self, cell: str, path_to_image: str) -> None:
+    def set_row_height(self, row: int, height: int) -> None:
+        """Change the height of a row, by row index
+
+        Args:
+            row (int): Zero indexed row, such as 0 for "A1"
+            height (int): The height you want that row to be
+        """
+        self.worksheet.set_row(row, height)
+
+    def add_image(self, cell: str, path_to_image: str, image_data: io.BytesIO = None) -> None:
         """Add an image to any cell
 
         Args:
             cell (str): Such as "A1"
-            path_to_image (str): The direct path to the image
+            path_to_image (str): The direct path to the image, only used as the image name when image_data is given
+            image_data (io.BytesIO, optional): The encoded image, so it does not have to be read from disk. Defaults to None.
         """
-        col, row = self.parse_cell(cell=cell)
-        self.worksheet.insert_image(
-            f"{col}{row}",
-            path_to_image,
-            {"x_offset": 2, "y_offset": 2, "x_scale": 1, "y_scale": 1},
-        )
+        row, col = xl_cell_to_rowcol(cell.upper())
+        self.insert_image(row, col, path_to_image, image_data)
+
+    def insert_image(self, row: int, col: int, path_to_image: str, image_data: io.BytesIO = None) -> None:
+        """Add an image to any cell, by row and column index
+
+        Args:
+            row (int): Zero indexed row, such as 0 for "A1"
+            col (int): Zero indexed column, such as 0 for "A1"
+            path_to_image (str): The direct path to the image, only used as the image name when image_data is given
+            image_data (io.BytesIO, optional): The encoded image, so it does not have to be read from disk. Defaults to None.
+        """
+        options = {"x_offset": 2, "y_offset": 2, "x_scale": 1, "y_scale": 1}
+        if image_data is not None:
+            options["image_data"] = image_data
+        self.worksheet.insert_image(row, col, path_to_image, options)
 
     def add_dropdown_selection(self, cell: str, type: str, location: str) -> None:
         """Add a data validation drop down selection for any cell
@@ -233,6 +360,22 @@ class ExcelFile:
             f"${col}${row}", {"validate": type, "source": location}
         )
 
+    def add_dropdown_selection_to_rows(
+        self, first_row: int, last_row: int, col: int, type: str, location: str
+    ) -> None:
+        """Add a data validation drop down selection to a column of cells in one call
+
+        Args:
+            first_row (int): Zero indexed first row
+            last_row (int): Zero indexed last row
+            col (int): Zero indexed column
+            type (str): 'list'
+            formula (str): the location of where the list is located such as: "A1:C1"
+        """
+        self.worksheet.data_validation(
+            first_row, col, last_row, col, {"validate": type, "source": location}
+        )
+
     def add_table(
         self, display_name: str, theme: str, location: str, headers: list
     ) -> None:
@@ -253,6 +396,27 @@ class ExcelFile:
             },
         )
 
+    def add_headers(self, cell: str, headers: list) -> None:
+        """Add a row of column headers with a filter, for when there can not be a table, such as in constant memory mode
+
+        Args:
+            cell (str): The cell of the first header, such as "A4"
+            headers (list): The column names
+        """
+        row, col = xl_cell_to_rowcol(cell.upper())
+        header_format = self.get_format(
+            {
+                "font_name": self.FONT_NAME,
+                "bold": True,
+                "align": "center",
+                "valign": "vcenter",
+                "text_wrap": True,
+                "bottom": 1,
+            }
+        )
+        self.worksheet.write_row(row, col, headers, header_format)
+        self.worksheet.autofilter(row, col, row, col + len(headers) - 1)
+
     def set_col_hidden(self, cell: str, hidden: bool = True) -> None:
         """Hide column
 
@@ -279,26 +443,30 @@ class ExcelFile:
     def set_print_area(self, cell) -> None:
         self.worksheet.print_area(cell)
 
-    def save(self) -> None:
-        """Save excel file."""
-        merge_format = self.workbook.add_format(
-            {"align": "top", "valign": "right", "font_name": self.FONT_NAME}
+    def add_header(self, title: str) -> None:
+        """Add the title and today's date to the top of the sheet
+
+        Args:
+            title (str): Such as "Packing Slip" or "Work Order"
+        """
+        merge_format = self.get_format(
+            {
+                "align": "center",
+                "valign": "center",
+                "font_name": self.FONT_NAME,
+                "bold": True,
+                "font_size": 18,
+                "bottom": 1,
+            }
+        )
+        self.worksheet.merge_range("E1:G1", title, merge_format)
+        merge_format = self.get_format(
+            {"align": "top", "valign": "right", "font_name": self.FONT_NAME, "text_wrap": True}
         )
-        merge_format.set_text_wrap()
         self.worksheet.merge_range(
             "J1:K1", f"{datetime.now().strftime('%B %d, %A, %Y')}", merge_format
         )
-        merge_format = self.workbook.add_format(
-            {"align": "center", "valign": "center", "font_name": self.FONT_NAME}
-        )
-        merge_format.set_bold()
-        merge_format.set_font_size(18)
-        merge_format.set_bottom(1)
-        
-        with open(f"{self.program_directory}/action", "r") as f:
-            action = f.read()
-        if action == 'go':
-            self.worksheet.merge_range("E1:G1", "Work Order", merge_format)
-        else:
-            self.worksheet.merge_range("E1:G1", "Packing Slip", merge_format)
+
+    def save(self) -> None:
+        """Save excel file."""
         self.workbook.close()
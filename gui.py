@@ -1,82 +1,176 @@
-import configparser
-import json
-import os
 import shutil
-import socket
-import sys
-import threading
-import time
 import tkinter
 import tkinter as tk
+from collections import OrderedDict
 from functools import partial
-from tkinter import filedialog, messagebox, ttk
+from tkinter import filedialog, ttk
 from tkinter.constants import *
 
 import sv_ttk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
-program_directory = os.path.dirname(os.path.realpath(sys.argv[0]))
+from config import get_config
+from models import Part, Quote, ReviewDecision
+from thumbnails import ThumbnailStore
 
+class VirtualPartList(ttk.Frame):
+    """A scrollable list of the parts of a quote that only has widgets for the rows that are visible.
 
-global_variables = configparser.ConfigParser()
-global_variables.read(f"{program_directory}/global_variables.cfg")
-materials = global_variables["GLOBAL VARIABLES"]["materials"].split(",")
-input_dialogs = {}
-
-
-class VerticalScrolledFrame(ttk.Frame):
-    """A pure Tkinter scrollable frame that actually works!
-    * Use the 'interior' attribute to place widgets inside the scrollable frame.
-    * Construct and pack/place/grid normally.
-    * This frame only allows vertical scrolling.
+    Scrolling does not move widgets, it shows other parts in the same rows. Thumbnails are only turned
+    into PhotoImages when their row is shown, and the most recently shown ones are kept for scrolling back.
     """
 
-    def __init__(self, parent, *args, **kw):
-        ttk.Frame.__init__(self, parent, *args, **kw)
-
-        # Create a canvas object and a vertical scrollbar for scrolling it.
-        vscrollbar = ttk.Scrollbar(self, orient=VERTICAL)
-        vscrollbar.pack(fill=Y, side=RIGHT, expand=FALSE)
-        canvas = tk.Canvas(
-            self, bd=0, highlightthickness=0, yscrollcommand=vscrollbar.set
+    ROW_HEIGHT: int = 84
+    COLUMN_WIDTHS: list[int] = [140, 340, 220, 180]
+
+    def __init__(
+        self, parent, quote: Quote, autosave: "Autosave", thumbnails: ThumbnailStore, height: int = 600
+    ):
+        ttk.Frame.__init__(self, parent)
+        self.quote = quote
+        self.autosave = autosave
+        self.thumbnails = thumbnails
+        self.parts = quote.get_parts()
+        self.rows: list[PartRow] = []
+        self.top: int = 0
+        self._photo_images: OrderedDict[int, ImageTk.PhotoImage] = OrderedDict()
+
+        header = ttk.Frame(self)
+        header.pack(fill=X)
+        for col_i, header_text in enumerate(["Item", "Part Name", "Quantity", "Recut or not"]):
+            header.grid_columnconfigure(col_i, minsize=self.COLUMN_WIDTHS[col_i])
+            ttk.Label(header, text=header_text).grid(row=0, column=col_i)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self.yview)
+        self.scrollbar.pack(fill=Y, side=RIGHT, expand=FALSE)
+        # Rows are placed in the viewport, which clips the ones that are partly scrolled out.
+        self.viewport = tk.Frame(self, width=sum(self.COLUMN_WIDTHS), height=height)
+        self.viewport.pack(side=LEFT, fill=BOTH, expand=TRUE)
+        self.viewport.bind("<Configure>", lambda event: self.render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_mouse_wheel, add="+")
+
+    @property
+    def total_height(self) -> int:
+        return len(self.parts) * self.ROW_HEIGHT
+
+    def get_photo_image(self, image_index: int) -> ImageTk.PhotoImage:
+        """
+        Returns:
+          ImageTk.PhotoImage: The preview of a thumbnail, made the first time its row is shown.
+        """
+        if image_index in self._photo_images:
+            self._photo_images.move_to_end(image_index)
+        else:
+            self._photo_images[image_index] = ImageTk.PhotoImage(self.thumbnails.get_preview(image_index))
+            # Enough for a few screens, so scrolling back and forth does not make them again.
+            while len(self._photo_images) > max(64, 4 * len(self.rows)):
+                self._photo_images.popitem(last=False)
+        return self._photo_images[image_index]
+
+    def commit_quantities(self) -> None:
+        """It takes the quantities typed into the visible rows that were not entered yet."""
+        for row in self.rows:
+            row.quantity_changed()
+
+    def render(self) -> None:
+        """It shows the parts that are scrolled to, making more rows if the viewport grew."""
+        view_height = max(self.viewport.winfo_height(), 1)
+        self.top = max(0, min(self.top, self.total_height - view_height))
+        while len(self.rows) < view_height // self.ROW_HEIGHT + 2:
+            self.rows.append(PartRow(self.viewport, self))
+
+        first_index, offset = divmod(self.top, self.ROW_HEIGHT)
+        for row_i, row in enumerate(self.rows):
+            index = first_index + row_i
+            if index < len(self.parts):
+                row.show(self.parts[index], row_i * self.ROW_HEIGHT - offset)
+            else:
+                row.hide()
+
+        if self.total_height:
+            self.scrollbar.set(self.top / self.total_height, (self.top + view_height) / self.total_height)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args) -> None:
+        """The scrollbar's command, "moveto" a fraction or "scroll" by units or pages."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.total_height)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else self.ROW_HEIGHT // 2
+            self.top += int(args[1]) * step
+        self.render()
+
+    def _on_mouse_wheel(self, event) -> None:
+        # Wheel events go to the focused widget, so only scroll when the pointer is over the list.
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self)):
+            return
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -1, "units")
+        else:
+            self.yview("scroll", 1, "units")
+
+
+class PartRow(ttk.Frame):
+    """One row of a `VirtualPartList`, it shows whichever part is scrolled to it."""
+
+    def __init__(self, viewport, part_list: VirtualPartList):
+        ttk.Frame.__init__(self, viewport)
+        self.part_list = part_list
+        self.part_name: str | None = None
+        for col_i, width in enumerate(part_list.COLUMN_WIDTHS):
+            self.grid_columnconfigure(col_i, minsize=width)
+
+        self.image_label = ttk.Label(self)
+        self.image_label.grid(row=0, column=0, pady=5)
+        self.name_label = ttk.Label(self, wraplength=300, justify="center")
+        self.name_label.grid(row=0, column=1, pady=5)
+        self.quantity = tk.StringVar(self)
+        self.spin_box = tk.Spinbox(
+            self, from_=0, to=99999999, textvariable=self.quantity, command=self.quantity_changed
         )
-        canvas.pack(side=LEFT, fill=BOTH, expand=TRUE)
-        vscrollbar.config(command=canvas.yview)
-
-        # Reset the view
-        canvas.xview_moveto(0)
-        canvas.yview_moveto(0)
-
-        # Create a frame inside the canvas which will be scrolled with it.
-        self.interior = interior = ttk.Frame(canvas)
-        interior_id = canvas.create_window(0, 0, window=interior, anchor=NW)
-
-        # Track changes to the canvas and frame width and sync them,
-        # also updating the scrollbar.
-        def _configure_interior(event):
-            # Update the scrollbars to match the size of the inner frame.
-            size = (1300, interior.winfo_reqheight())
-            canvas.config(scrollregion="0 0 %s %s" % size)
-            if 1300 != canvas.winfo_width():
-                # Update the canvas's width to fit the inner frame.
-                canvas.config(width=1300, height=600)
-
-        interior.bind("<Configure>", _configure_interior)
-
-        def _configure_canvas(event):
-            if 1300 != canvas.winfo_width():
-                # Update the inner frame's width to fill the canvas.
-                canvas.itemconfigure(interior_id, width=canvas.winfo_width())
-
-        canvas.bind("<Configure>", _configure_canvas)
-
-
-class WrappingLabel(ttk.Label):
-    """a type of Label that automatically adjusts the wrap to the size"""
-
-    def __init__(self, master=None, **kwargs):
-        tk.Label.__init__(self, master, **kwargs)
-        self.bind("<Configure>", lambda e: self.config(wraplength=self.winfo_width()))
+        self.spin_box.grid(row=0, column=2, pady=5)
+        # Typed quantities are taken when the spinbox is left or Enter is pressed.
+        self.spin_box.bind("<FocusOut>", lambda event: self.quantity_changed())
+        self.spin_box.bind("<Return>", lambda event: self.quantity_changed())
+        self.toggle_button = ToggleButton(self, part_list.quote, part_list.autosave)
+        self.toggle_button.grid(row=0, column=3, pady=5)
+
+    def show(self, part: Part, y: int) -> None:
+        """
+        It shows a part in this row
+
+        Args:
+          part (Part): The part to show.
+          y (int): Where the row goes in the viewport, negative when it is partly scrolled out.
+        """
+        if part.part_name != self.part_name:
+            self.quantity_changed()  # before the row is given to another part
+            self.part_name = part.part_name
+            img = self.part_list.get_photo_image(part.image_index)
+            self.image_label.configure(image=img)
+            self.image_label.image = img  # so it is not deleted while shown if the cache drops it
+            self.name_label.configure(text=part.part_name)
+            self.quantity.set(str(part.quantity))
+            self.toggle_button.set_part(part.part_name)
+        self.place(x=0, y=y, relwidth=1, height=self.part_list.ROW_HEIGHT)
+
+    def hide(self) -> None:
+        self.quantity_changed()
+        self.part_name = None
+        self.place_forget()
+
+    def quantity_changed(self) -> None:
+        if self.part_name is None:
+            return
+        try:
+            quantity = int(float(self.quantity.get()))
+        except ValueError:
+            return
+        if quantity != self.part_list.quote.parts[self.part_name].quantity:
+            quantity_change(self.part_list.quote, self.part_list.autosave, self.part_name, quantity)
 
 
 class ToggleButton(ttk.Button):
@@ -89,19 +183,26 @@ class ToggleButton(ttk.Button):
         "text": "NOT RECUT",
     }
 
-    def __init__(self, parent, *args, **kwargs):
+    def __init__(self, parent, quote: Quote, autosave: "Autosave", *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
 
+        self.quote = quote
+        self.text: str | None = None
         self.toggled = False
         self.config = self.OFF_config
-        self.config_button()
-        self.text = kwargs["text"].split(";")[0]
-        self.json_file_path = kwargs["text"].split(";")[1]
+        self.autosave = autosave
 
         self.bind("<Button-1>", self.toggle)
 
+    def set_part(self, part_name: str) -> None:
+        """It makes the button show and toggle whether `part_name` is a recut."""
+        self.text = part_name
+        self.toggled = self.quote.parts[part_name].recut
+        self.config = self.ON_config if self.toggled else self.OFF_config
+        self.config_button()
+
     def toggle(self, *args):
-        check_part_number_boolean(self.json_file_path, self.text)
+        check_part_number_boolean(self.quote, self.autosave, self.text)
         self.config = self.OFF_config if self.toggled else self.ON_config
         self.toggled = not self.toggled
         return self.config_button()
@@ -114,168 +215,127 @@ class ToggleButton(ttk.Button):
         return f"{self['text']}, {self['bg']}, {self['relief']}"
 
 
-def check_part_number_boolean(json_file_path, part_name) -> None:
-    """
-    It opens the json file, loads the data, changes the value of the key "checked" to the opposite of
-    what it was, and then writes the data back to the json file
+class Autosave:
+    """Saves the quote being reviewed a while after the last edit, so a crash loses at most the last few.
 
-    Args:
-      json_file_path: The path to the json file
-      part_name: The name of the part you want to check/uncheck.
+    Edits are only made to the quote in memory, the JSON file is written when a button is pressed and by
+    the autosave in between. Every edit pushes the autosave back, so clicking through a spinbox saves once.
     """
-    with open(json_file_path) as f:
-        data = json.load(f)
 
-    data[part_name]["recut"] = not data[part_name]["recut"]
+    def __init__(self, root, quote: Quote, json_file_path: str, delay_seconds: float) -> None:
+        self.root = root
+        self.quote = quote
+        self.json_file_path = json_file_path
+        self.delay_ms = int(delay_seconds * 1000)
+        self._after_id = None
+
+    def schedule(self) -> None:
+        """It (re)starts the countdown to the next save, if autosave is on."""
+        if self.delay_ms <= 0:
+            return
+        self.cancel()
+        self._after_id = self.root.after(self.delay_ms, self.save)
 
-    with open(json_file_path, "w") as f:
-        json.dump(data, f, sort_keys=True, ensure_ascii=False, indent=4)
+    def cancel(self) -> None:
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
 
+    def save(self) -> None:
+        """It saves the quote now, and drops the save that was scheduled."""
+        self.cancel()
+        self.quote.save(self.json_file_path)
 
-def upload_file(command: str, json_file_path: str) -> None:
+
+def check_part_number_boolean(quote: Quote, autosave: Autosave, part_name) -> None:
     """
-    It sends a command, a file path, and a file size to the server, then sends the file in chunks of
-    8192 bytes
+    It flips whether a part is a recut
 
     Args:
-      command (str): str = "upload"
-      json_file_path (str): The path to the file you want to send.
+      quote (Quote): The quote being reviewed.
+      autosave (Autosave): Saves the change a while after the last edit.
+      part_name: The name of the part you want to check/uncheck.
     """
-    SERVER_IP: str = "10.0.0.93"
-    SERVER_PORT: int = 80
-    BUFFER_SIZE: int = 8192
-    SEPARATOR = "<SEPARATOR>"
-    server = (SERVER_IP, SERVER_PORT)
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(15)
-    s.connect(server)
-    filesize = os.path.getsize(json_file_path)
-
-    s.send(f"{command}{SEPARATOR}{json_file_path}{SEPARATOR}{filesize}".encode())
-    time.sleep(1)  # ! IMPORTANT
-    with open(json_file_path, "rb") as f:
-        while True:
-            if bytes_read := f.read(BUFFER_SIZE):
-                s.sendall(bytes_read)
-            else:
-                # file transmitting is done
-                time.sleep(1)  # ! IMPORTANT
-                break
-    s.sendall("FINSIHED!".encode("utf-8"))
-    response = s.recv(1024).decode("utf-8")
-    s.shutdown(2)
-    s.close()
-    if response == "Batch sent successfully":
-        messagebox.showinfo(
-            "Success",
-            "Batch was sent successfully.",
-        )
-    else:
-        messagebox.showerror(
-            "Oh no",
-            f"{response}",
-        )
+    quote.parts[part_name].recut = not quote.parts[part_name].recut
+    autosave.schedule()
 
 
-def go_button_pressed(root, json_file_path, material_type) -> None:
+def go_button_pressed(
+    root, quote: Quote, autosave: Autosave, material_type, decisions: list[ReviewDecision]
+) -> None:
     """
-    It starts a new thread that calls the upload_file function with the arguments
-    "laser_parts_list_upload" and the json_file_path
+    It saves the quote and hands back a "go" decision, the quote's JSON file is sent to inventory in the
+    background once the window is closed
 
     Args:
-      json_file_path: The path to the JSON file that you want to upload.
+      quote (Quote): The quote being reviewed.
+      autosave (Autosave): Saves the quote to the JSON file that is uploaded.
+      decisions (list[ReviewDecision]): Where the "go" decision is put for `load_gui` to return.
     """
-    with open(f"{program_directory}/action", "w") as f:
-        f.write("go")
-    with open(json_file_path) as f:
-        data = json.load(f)
-    for item in list(data.keys()):
-        data[item]["material"] = material_type.get()
-    with open(json_file_path, "w") as f:
-        json.dump(data, f, sort_keys=True, indent=4)
-    threading.Thread(
-        target=upload_file, args=["laser_parts_list_upload", json_file_path]
-    ).start()
+    decisions.append(ReviewDecision.from_quote("go", material_type.get(), quote))
+    quote.set_material(material_type.get())
+    autosave.save()
     root.destroy()
-    messagebox.showinfo(
-        "Sending",
-        "I am sending file hold on",
-    )
 
 
-def make_quote_button_pressed(root, json_file_path, material_type) -> None:
+def make_quote_button_pressed(
+    root, quote: Quote, autosave: Autosave, material_type, decisions: list[ReviewDecision]
+) -> None:
     """
-    This function updates a JSON file with a selected material type and writes "quote" to a separate
-    file before destroying the root window.
+    This function saves the quote with the selected material type and hands back a "quote" decision
+    before destroying the root window.
 
     Args:
       root: The root parameter is typically a reference to the main window or frame of a GUI
     application. It is used to access and modify the widgets and properties of the application.
-      json_file_path: The file path to a JSON file that contains data to be modified.
+      quote (Quote): The quote being reviewed.
+      autosave (Autosave): Saves the quote to its JSON file.
       material_type: It is a variable that contains the selected material type. It is likely a tkinter
     StringVar() object that is used to store the value of a dropdown menu or radio button selection. The
     value of this variable is used to update the "material" field in a JSON file.
+      decisions (list[ReviewDecision]): Where the "quote" decision is put for `load_gui` to return.
     """
-    with open(json_file_path) as f:
-        data = json.load(f)
-    for item in list(data.keys()):
-        data[item]["material"] = material_type.get()
-    with open(json_file_path, "w") as f:
-        json.dump(data, f, sort_keys=True, indent=4)
-    with open(f"{program_directory}/action", "w") as f:
-        f.write("quote")
+    decisions.append(ReviewDecision.from_quote("quote", material_type.get(), quote))
+    quote.set_material(material_type.get())
+    autosave.save()
     root.destroy()
 
 
-def get_total_sheet_count(json_file_path) -> int:
-    """
-    > It opens the JSON file, loads the data, and then sums the quantity_multiplier
-
-    Args:
-      json_file_path: The path to the JSON file that contains the data for the parts.
-
-    Returns:
-      The total number of sheets in the json file.
-    """
-    with open(json_file_path) as f:
-        data = json.load(f)
-    sheet_count: int = sum(
-        data[part_name]["quantity_multiplier"]
-        for part_name in list(data.keys())
-        if part_name[0] == "_"
-    )
-    return sheet_count
-
-
-def quantity_change(json_file_path, part_name: str) -> None:
+def quantity_change(quote: Quote, autosave: Autosave, part_name: str, quantity: int) -> None:
     """
-    This function updates the quantity of a specific part in a JSON file based on user input.
+    This function updates the quantity of a specific part of the quote based on user input.
 
     Args:
-      json_file_path: The file path of the JSON file that contains the data to be modified.
-      part_name (str): The parameter `part_name` is a string that represents the name of a part in a
-    JSON file. The function `quantity_change` updates the quantity of this part in the JSON file based
-    on user input.
+      quote (Quote): The quote being reviewed.
+      autosave (Autosave): Saves the change a while after the last edit.
+      part_name (str): The parameter `part_name` is a string that represents the name of a part in the
+    quote. The function `quantity_change` updates the quantity of this part based on user input.
+      quantity (int): The quantity that was entered.
     """
-    with open(json_file_path) as f:
-        data = json.load(f)
-
-    data[part_name]["quantity"] = int(input_dialogs[part_name].get())
+    quote.parts[part_name].quantity = quantity
+    autosave.schedule()
 
-    with open(json_file_path, "w") as f:
-        json.dump(data, f, sort_keys=True, ensure_ascii=False, indent=4)
 
 
-
-def load_gui(json_file_path: str, selected_material_type: str) -> None:
+def load_gui(
+    quote: Quote, json_file_path: str, selected_material_type: str, thumbnails: ThumbnailStore
+) -> ReviewDecision | None:
     """
-    It loads a JSON file, then creates a GUI with a scrollable frame, and then populates the frame with
-    the data from the JSON file.
+    It creates a GUI with a scrollable frame and populates the frame with the parts of the quote, every
+    change is made to the quote in memory and saved to its JSON file by the autosave and when a button
+    is pressed.
 
     Args:
-      json_file_path (str): str
+      quote (Quote): The quote to review.
+      json_file_path (str): The JSON file the quote is saved to.
+      thumbnails (ThumbnailStore): The part thumbnails, looked up by image index.
+
+    Returns:
+      ReviewDecision | None: What the pressed button decided, None if the window was closed instead.
     """
+    decisions: list[ReviewDecision] = []
     root = tkinter.Tk()
+    autosave = Autosave(root, quote, json_file_path, get_config().autosave_seconds)
     root.title("Laser Quote Generator - Add parts to Inventory")
     root.lift()
     root.attributes("-topmost", True)
@@ -286,16 +346,10 @@ def load_gui(json_file_path: str, selected_material_type: str) -> None:
     # This is where the magic happens
     # sv_ttk.set_theme("dark")
 
-    with open(json_file_path) as f:
-        data = json.load(f)
-    part_to_get_sheet_dim = ""
-    for part_name in list(data.keys()):
-        if part_name[0] == "_":
-            continue
-        part_to_get_sheet_dim = part_name
+    first_nest = quote.nests[0]
     panel = ttk.Label(
         root,
-        text=f"Total Sheet Count: {get_total_sheet_count(json_file_path)} - Sheet Size: {data[list(data.keys())[0]]['sheet_dim']} - Thickness: {data[list(data.keys())[0]]['gauge']}",
+        text=f"Total Sheet Count: {quote.total_sheet_count} - Sheet Size: {first_nest.sheet_dim} - Thickness: {first_nest.gauge}",
     )
     panel.pack()
     panel = ttk.Label(
@@ -306,7 +360,7 @@ def load_gui(json_file_path: str, selected_material_type: str) -> None:
     material_type = tk.StringVar(root)
     material_type.set(selected_material_type)  # default value
     dropdown_material = ttk.OptionMenu(
-        root, material_type, *[selected_material_type] + materials
+        root, material_type, *[selected_material_type] + get_config().materials
     )
     dropdown_material.pack()
     panel = ttk.Label(
@@ -315,59 +369,18 @@ def load_gui(json_file_path: str, selected_material_type: str) -> None:
     )
     panel.pack()
 
-    frame = VerticalScrolledFrame(root)
-    frame.pack()
-
-    for col_i, header in enumerate(["Item", "Part Name", "Quantity", "Recut or not"]):
-        panel = ttk.Label(frame.interior, text=header)
-        panel.grid(row=0, column=col_i)
-        panel.grid_rowconfigure(0, weight=1)
-        panel.grid_columnconfigure(0, weight=1)
-    for row_i, part_name in enumerate(list(data.keys()), start=1):
-        if part_name[0] == "_":
-            continue
-        img = Image.open(
-            f"{program_directory}/images/{data[part_name]['image_index']}.jpeg"
-        )
-        img = img.resize((64, 64), Image.ANTIALIAS)
-        img = ImageTk.PhotoImage(img)
-        panel = ttk.Label(frame.interior, image=img)
-        panel.image = img
-        panel.grid_rowconfigure(0, weight=1)
-        panel.grid_columnconfigure(0, weight=1)
-        panel.grid(row=row_i, column=0, padx=50, pady=5)
-        panel = WrappingLabel(
-            frame.interior, text=part_name, wraplength=300, justify="center"
-        )
-        panel.grid_rowconfigure(0, weight=1)
-        panel.grid_columnconfigure(0, weight=1)
-        panel.grid(row=row_i, column=1, padx=50, pady=5)
-
-        var = tk.DoubleVar(root)
-        spin_box = tk.Spinbox(
-            frame.interior,
-            from_=0,
-            to=99999999,
-            textvariable=var,
-            command=partial(quantity_change, json_file_path, part_name),
-        )
+    part_list = VirtualPartList(root, quote, autosave, thumbnails)
+    part_list.pack()
 
-        var.set(str(data[part_name]["quantity"]))
-        input_dialogs[part_name] = spin_box
-        spin_box.grid_rowconfigure(0, weight=1)
-        spin_box.grid_columnconfigure(0, weight=1)
-        spin_box.grid(row=row_i, column=2, padx=50, pady=5)
-        # panel.pack()
-        panel = ToggleButton(frame.interior, text=f"{part_name};{json_file_path}")
-        panel.grid_rowconfigure(0, weight=1)
-        panel.grid_columnconfigure(0, weight=1)
-        panel.grid(row=row_i, column=3, padx=50, pady=5)
+    def commit(button_pressed) -> None:
+        part_list.commit_quantities()
+        button_pressed(root, quote, autosave, material_type, decisions)
 
     # NOTE Make work order with col hidden and send to inventory
     recut_button = ttk.Button(
         root,
         text="Send to Inventory &\nGenerate workorder!!",
-        command=partial(go_button_pressed, root, json_file_path, material_type),
+        command=partial(commit, go_button_pressed),
     )
     recut_button.place(rely=1.0, relx=1.0, x=-10, y=-10, anchor=SE, width=150, height=80)
 
@@ -375,14 +388,9 @@ def load_gui(json_file_path: str, selected_material_type: str) -> None:
     quote_button = ttk.Button(
         root,
         text="Generate Quote!",
-        command=partial(make_quote_button_pressed, root, json_file_path, material_type),
+        command=partial(commit, make_quote_button_pressed),
     )
     quote_button.place(rely=1.0, relx=1.0, x=-170, y=-10, anchor=SE, width=150, height=80)
     root.mainloop()
+    return decisions[0] if decisions else None
 
-
-if __name__ == "__main__":
-    load_gui(
-        r"F:\Code\Python-Projects\Laser-Quote-Generator\excel files\2023-04-28-17-20-43.json",
-        "304 SS",
-    )
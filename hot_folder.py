@@ -0,0 +1,297 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+
+class WatchedFile:
+    """A PDF that is not ready yet, with what it looked like the last time it was checked."""
+
+    __slots__ = ("size", "modified_time", "stable_since")
+
+    def __init__(self, size: int, modified_time: float, stable_since: float) -> None:
+        self.size = size
+        self.modified_time = modified_time
+        self.stable_since = stable_since
+
+
+class FileGroup:
+    """The ready PDFs of one job, waiting for the rest of the job to land."""
+
+    __slots__ = ("name", "files", "last_ready")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # The path of every PDF and its size and modification time when it was ready.
+        self.files: dict[str, tuple[int, float]] = {}
+        self.last_ready: float = 0.0
+
+
+class HotFolder:
+    """Watches the folder the CAM station drops nest reports in, and hands them over job by job.
+
+    A PDF is ready once its size and modification time have not changed for `settle_seconds`, so one
+    that is still being written is left alone. The PDFs of a subfolder are one job, the ones dropped
+    straight in the folder are one job per batch. A job is handed over once none of its PDFs became
+    ready for `group_seconds` and none is still being written. The PDFs of a job are remembered in
+    `state_path` once whoever took it calls `done`, and only handed over again if they change. A job
+    that was handed over but not done when the program stopped is handed over again when it starts.
+
+    With watchdog installed the folder is looked at as soon as the file system says something changed
+    in it, and scanned every `rescan_seconds` anyway since network drives do not always say so. Without
+    it the folder is scanned every `poll_seconds`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        state_path: str,
+        on_ready: Callable[[str], None],
+        on_group: Callable[[str, list[str]], None],
+        settle_seconds: float = 5.0,
+        group_seconds: float = 30.0,
+        poll_seconds: float = 2.0,
+        rescan_seconds: float = 60.0,
+        include_existing: bool = False,
+    ) -> None:
+        """
+        Args:
+          directory (str): The folder to watch, with its subfolders.
+          state_path (str): Where to remember the PDFs that were handed over.
+          on_ready (Callable[[str], None]): Called with every PDF as soon as it is ready, so it can be
+        parsed while the rest of its job lands.
+          on_group (Callable[[str, list[str]], None]): Called with the name of a job and its PDFs, in the
+        order they became ready, `done` is to be called with the name once the job is done. Both are
+        called from the watcher thread and should return quickly.
+          settle_seconds (float, optional): How long a PDF has to stay the same to be ready. Defaults to 5.
+          group_seconds (float, optional): How long to wait for more PDFs of a job. Defaults to 30.
+          poll_seconds (float, optional): How often PDFs that are not ready are checked, and the folder is
+        scanned without watchdog. Defaults to 2.
+          rescan_seconds (float, optional): How often the folder is scanned with watchdog. Defaults to 60.
+          include_existing (bool, optional): Hand over the PDFs that are already in the folder the first
+        time it is watched, instead of only the new ones. Defaults to False.
+        """
+        self.directory = Path(directory)
+        self.state_path = Path(state_path)
+        self.on_ready = on_ready
+        self.on_group = on_group
+        self.settle_seconds = settle_seconds
+        self.group_seconds = group_seconds
+        self.poll_seconds = poll_seconds
+        self.rescan_seconds = rescan_seconds
+        self.include_existing = include_existing
+        self._watching: dict[str, WatchedFile] = {}
+        self._groups: dict[str, FileGroup] = {}
+        self._handed_over: dict[str, tuple[int, float]] = {}
+        # The PDFs of the jobs that were handed over but are not done yet, by the name of the job.
+        self._pending: dict[str, dict[str, tuple[int, float]]] = {}
+        self._changed_paths: set[str] = set()
+        self._lock = threading.Lock()
+        # Held while the watcher thread or `done` changes what is handed over or pending, and saves it.
+        self._state_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._observer = None
+        # Set when the PDFs already in the folder are to be left alone, they are remembered by the first
+        # scan that can list the folder.
+        self._remember_existing = False
+
+    def start(self) -> None:
+        """It starts watching, with watchdog if it is installed."""
+        if self._thread is not None:
+            return
+        if self.state_path.is_file():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self._handed_over = {path: tuple(signature) for path, signature in state["handed_over"].items()}
+            self._pending = {
+                name: {path: tuple(signature) for path, signature in files.items()}
+                for name, files in state["pending"].items()
+            }
+        elif not self.include_existing:
+            self._remember_existing = True
+        for name, files in self._pending.items():
+            self.on_group(name, list(files))
+        self._observer = self._start_observer()
+        self._thread = threading.Thread(target=self._run, name="hot-folder", daemon=True)
+        self._thread.start()
+
+    def done(self, name: str) -> None:
+        """
+        It remembers the PDFs of a job that was handed over once it is done, it can be called from any
+        thread, also after `stop`
+
+        Args:
+          name (str): The name the job was handed over with.
+        """
+        with self._state_lock:
+            if (files := self._pending.pop(name, None)) is not None:
+                self._handed_over.update(files)
+                self._save_state()
+
+    def stop(self) -> None:
+        """It stops watching, the jobs that were not handed over yet are picked up the next time."""
+        self._stopping.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def uses_watchdog(self) -> bool:
+        return self._observer is not None
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        hot_folder = self
+
+        class ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event) -> None:
+                if event.is_directory:
+                    return
+                with hot_folder._lock:
+                    hot_folder._changed_paths.add(os.fsdecode(getattr(event, "dest_path", "") or event.src_path))
+                hot_folder._wake.set()
+
+        observer = Observer()
+        observer.schedule(ChangeHandler(), str(self.directory), recursive=True)
+        observer.start()
+        return observer
+
+    def _run(self) -> None:
+        last_scan = 0.0
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            if not self.uses_watchdog or now - last_scan >= self.rescan_seconds:
+                # A network drive that dropped can not be listed, that must not look like every PDF in it
+                # was deleted, so the folder is only scanned once it can be listed again.
+                if (pdfs := self._list_pdfs()) is not None:
+                    with self._state_lock:
+                        self._scan(pdfs, now)
+                    last_scan = now
+            else:
+                with self._lock:
+                    changed_paths, self._changed_paths = self._changed_paths, set()
+                with self._state_lock:
+                    for path in changed_paths | set(self._watching):
+                        if path.lower().endswith(".pdf"):
+                            self._observe(path, self._get_signature(path), now)
+            with self._state_lock:
+                self._hand_over_groups(now)
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _scan(self, pdfs: dict[str, tuple[int, float]], now: float) -> None:
+        if self._remember_existing:
+            self._handed_over.update(pdfs)
+            self._save_state()
+            self._remember_existing = False
+        for path in set(self._watching) - pdfs.keys():
+            self._observe(path, None, now)
+        for path, signature in pdfs.items():
+            self._observe(path, signature, now)
+        # The PDFs that were deleted do not need to be remembered anymore.
+        if deleted_paths := self._handed_over.keys() - pdfs.keys():
+            for path in deleted_paths:
+                del self._handed_over[path]
+            self._save_state()
+
+    def _list_pdfs(self) -> dict[str, tuple[int, float]] | None:
+        """
+        Returns:
+          dict[str, tuple[int, float]] | None: The size and modification time of every PDF in the folder
+        and its subfolders, None if the folder or one of its subfolders could not be listed.
+        """
+        if not self.directory.is_dir():
+            return None
+        errors: list[OSError] = []
+        pdfs = {}
+        for directory, _, file_names in os.walk(self.directory, onerror=errors.append):
+            for file_name in file_names:
+                if file_name.lower().endswith(".pdf"):
+                    path = os.path.join(directory, file_name)
+                    if (signature := self._get_signature(path)) is not None:
+                        pdfs[path] = signature
+        return None if errors else pdfs
+
+    @staticmethod
+    def _get_signature(path: str) -> tuple[int, float] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None  # deleted or renamed
+        return stat.st_size, stat.st_mtime
+
+    def _get_group_key(self, path: str) -> str:
+        return os.path.relpath(os.path.dirname(path), self.directory)
+
+    def _observe(self, path: str, signature: tuple[int, float] | None, now: float) -> None:
+        group = self._groups.get(self._get_group_key(path))
+        if signature is None:
+            self._watching.pop(path, None)
+            if group is not None:
+                group.files.pop(path, None)
+            return
+        if self._handed_over.get(path) == signature:
+            return
+        if any(files.get(path) == signature for files in self._pending.values()):
+            return  # its job was handed over and is not done yet
+        if group is not None and group.files.get(path) == signature:
+            return
+        if group is not None:
+            group.files.pop(path, None)  # it changed after it was ready
+
+        watched_file = self._watching.get(path)
+        if watched_file is None or (watched_file.size, watched_file.modified_time) != signature:
+            self._watching[path] = WatchedFile(signature[0], signature[1], now)
+            return
+        if signature[0] == 0 or now - watched_file.stable_since < self.settle_seconds:
+            return
+
+        del self._watching[path]
+        key = self._get_group_key(path)
+        if key not in self._groups:
+            timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+            self._groups[key] = FileGroup(timestamp if key == "." else f"{os.path.basename(key)}-{timestamp}")
+        self._groups[key].files[path] = signature
+        self._groups[key].last_ready = now
+        self.on_ready(path)
+
+    def _hand_over_groups(self, now: float) -> None:
+        being_written = {self._get_group_key(path) for path in self._watching}
+        for key, group in list(self._groups.items()):
+            if key in being_written or now - group.last_ready < self.group_seconds:
+                continue
+            del self._groups[key]
+            if not group.files:
+                continue  # every PDF of it was deleted
+            self._pending.setdefault(group.name, {}).update(group.files)
+            self._save_state()
+            self.on_group(group.name, list(group.files))
+
+    def _save_state(self) -> None:
+        # Written atomically, a crash while saving must not make every PDF look new.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.state_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as f:
+                json.dump({"handed_over": self._handed_over, "pending": self._pending}, f, ensure_ascii=False)
+            os.replace(temporary_path, self.state_path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
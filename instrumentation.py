@@ -0,0 +1,179 @@
+import contextlib
+import json
+import sys
+import time
+from typing import Callable, Iterator
+
+
+def get_peak_memory() -> tuple[float, str]:
+    """
+    Returns:
+      tuple[float, str]: The peak memory of this process in MiB and what was measured: "rss" for the
+    peak resident set size, "working set" on Windows, or "traced" for the peak of the Python
+    allocations traced by tracemalloc when neither is available.
+    """
+    try:
+        import resource
+    except ImportError:
+        pass
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kibibytes, macOS bytes.
+        return peak / 1024 / (1024 if sys.platform == "darwin" else 1), "rss"
+
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / 1024 / 1024, "working set"
+
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[1] / 1024 / 1024, "traced"
+
+
+def get_children_peak_memory() -> float | None:
+    """
+    Returns:
+      float | None: The peak resident set size in MiB of the biggest child process that has finished,
+    such as the ingest workers, None where it can not be measured.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+class Profiler:
+    """Stage timers and counters of one run.
+
+    A stage is timed every time it is entered, and its time and how often it ran are added up. Stages
+    can be nested, the time of a stage includes the stages inside it. Worker processes have their own
+    profiler, `call_profiled` sends what they measured back to be merged, so the time of the stages
+    that run in workers is added up over every worker.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+        self.started = time.perf_counter()
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.counters.clear()
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        It times what runs inside it as the stage `name`
+
+        Args:
+          name (str): The stage, such as "excel.save".
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        stage = self.stages.setdefault(name, [0.0, 0])
+        stage[0] += seconds
+        stage[1] += calls
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Args:
+          name (str): The counter, such as "pages".
+          amount (int, optional): How much to add to it. Defaults to 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+          dict: The stages and counters, picklable, for `merge`.
+        """
+        return {
+            "stages": {name: tuple(stage) for name, stage in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def merge(self, stats: dict) -> None:
+        """It adds the stages and counters measured by a worker process."""
+        for name, (seconds, calls) in stats["stages"].items():
+            self.add_time(name, seconds, calls)
+        for name, amount in stats["counters"].items():
+            self.count(name, amount)
+
+    def get_report(self) -> dict:
+        """
+        Returns:
+          dict: The report of the run: its wall time, every stage, the longest first, every counter and
+        the peak memory.
+        """
+        peak_memory, peak_memory_kind = get_peak_memory()
+        children_peak_memory = get_children_peak_memory()
+        stages = sorted(self.stages.items(), key=lambda item: item[1][0], reverse=True)
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": {
+                name: {"seconds": round(seconds, 6), "calls": calls}
+                for name, (seconds, calls) in stages
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "peak_memory_mib": round(peak_memory, 1),
+            "peak_memory_kind": peak_memory_kind,
+            "children_peak_memory_mib": None if children_peak_memory is None else round(children_peak_memory, 1),
+        }
+
+    def save_report(self, path: str) -> dict:
+        """
+        It writes the report of the run to a JSON file
+
+        Args:
+          path (str): Where to write it.
+
+        Returns:
+          dict: The report, see `get_report`.
+        """
+        report = self.get_report()
+        with open(path, "w") as f:
+            json.dump(report, f, indent=4)
+        return report
+
+
+# The profiler of this process, every stage of the pipeline reports to it.
+profiler = Profiler()
+
+
+def call_profiled(function: Callable, *args) -> tuple:
+    """
+    It runs a function in a worker process with a fresh profiler
+
+    Returns:
+      tuple: What the function returned and the stats it measured, for `Profiler.merge`.
+    """
+    profiler.reset()
+    return function(*args), profiler.get_stats()
@@ -1,76 +1,46 @@
-import configparser
-import io
+import contextlib
+import functools
+import itertools
 import json
+import math
 import os
-import re
-import shutil
 import sys
-import tkinter as tk
 from datetime import datetime
 from pathlib import Path
-from tkinter import *
-from tkinter import filedialog, messagebox, ttk
-from tkinter.constants import *
-
-import fitz  # PyMuPDF
-from alive_progress import alive_bar
-from PIL import Image
-from rich import print
-
-import gui
-from excel_file import ExcelFile
-
-program_directory = os.path.dirname(os.path.realpath(sys.argv[0]))
-
-global_variables = configparser.ConfigParser()
-global_variables.read(f"{program_directory}/global_variables.cfg")
-
-nitrogen_cost_per_hour: int = float(
-    global_variables["GLOBAL VARIABLES"]["nitrogen_cost_per_hour"]
-)
-co2_cost_per_hour: int = float(global_variables["GLOBAL VARIABLES"]["co2_cost_per_hour"])
-materials = global_variables["GLOBAL VARIABLES"]["materials"].split(",")
-"""
-SS      304 SS,409 SS   Nitrogen
-ST      Mild Steel      CO2
-AL      Aluminium       Nitrogen
-"""
-gauges = global_variables["GLOBAL VARIABLES"]["gauges"].split(",")
-path_to_sheet_prices = global_variables["GLOBAL VARIABLES"]["path_to_sheet_prices"]
-with open(path_to_sheet_prices, "r") as f:
-    sheet_prices = json.load(f)
-size_of_picture = int(global_variables["GLOBAL VARIABLES"]["size_of_picture"])
-PROFIT_MARGIN: float = float(global_variables["GLOBAL VARIABLES"]["profit_margin"])
-OVERHEAD: float = float(global_variables["GLOBAL VARIABLES"]["overhead"])
-path_to_save_quotes = global_variables["GLOBAL VARIABLES"]["path_to_save_quotes"]
-path_to_save_workorders = global_variables["GLOBAL VARIABLES"]["path_to_save_workorders"]
-price_of_steel_information_path = global_variables["GLOBAL VARIABLES"]["price_of_steel_information"]
-
-with open(price_of_steel_information_path, "r") as f:
-    price_of_steel_information = json.load(f)
-
-geofile_name_regex = r"(GEOFILE NAME: [a-zA-z]:\\[\w\W]{1,300}\.geo|GEOFILE NAME: [a-zA-Z]:\\[\w\W]{1,300}\.GEO)"
-machining_time_regex = r"(MACHINING TIME: \d{1,}.\d{1,} min)"
-weight_regex = r"(WEIGHT: \d{1,}.\d{1,} lb)"
-surface_area_regex = r"(SURFACE: \d{1,}.\d{1,}  in2)"
-cutting_length_regex = r"(CUTTING LENGTH: \d{1,}.\d{1,}  in|CUTTING LENGTH: \d{1,}  in)"
-quantity_regex = r"(  NUMBER: \d{1,})"
-part_number_regex = r"(PART NUMBER: \d{1,})"
-sheet_quantity_regex = (
-    r"(PROGRAMME RUNS:  \/  SCRAP: \d{1,}|PROGRAM RUNS:  \/  SCRAP: \d{1,})"
-)
-sheet_scrap_percentage_regex = r"(PROGRAMME RUNS:  \/  SCRAP: \d{1,}  \/  \d{1,}.\d{1,} %|PROGRAM RUNS:  \/  SCRAP: \d{1,}  \/  \d{1,}.\d{1,} %)"
-scrap_percentage_regex = r"(\d{1,}.\d{1,}) %"
-piercing_time_regex = r"(PIERCING TIME \d{1,}.\d{1,}  s)"
-material_id_regex = r"MATERIAL ID \(SHEET\): (?=.*(ST|SS|AL)-)"
-gauge_regex = r"MATERIAL ID \(SHEET\): .{1,} ?-(\d{1,})"
-sheet_dim_regex = r"BLANK: (\d{1,}\.\d{1,} x \d{1,}\.\d{1,}) x \d{1,}\.\d{1,}"
+from typing import TYPE_CHECKING
+
+from config import get_config, program_directory
+from instrumentation import profiler
+from material_catalog import MaterialCatalog
+from models import Nest, Quote, ReviewDecision
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from nest_cache import NestCache
+    from outbox import Outbox
+    from pricing import PriceList, QuotePricing
+    from thumbnails import ThumbnailStore
+
+# tkinter, PyMuPDF, Pillow, NumPy, XlsxWriter, rich and alive_progress are only imported by the stage
+# that needs them, so importing main and running a headless job start quickly.
 
 material_selection = ""
+material_catalog = MaterialCatalog(f"{program_directory}/material_id.json")
+
+
+def print(*args, **kwargs) -> None:
+    """rich's print, imported the first time something is printed"""
+    from rich import print as rich_print
+
+    rich_print(*args, **kwargs)
 
 
 class SelectionDialog:
     def __init__(self, parent, choicelist):
+        from tkinter import StringVar, ttk
+        from tkinter.constants import SW
+
         label = ttk.Label(
             parent, text="Select Material Type:"
         )  # .grid(row=0, column=0, sticky="W")
@@ -98,83 +68,9 @@ class SelectionDialog:
         self.parent.destroy()
 
 
-def convert_pdf_to_text(pdf_paths: list, progress_bar) -> None:
-    """
-    It opens the PDF file, gets the text from each page, and writes it to a text file
-
-    Args:
-      pdf_paths (list): list
-      progress_bar: a function that will be called after each PDF is processed.
-    """
-    with open(f"{program_directory}/output.txt", "w") as f:
-        f.write("")
-
-    for i, pdf_path in enumerate(pdf_paths, start=1):
-        print(f'[ ] Processing "{pdf_path}"\t{i}/{len(pdf_paths)}')
-        pdf_file = fitz.open(pdf_path)
-        pages = list(range(pdf_file.pageCount))
-        for pg in range(pdf_file.pageCount):
-            if pg in pages:
-                print(f"\t[ ] Getting text from page #{pg+1}.")
-                page = pdf_file[pg]
-                page_lines = page.get_text("text")
-                with open(f"{program_directory}/output.txt", "a") as f:
-                    f.write(page_lines)
-                print(f"\t[+] Getting text from page #{pg+1}.")
-        print(f'[+] Finished "{pdf_path}"\t{i}/{len(pdf_paths)}')
-        progress_bar()
-
-    with open(f"{program_directory}/output.txt", "r") as f:
-        all_text = f.read()
-
-    with open(f"{program_directory}/output.txt", "w") as f:
-        f.write(all_text.replace(" \n", " "))
-
-
-def extract_images_from_pdf(pdf_paths: list, progress_bar) -> None:
-    """
-    It opens a PDF file, extracts all the images from it, resizes them to a specific size, and saves
-    them to a folder
-
-    Args:
-      pdf_paths (list): list = list of paths to the PDF files
-      progress_bar: a function that prints a progress bar
-    """
-    image_count: int = 0
-    for i, pdf_path in enumerate(pdf_paths, start=1):
-        print(f'[ ] Processing "{pdf_path}"\t{i}/{len(pdf_paths)}')
-        pdf_file = fitz.open(pdf_path)
-        for page_index in range(len(pdf_file)):
-            page = pdf_file[page_index]
-            if image_list := page.get_images():
-                print(f"\t[+] {len(image_list)} images in page {page_index}")
-            else:
-                print("\t[!] No images found on page", page_index)
-                continue
-            print(f"\t[ ] Extracting images from page {page_index}")
-            for image_index, img in enumerate(page.get_images(), start=1):
-                xref = img[0]
-                base_image = pdf_file.extract_image(xref)
-                image_bytes = base_image["image"]
-                image_ext = base_image["ext"]
-                image = Image.open(io.BytesIO(image_bytes))
-                if image.size[0] == 48 and image.size[1] == 48:
-                    continue
-                image = image.resize(
-                    (size_of_picture, size_of_picture), Image.Resampling.LANCZOS
-                )
-                image.save(
-                    open(f"{program_directory}/images/{image_count}.{image_ext}", "wb")
-                )
-                image_count += 1
-            print(f"\t[+] Extracted images from page {page_index}")
-        print(f'[+] Finished "{pdf_path}"\t{i}/{len(pdf_paths)}')
-        progress_bar()
-
-
 def convert_material_id_to_name(material: str) -> str:
     """
-    It opens the file material_id.json, loads the data, and returns the name of the material
+    It looks up the name of the material in the material catalog
 
     Args:
       material (str): The material ID of the material you want to convert.
@@ -182,15 +78,12 @@ def convert_material_id_to_name(material: str) -> str:
     Returns:
       The name of the material.
     """
-    with open(f"{program_directory}/material_id.json", "r") as material_id_file:
-        data = json.load(material_id_file)
-    return data[material]["name"]
+    return material_catalog.get_name(material)
 
 
 def convert_material_id_to_number(number_id: str) -> str:
     """
-    It takes a string as an argument, opens a json file, loads the data from the json file, and returns
-    a string
+    It looks up the thickness of a gauge code in the material catalog
 
     Args:
       number_id (str): The material ID number.
@@ -198,121 +91,152 @@ def convert_material_id_to_number(number_id: str) -> str:
     Returns:
       The thickness of the material.
     """
-    with open(f"{program_directory}/material_id.json", "r") as material_id_file:
-        data = json.load(material_id_file)
-    return data["thickness"][number_id]
+    return material_catalog.get_thickness(number_id)
 
 
 def get_cutting_method(material: str) -> str:
     """
     "Given a material ID, return the cutting method."
 
-    The first line of the function is a docstring. It's a string that describes what the function does.
-    It's a good idea to include a docstring in every function you write
-
     Args:
       material_id (str): The material ID of the material you want to cut.
 
     Returns:
       The cutting method for the material.
     """
-    with open(f"{program_directory}/material_id.json", "r") as material_id_file:
-        data = json.load(material_id_file)
-    return data[material]["cut"]
+    return material_catalog.get_cutting_method(material)
 
 
-def get_table_value_from_text(regex) -> list:
+def get_price_list() -> "PriceList":
     """
-    It takes a regular expression and returns a list of all the matches
-
-    Args:
-      regex: The regex to search for.
-
     Returns:
-      A list of all the values in the table.
+      PriceList: The rates quotes are priced with, from global_variables.cfg and the price files.
     """
-    with open(f"{program_directory}/output.txt", "r") as f:
-        text = f.read()
-
-    items = []
-
-    matches = re.finditer(regex, text, re.MULTILINE)
-    for match in matches:
-        items.extend(iter(match.groups()))
+    from pricing import PriceList
+
+    config = get_config()
+    sheet_prices, price_of_steel_information = config.get_prices()
+    return PriceList(
+        price_per_pound={
+            sheet_name: sheet_price["price"] for sheet_name, sheet_price in sheet_prices["Price Per Pound"].items()
+        },
+        cost_per_hour={"Nitrogen": config.nitrogen_cost_per_hour, "CO2": config.co2_cost_per_hour},
+        overhead=config.overhead,
+        profit_margin=config.profit_margin,
+        pounds_per_square_foot=price_of_steel_information["pounds_per_square_foot"],
+    )
 
-    return items
 
-def get_value_from_string(regex, text) -> list:
+@profiler.stage("excel")
+def generate_excel_file(
+    quote: Quote, action: str, file_name: str, thumbnails: "ThumbnailStore", constant_memory: bool = False
+) -> "QuotePricing":
     """
-    This function extracts table values from a string using a regular expression and returns them as a
-    list.
+    It takes a reviewed quote and generates an excel file with a row for every part. Every formula is
+    stored with its value, priced by `QuotePricing`, so the workbook opens already calculated.
 
     Args:
-      regex: A regular expression pattern used to match and extract values from the input text.
-      text: I'm sorry, but the 'text' parameter is missing. Please provide the text parameter so I can
-    assist you better.
+      quote (Quote): The nest reports and parts to put on the sheet.
+      action (str): "go" for a work order, "quote" for a quote.
+      file_name (str): str = The name of the excel file.
+      thumbnails (ThumbnailStore): The part thumbnails, looked up by image index.
+      constant_memory (bool): write the workbook row by row, flushing each row to disk, so memory
+    stays flat no matter how many parts there are. The parts are then a plain range instead of an
+    Excel table. Defaults to False.
 
     Returns:
-      a list of items that match the regular expression pattern in the given text.
+      QuotePricing: The price of every part and the totals of the quote.
     """
-    items = []
+    from xlsxwriter.utility import xl_col_to_name
 
-    matches = re.finditer(regex, text, re.MULTILINE)
-    for match in matches:
-        items.extend(iter(match.groups()))
+    from excel_file import ExcelFile
+    from pricing import QuotePricing
 
-    return items
-
-def generate_excel_file(*args, file_name: str):
-    """
-    It takes in a bunch of lists and generates an excel file with a bunch of data
-
-    Args:
-      file_name (str): str = The name of the excel file.
-    """
     print("[ ] Generating excel sheet")
+    config = get_config()
+    parts = quote.get_parts()
+    file_names = quote.file_names
+    last_nest = quote.last_nest
+    with profiler.stage("pricing"):
+        # The info sheet is filled from the same price list, so the price files being read again in the
+        # middle of a workbook can not give it two sets of prices.
+        price_list = get_price_list()
+        pricing = QuotePricing(parts, last_nest.cutting_with, price_list)
+        # The sheet cost formula looks up the material and thickness of the part on row 6.
+        if len(parts) > 1:
+            pricing.price_sheets(
+                last_nest.sheet_dim, quote.total_sheet_count, parts[1].material, parts[1].gauge, price_list
+            )
 
-    if args[12] == "go":  # Work sheet directory
+    if action == "go":  # Work sheet directory
         excel_document = ExcelFile(
-            file_name=f"{path_to_save_workorders}/{file_name}.xlsm",
-            program_directory=program_directory
+            file_name=f"{config.path_to_save_workorders}/{file_name}.xlsm",
+            program_directory=program_directory,
+            constant_memory=constant_memory,
         )
     else:  # Quote directory
         excel_document = ExcelFile(
-            file_name=f"{path_to_save_quotes}/{file_name}.xlsm",
-            program_directory=program_directory
+            file_name=f"{config.path_to_save_quotes}/{file_name}.xlsm",
+            program_directory=program_directory,
+            constant_memory=constant_memory,
         )
-    # excel_document.create_sheet(sheet_name="info")
-    excel_document.add_list_to_sheet(cell="A1", items=materials)
-    excel_document.add_list_to_sheet(cell="A2", items=gauges)
+
+    headers = [
+        "Item",
+        "Part name",
+        "Machining time (min)",
+        "Weight (lb)",
+        "Material",
+        "Thickness",
+        "Qty",
+        "COGS",
+        "Overhead",
+        "Unit Price",
+        "Price",
+        "Cutting Length (in)",
+        "Surface Area (in2)",
+        "Piercing Time (sec)",
+        "Total Cost",
+    ]
+    STARTING_ROW: int = 5
+
+    last_row: int = len(parts) + STARTING_ROW - 1
+    totals_row: int = last_row + 1
+
+    def column(header: str) -> str:
+        # In constant memory mode there is no table, so the totals point at the part rows directly.
+        if not constant_memory:
+            return f"Table1[{header}]"
+        col = xl_col_to_name(headers.index(header))
+        return f"Sheet!${col}${STARTING_ROW}:${col}${last_row}"
+
+    # Every row below is written once and in order, on both sheets, so that in constant memory mode
+    # XlsxWriter can flush each row to disk as soon as the next one is started.
+    excel_document.set_row_hidden_sheet(cell="A1", hidden=True)
+    excel_document.set_row_hidden_sheet(cell="A2", hidden=True)
+    excel_document.set_row_hidden_sheet(cell="A3", hidden=True)
+    excel_document.set_row_hidden_sheet(cell="A4", hidden=True)
+    excel_document.set_row_hidden_sheet(cell="A5", hidden=True)
+    excel_document.set_row_hidden_sheet(cell="A6", hidden=True)
+    excel_document.add_list_to_sheet(cell="A1", items=config.materials)
+    excel_document.add_list_to_sheet(cell="A2", items=config.gauges)
     excel_document.add_list_to_sheet(
         cell="A3", items=["Nitrogen", "CO2", "Packing Slip", "Quote", "Work Order"]
     )
     excel_document.add_list_to_sheet(
         cell="A4",
-        items=[nitrogen_cost_per_hour, co2_cost_per_hour],
+        items=[config.nitrogen_cost_per_hour, config.co2_cost_per_hour],
     )
     excel_document.add_list_to_sheet(
         cell="A5",
-        items=list(sheet_prices["Price Per Pound"].keys()),
+        items=list(price_list.price_per_pound.keys()),
     )
-    excel_document.add_list_to_sheet(
-        cell="A6",
-        items=[
-            sheet_prices["Price Per Pound"][sheet_name]["price"]
-            for sheet_name in list(sheet_prices["Price Per Pound"].keys())
-        ],
-    )
-    excel_document.set_row_hidden_sheet(cell="A1", hidden=True)
-    excel_document.set_row_hidden_sheet(cell="A2", hidden=True)
-    excel_document.set_row_hidden_sheet(cell="A3", hidden=True)
-    excel_document.set_row_hidden_sheet(cell="A4", hidden=True)
-    excel_document.set_row_hidden_sheet(cell="A5", hidden=True)
-    excel_document.set_row_hidden_sheet(cell="A6", hidden=True)
+    excel_document.add_list_to_sheet(cell="A6", items=list(price_list.price_per_pound.values()))
 
     excel_document.add_list_to_sheet(
         cell="A7",
-        items=["Total parts: ", "", "", "=ROWS(Table1[Part name])"],
+        items=["Total parts: ", "", "", f"=ROWS({column('Part name')})"],
+        values=[None, None, None, pricing.total_parts],
     )
     excel_document.add_list_to_sheet(
         cell="A8",
@@ -320,7 +244,7 @@ def generate_excel_file(*args, file_name: str):
             "Total machine time (min): ",
             "",
             "",
-            "=SUMPRODUCT(Table1[Machining time (min)],Table1[Qty])",
+            f"=SUMPRODUCT({column('Machining time (min)')},{column('Qty')})",
             "Total machine time (hour):",
             "",
             "",
@@ -330,6 +254,8 @@ def generate_excel_file(*args, file_name: str):
             "done at: ",
             "=NOW()+($D$6/1440)",
         ],
+        # The formulas after the total have no stored value, Excel calculates them when it opens the workbook.
+        values=[None, None, None, pricing.total_machining_time] + [None] * 8,
     )
     excel_document.add_list_to_sheet(
         cell="A9",
@@ -337,12 +263,14 @@ def generate_excel_file(*args, file_name: str):
             "Total weight (lb): ",
             "",
             "",
-            "=SUMPRODUCT(Table1[Weight (lb)],Table1[Qty])",
+            f"=SUMPRODUCT({column('Weight (lb)')},{column('Qty')})",
         ],
+        values=[None, None, None, pricing.total_weight],
     )
     excel_document.add_list_to_sheet(
         cell="A10",
-        items=["Total quantities: ", "", "", "=SUM(Table1[Qty])"],
+        items=["Total quantities: ", "", "", f"=SUM({column('Qty')})"],
+        values=[None, None, None, pricing.total_quantity],
     )
     excel_document.add_list_to_sheet(
         cell="A11",
@@ -350,8 +278,9 @@ def generate_excel_file(*args, file_name: str):
             "Total surface area (in2): ",
             "",
             "",
-            "=SUMPRODUCT(Table1[Surface Area (in2)],Table1[Qty])",
+            f"=SUMPRODUCT({column('Surface Area (in2)')},{column('Qty')})",
         ],
+        values=[None, None, None, pricing.total_surface_area],
     )
     excel_document.add_list_to_sheet(
         cell="A12",
@@ -359,8 +288,9 @@ def generate_excel_file(*args, file_name: str):
             "Total cutting length (in): ",
             "",
             "",
-            "=SUMPRODUCT(Table1[Cutting Length (in)],Table1[Qty])",
+            f"=SUMPRODUCT({column('Cutting Length (in)')},{column('Qty')})",
         ],
+        values=[None, None, None, pricing.total_cutting_length],
     )
     excel_document.add_list_to_sheet(
         cell="A13",
@@ -368,53 +298,24 @@ def generate_excel_file(*args, file_name: str):
             "Total piercing time (sec): ",
             "",
             "",
-            "=SUMPRODUCT(Table1[Piercing Time (sec)],Table1[Qty])",
+            f"=SUMPRODUCT({column('Piercing Time (sec)')},{column('Qty')})",
         ],
+        values=[None, None, None, pricing.total_piercing_time],
     )
     excel_document.add_item_to_sheet(
         cell="A14",
-        item=f"{len(args[5])} files loaded",
+        item=f"{len(file_names)} files loaded",
     )
-    excel_document.add_list_to_sheet(cell="A15", items=args[5], horizontal=False)
-    excel_document.add_list_to_sheet(cell=f"A{15+len(args[5])}", items=['Gauge'] + list(price_of_steel_information['pounds_per_square_foot'].keys()), horizontal=True)
-    excel_document.add_list_to_sheet(cell=f"A{16+len(args[5])}", items=list(price_of_steel_information['pounds_per_square_foot']['304 SS'].keys()), horizontal=False)
-    temp_col = {0: "B", 1: "C",2: "D", 3: "E",4:"F", 5: "G", 6: "H"}
-    for i, sheet_name in enumerate(list(price_of_steel_information['pounds_per_square_foot'].keys())):
-        for j, thickness in enumerate(price_of_steel_information['pounds_per_square_foot'][sheet_name]):
-            excel_document.add_item_to_sheet(cell=f"{temp_col[i]}{16+len(args[5])+j}", item=price_of_steel_information['pounds_per_square_foot'][sheet_name][thickness])
-
-    excel_document.add_image(cell="A1", path_to_image=f"{program_directory}/logo.png")
-    excel_document.set_cell_height(cell="A1", height=33)
-    excel_document.set_cell_height(cell="A2", height=34)
-    excel_document.set_cell_height(cell="A3", height=34)
-    if args[12] == 'go':
-        excel_document.add_item(cell="E1", item="Work Order")
-    else:
-        excel_document.add_item(cell="E1", item="Packing Slip")
-    excel_document.add_item(cell="E2", item="Order #")
-    excel_document.add_list(cell="F1", items=["", "", "", "", "", "", "", "", ""])
-    excel_document.add_list(cell="F2", items=["", "", "", "", "", "", "", "", ""])
-    excel_document.add_list(cell="F3", items=["", ""])
-    excel_document.add_item(cell="A3", item="Date Shipped:")
-    excel_document.add_item(cell="E3", item="Ship To:")
-
-    headers = [
-        "Item",
-        "Part name",
-        "Machining time (min)",
-        "Weight (lb)",
-        "Material",
-        "Thickness",
-        "Qty",
-        "COGS",
-        "Overhead",
-        "Unit Price",
-        "Price",
-        "Cutting Length (in)",
-        "Surface Area (in2)",
-        "Piercing Time (sec)",
-        "Total Cost",
-    ]
+    excel_document.add_list_to_sheet(cell="A15", items=file_names, horizontal=False)
+    pounds_per_square_foot = price_list.pounds_per_square_foot
+    excel_document.add_list_to_sheet(cell=f"A{15+len(file_names)}", items=['Gauge'] + list(pounds_per_square_foot.keys()), horizontal=True)
+    for j, (thickness, pounds) in enumerate(
+        itertools.zip_longest(
+            pounds_per_square_foot["304 SS"].keys(),
+            itertools.zip_longest(*[sheet.values() for sheet in pounds_per_square_foot.values()]),
+        )
+    ):
+        excel_document.write_row_to_sheet(15 + len(file_names) + j, 0, [thickness, *(pounds or ())])
 
     excel_document.set_cell_width(cell="A1", width=15)
     excel_document.set_cell_width(cell="B1", width=22)
@@ -436,53 +337,59 @@ def generate_excel_file(*args, file_name: str):
     excel_document.set_col_hidden(cell="M1", hidden=True)
     excel_document.set_col_hidden(cell="N1", hidden=True)
     excel_document.set_col_hidden(cell="O1", hidden=True)
+    if action == "go":
+        excel_document.set_col_hidden("J1", True)
+        excel_document.set_col_hidden("K1", True)
 
+    excel_document.add_image(cell="A1", path_to_image=f"{program_directory}/logo.png")
+    excel_document.set_cell_height(cell="A1", height=33)
+    excel_document.set_cell_height(cell="A2", height=34)
+    excel_document.set_cell_height(cell="A3", height=34)
+    excel_document.add_header(title="Work Order" if action == "go" else "Packing Slip")
+    excel_document.add_list(cell="H1", items=["", ""])
+    excel_document.add_list(cell="L1", items=["", "", ""])
+    excel_document.add_item(cell="S1", item="Overhead:")
+    excel_document.add_item(cell="T1", item=config.overhead, number_format="0%")
+
+    excel_document.add_item(cell="E2", item="Order #")
+    excel_document.add_list(cell="F2", items=["", "", "", "", "", "", "", "", ""])
     excel_document.add_item(cell="P2", item="Laser cutting:")
-    excel_document.add_item(cell="Q2", item=args[10])
+    excel_document.add_item(cell="Q2", item=last_nest.cutting_with)
+    excel_document.add_item(cell="S2", item="Profit Margin:")
+    excel_document.add_item(cell="T2", item=config.profit_margin, number_format="0%")
     excel_document.add_dropdown_selection(
         cell="Q2", type="list", location="'info'!$A$3:$B$3"
     )
     excel_document.add_dropdown_selection(
         cell="E1", type="list", location="'info'!$C$3:$E$3"
     )
-    STARTING_ROW: int = 5
 
-    for index in range(len(args[0])):
-        row: int = index + STARTING_ROW
-        excel_document.add_dropdown_selection(
-            cell=f"E{row}", type="list", location="'info'!$A$1:$H$1"
-        )
-        excel_document.add_dropdown_selection(
-            cell=f"F{row}", type="list", location="'info'!$A$2:$K$2"
+    excel_document.add_item(cell="A3", item="Date Shipped:")
+    excel_document.add_item(cell="E3", item="Ship To:")
+    excel_document.add_list(cell="F3", items=["", ""])
+
+    if constant_memory:
+        excel_document.add_headers(cell=f"A{STARTING_ROW-1}", headers=headers)
+    else:
+        # The totals row is the table's total row.
+        excel_document.add_table(
+            display_name="Table1",
+            theme="TableStyleLight8",
+            location=f"A{STARTING_ROW-1}:O{totals_row}",
+            headers=headers,
         )
 
-        excel_document.add_item(
-            cell=f"B{row}", item=args[0][index]
-        )  # File name B
-        excel_document.add_item(
-            cell=f"C{row}", item=args[1][index]
-        )  # Machine Time C
-        excel_document.add_item(
-            cell=f"D{row}", item=args[2][index]
-        )  # Weight D
-        excel_document.add_item(
-            cell=f"E{row}", item=args[9][index]
-        )  # Material Type E
-        excel_document.add_item(
-            cell=f"F{row}", item=args[8][index]
-        )  # Gauge Selection F
-        excel_document.add_item(
-            cell=f"G{row}", item=args[3][index]
-        )  # Quantity G
-        excel_document.add_item(
-            cell=f"L{row}", item=args[6][index]
-        )  # Cutting Length L
-        excel_document.add_item(
-            cell=f"M{row}", item=args[7][index]
-        )  # Surface Area M
-        excel_document.add_item(
-            cell=f"N{row}", item=args[11][index]
-        )  # Piercing Time N
+    excel_document.add_dropdown_selection_to_rows(
+        STARTING_ROW - 1, last_row - 1, 4, type="list", location="'info'!$A$1:$H$1"
+    )  # Material Type E
+    excel_document.add_dropdown_selection_to_rows(
+        STARTING_ROW - 1, last_row - 1, 5, type="list", location="'info'!$A$2:$K$2"
+    )  # Gauge Selection F
+    money_format = "$#,##0.00"
+    part_number_formats = [None] * 6 + [money_format] * 4 + [None] * 3 + [money_format]
+
+    for index, part in enumerate(parts):
+        row: int = index + STARTING_ROW
         cost_for_weight = (
             f"INDEX(info!$A$6:$G$6,MATCH($E${row},info!$A$5:$G$5,0))*$D${row}"
         )
@@ -490,185 +397,271 @@ def generate_excel_file(*args, file_name: str):
             f"(INDEX('info'!$A$4:$B$4,MATCH($Q$2,'info'!$A$3:$B$3,0))/60)*$C${row}"
         )
         quantity = f"$G{row}"
-        excel_document.add_item(
-            cell=f"H{row}",
-            item=f"=({cost_for_weight}+{cost_for_time})",
-            number_format="$#,##0.00",
-        )  # Cost
-
         overhead = f"$J{row}*($T$1)"
-        excel_document.add_item(
-            cell=f"I{row}",
-            item=f"={overhead}",
-            number_format="$#,##0.00",
-        )  # Overhead
-
         unit_price = f"CEILING(($O{row})/(1-$T$2),0.01)"
-        excel_document.add_item(
-            cell=f"J{row}",
-            item=f"={unit_price}",
-            number_format="$#,##0.00",
-        )  # Unit Price
-
         price = f"CEILING({quantity}*J{row},0.01)"
-        excel_document.add_item(
-            cell=f"K{row}",
-            item=f"={price}",
-            number_format="$#,##0.00",
-        )  # Price
-
         total_cost = f"CEILING($H{row}+$I{row},0.01)"
-        excel_document.add_item(
-            cell=f"O{row}",
-            item=f"={total_cost}",
-            number_format="$#,##0.00",
-        )  # Total Cost
+        cogs_value, overhead_value, unit_price_value, price_value, total_cost_value = pricing.get_row(index)
+        excel_document.set_row_height(row - 1, 78)
+        excel_document.write_row(
+            row - 1,
+            1,
+            [
+                part.part_name,  # File name B
+                part.machining_time,  # Machine Time C
+                part.weight,  # Weight D
+                part.material,  # Material Type E
+                part.gauge,  # Gauge Selection F
+                part.quantity,  # Quantity G
+                f"=({cost_for_weight}+{cost_for_time})",  # Cost H
+                f"={overhead}",  # Overhead I
+                f"={unit_price}",  # Unit Price J
+                f"={price}",  # Price K
+                part.cutting_length,  # Cutting Length L
+                part.surface_area,  # Surface Area M
+                part.piercing_time,  # Piercing Time N
+                f"={total_cost}",  # Total Cost O
+            ],
+            number_formats=part_number_formats,
+            values=[None] * 6
+            + [cogs_value, overhead_value, unit_price_value, price_value]
+            + [None] * 3
+            + [total_cost_value],
+        )
 
         # Image
-        excel_document.add_image(
-            cell=f"A{row}",
-            path_to_image=f"{program_directory}/images/{args[4][index]}.jpeg",
+        excel_document.insert_image(
+            row - 1,
+            0,
+            path_to_image=thumbnails.get_file_name(part.image_index),
+            image_data=thumbnails.get_image_data(part.image_index),
         )
+    excel_document.add_item(cell=f"P{last_row}", item=f"Scrap: {last_nest.scrap_percentage}%", totals=False)
 
-        excel_document.set_cell_height(cell=f"A{row}", height=78)
-
-    excel_document.add_table(
-        display_name="Table1",
-        theme="TableStyleLight8",
-        location=f"A{STARTING_ROW-1}:O{index+STARTING_ROW}",
-        headers=headers,
-    )
-    excel_document.add_item(cell=f"A{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"B{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"C{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"D{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"E{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"F{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"P{index+STARTING_ROW}", item=f"Scrap: {args[14]}%", totals=False)
-    excel_document.add_item(cell=f"P{index+STARTING_ROW+1}", item=f"Sheets:", totals=False)
-    excel_document.add_item(cell=f"Q{index+STARTING_ROW+1}", item=args[13], totals=False)
+    excel_document.write_row(totals_row - 1, 0, ["", ""], totals=True)
     excel_document.add_item(
-        cell=f"C{index+STARTING_ROW+1}",
-        item="=SUMPRODUCT(Table1[Machining time (min)],Table1[Qty])",
+        cell=f"C{totals_row}",
+        item=f"=SUMPRODUCT({column('Machining time (min)')},{column('Qty')})",
+        value=pricing.total_machining_time,
         totals=True,
     )
     excel_document.add_item(
-        cell=f"D{index+STARTING_ROW+1}",
-        item="=SUMPRODUCT(Table1[Weight (lb)],Table1[Qty])",
+        cell=f"D{totals_row}",
+        item=f"=SUMPRODUCT({column('Weight (lb)')},{column('Qty')})",
+        value=pricing.total_weight,
         totals=True,
     )
-    excel_document.add_item(cell=f"R{index+STARTING_ROW+1}", item="Total:", totals=False)
-    sheet_dim_left = f'TEXTAFTER("{args[15]}", "x")'
-    sheet_dim_right = f'TEXTBEFORE("{args[15]}", "x")'
-    price_per_pound = "INDEX(info!$A$6:$G$6,MATCH($E$6, info!$A$5:$G$5,0))"
-    pounds_per_sheet = f'INDEX(info!$B${16+len(args[5])}:$H${16+len(args[5])+15},MATCH($F$6,info!$A${16+len(args[5])}:$A${16+len(args[5])+15},0),MATCH($E$6,info!$B${15+len(args[5])}:$H${15+len(args[5])},0))'
-    sheet_quantity = f'Q{index+STARTING_ROW+1}'
-    excel_document.add_item(cell=f"S{index+STARTING_ROW+1}", item=f'={sheet_dim_right}*{sheet_dim_left}/144*{price_per_pound}*{pounds_per_sheet}*{sheet_quantity}', number_format="$#,##0.00", totals=False)
-    excel_document.add_item(cell=f"G{index+STARTING_ROW+1}", item="", totals=True)
-    excel_document.add_item(cell=f"J{index+STARTING_ROW+1}", item="Total: ", totals=True)
+    excel_document.write_row(totals_row - 1, 4, ["", "", ""], totals=True)
     excel_document.add_item(
-        cell=f"H{index+STARTING_ROW+1}",
-        item="=SUM(Table1[COGS])",
+        cell=f"H{totals_row}",
+        item=f"=SUM({column('COGS')})",
         number_format="$#,##0.00",
+        value=pricing.total_cogs,
         totals=True,
     )
     excel_document.add_item(
-        cell=f"I{index+STARTING_ROW+1}",
-        item="=SUM(Table1[Overhead])",
+        cell=f"I{totals_row}",
+        item=f"=SUM({column('Overhead')})",
         number_format="$#,##0.00",
+        value=pricing.total_overhead,
         totals=True,
     )
+    excel_document.add_item(cell=f"J{totals_row}", item="Total: ", totals=True)
     excel_document.add_item(
-        cell=f"K{index+STARTING_ROW+1}",
-        item="=SUM(Table1[Price])",
+        cell=f"K{totals_row}",
+        item=f"=SUM({column('Price')})",
         number_format="$#,##0.00",
+        value=pricing.total_price,
         totals=True,
     )
-    excel_document.add_item(cell=f"K{index+STARTING_ROW+2}", item="No Tax Included")
     excel_document.add_item(
-        cell=f"B{index+STARTING_ROW+2}",
-        item="Payment past due date will receive 1.5% interest rate per month of received goods.",
+        cell=f"L{totals_row}",
+        item=f"=SUMPRODUCT({column('Cutting Length (in)')},{column('Qty')})",
+        value=pricing.total_cutting_length,
+        totals=True,
     )
     excel_document.add_item(
-        cell=f"L{index+STARTING_ROW+1}",
-        item="=SUMPRODUCT(Table1[Cutting Length (in)],Table1[Qty])",
+        cell=f"M{totals_row}",
+        item=f"=SUMPRODUCT({column('Surface Area (in2)')},{column('Qty')})",
+        value=pricing.total_surface_area,
         totals=True,
     )
     excel_document.add_item(
-        cell=f"M{index+STARTING_ROW+1}",
-        item="=SUMPRODUCT(Table1[Surface Area (in2)],Table1[Qty])",
+        cell=f"N{totals_row}",
+        item=f"=SUMPRODUCT({column('Piercing Time (sec)')},{column('Qty')})",
+        value=pricing.total_piercing_time,
         totals=True,
     )
     excel_document.add_item(
-        cell=f"N{index+STARTING_ROW+1}",
-        item="=SUMPRODUCT(Table1[Piercing Time (sec)],Table1[Qty])",
+        cell=f"O{totals_row}",
+        item=f"=SUM({column('Total Cost')})",
+        value=pricing.total_cost_sum,
         totals=True,
     )
+    excel_document.add_item(cell=f"P{totals_row}", item=f"Sheets:", totals=False)
+    excel_document.add_item(cell=f"Q{totals_row}", item=quote.total_sheet_count, totals=False)
+    excel_document.add_item(cell=f"R{totals_row}", item="Total:", totals=False)
+    sheet_dim_left = f'TEXTAFTER("{last_nest.sheet_dim}", "x")'
+    sheet_dim_right = f'TEXTBEFORE("{last_nest.sheet_dim}", "x")'
+    price_per_pound = "INDEX(info!$A$6:$G$6,MATCH($E$6, info!$A$5:$G$5,0))"
+    pounds_per_sheet = f'INDEX(info!$B${16+len(file_names)}:$H${16+len(file_names)+15},MATCH($F$6,info!$A${16+len(file_names)}:$A${16+len(file_names)+15},0),MATCH($E$6,info!$B${15+len(file_names)}:$H${15+len(file_names)},0))'
+    sheet_quantity = f'Q{totals_row}'
+    excel_document.add_item(cell=f"S{totals_row}", item=f'={sheet_dim_right}*{sheet_dim_left}/144*{price_per_pound}*{pounds_per_sheet}*{sheet_quantity}', number_format="$#,##0.00", totals=False, value=pricing.sheet_cost)
+
     excel_document.add_item(
-        cell=f"O{index+STARTING_ROW+1}",
-        item="=SUM(Table1[Total Cost])",
-        totals=True,
+        cell=f"B{totals_row+1}",
+        item="Payment past due date will receive 1.5% interest rate per month of received goods.",
     )
+    excel_document.add_item(cell=f"K{totals_row+1}", item="No Tax Included")
     excel_document.add_item(
-        cell=f"A{index+STARTING_ROW+4}",
+        cell=f"A{totals_row+3}",
         item="Date expected:",
     )
     excel_document.add_item(
-        cell=f"A{index+STARTING_ROW+6}",
-        item="_______________________",
+        cell=f"E{totals_row+3}",
+        item="Received in good order by:",
     )
     excel_document.add_item(
-        cell=f"E{index+STARTING_ROW+4}",
-        item="Received in good order by:",
+        cell=f"A{totals_row+5}",
+        item="_______________________",
     )
     excel_document.add_item(
-        cell=f"E{index+STARTING_ROW+6}",
+        cell=f"E{totals_row+5}",
         item="______________________________",
     )
 
-    excel_document.add_item(cell="S1", item="Overhead:")
-    excel_document.add_item(cell="T1", item=OVERHEAD, number_format="0%")
-
-    excel_document.add_item(cell="S2", item="Profit Margin:")
-    excel_document.add_item(cell="T2", item=PROFIT_MARGIN, number_format="0%")
-
-    excel_document.set_print_area(cell=f"A1:K{index + STARTING_ROW+6}")
+    excel_document.set_print_area(cell=f"A1:K{totals_row+5}")
 
     print("\t[ ] Injecting macro.bin")
-    excel_document.add_macro(macro_path=f"{program_directory}/macro.bin")
-
-    if args[12] == "go":
-        excel_document.set_col_hidden("J1", True)
-        excel_document.set_col_hidden("K1", True)
+    with profiler.stage("excel.macro"):
+        excel_document.add_macro(macro_path=f"{program_directory}/macro.bin")
 
     print("\t[+] Injected macro.bin")
-    excel_document.save()
+    with profiler.stage("excel.save"):
+        excel_document.save()
+    profiler.count("excel_bytes_written", os.path.getsize(excel_document.file_name))
     print("[+] Excel sheet generated.")
-    os.remove("action")
+    return pricing
+
+
+def get_nest_cache() -> "NestCache":
+    """
+    Returns:
+      NestCache: The cache of parsed nest reports in the program directory.
+    """
+    from nest_cache import NestCache
+
+    return NestCache(f"{program_directory}/cache", get_config().cache_size_mb * 1024 * 1024)
+
+
+def print_upload_status(batch_id: str, status: str, message: str) -> None:
+    """It tells how an upload to inventory is going, it is called from the outbox's thread."""
+    if status == "sent":
+        print(f"[+] Batch {batch_id} was sent to inventory.")
+    elif status == "failed":
+        print(f"[-] Inventory did not take batch {batch_id}: {message}")
+    elif status == "retrying":
+        print(f"[-] Could not send batch {batch_id} to inventory, it will be sent again: {message}")
 
 
-def save_json_file(dictionary: dict, file_name: str) -> None:
+@functools.cache
+def get_outbox() -> "Outbox":
     """
-    It takes a dictionary and a file name as arguments, and then saves the dictionary as a json file
-    with the given file name
+    Returns:
+      Outbox: The outbox of uploads to inventory in the program directory, started, so batches left
+    over from an earlier run are sent again.
+    """
+    from outbox import Outbox
+    from upload_client import send_batch
+
+    outbox = Outbox(f"{program_directory}/outbox", send_batch, on_status=print_upload_status)
+    outbox.start()
+    return outbox
+
+
+def build_quote(
+    file_names: list,
+    material: str,
+    progress_bar,
+    debug_output_directory: str | None = None,
+    use_cache: bool = True,
+    executor: "Executor | None" = None,
+    ingested_nests: list[tuple[Nest, list[tuple[bytes, str, str]]]] | None = None,
+) -> tuple[Quote, "ThumbnailStore"]:
+    """
+    It extracts the parts and thumbnails of every nest report and puts them together in one quote
 
     Args:
-      dictionary (dict): The dictionary you want to save.
-      file_name (str): The name of the file you want to save.
+      file_names (list): The paths to the nest reports.
+      material (str): The material the quote is for, plates thicker than 1/2" are always "Laser Grade
+    Plate".
+      progress_bar: a function that will be called after each PDF is processed.
+      debug_output_directory (str | None): if given, the text of every PDF is dumped to this directory.
+      use_cache (bool): look up and store parsed PDFs in the nest cache. Defaults to True.
+      executor (Executor | None): worker processes that are already running to parse the PDFs in, see
+    `nest_ingest.ingest_nest_pdfs`. Defaults to None.
+      ingested_nests (list | None): what `nest_ingest.ingest_nest_pdfs` returned for `file_names`, when
+    they were already parsed, so they are not parsed again. Defaults to None.
+
+    Returns:
+      tuple[Quote, ThumbnailStore]: The quote and the thumbnails of its parts.
     """
-    with open(f"{program_directory}/excel files/{file_name}.json", "w") as fp:
-        json.dump(dictionary, fp, sort_keys=True, indent=4)
+    from nest_ingest import ingest_nest_pdfs
+    from thumbnails import ThumbnailStore
+
+    config = get_config()
+    if ingested_nests is None:
+        with profiler.stage("ingest"):
+            ingested_nests = ingest_nest_pdfs(
+                file_names,
+                config.size_of_picture,
+                config.workers,
+                progress_bar,
+                debug_output_directory,
+                cache=get_nest_cache() if use_cache else None,
+                executor=executor,
+            )
+
+    thumbnails = ThumbnailStore()
+    quote = Quote()
+    for file_name, (nest, nest_thumbnails) in zip(file_names, ingested_nests):
+        for image_bytes, image_ext, digest in nest_thumbnails:
+            thumbnails.add(image_bytes, image_ext, digest)
+
+        # material_for_part = convert_material_id_to_name(material=nest.material_id)
+        material_for_part = material
+        if int(nest.gauge_id) >= 50:  # More than 1/2 inch
+            material_for_part = "Laser Grade Plate"
+        quote.add_nest(
+            nest,
+            file_name=file_name,
+            material=material_for_part,
+            gauge=convert_material_id_to_number(number_id=nest.gauge_id),
+            cutting_with=get_cutting_method(material=nest.material_id),
+        )
+    profiler.count("quote_parts", len(quote))
+    return quote, thumbnails
 
 
-def convert(file_names: list):  # sourcery skip: low-code-quality
+def convert(
+    file_names: list, debug_output_directory: str | None = None, use_cache: bool = True
+):  # sourcery skip: low-code-quality
     """
     It takes a list of file names, extracts the images from the PDFs, converts the PDFs to text,
     extracts the data from the text, and then generates an excel file and a JSON file
 
     Args:
       file_names (list): list
+      debug_output_directory (str | None): if given, the text of every PDF is dumped to this directory.
+      use_cache (bool): look up and store parsed PDFs in the nest cache. Defaults to True.
     """
+    import tkinter as tk
+
+    from alive_progress import alive_bar
+
+    import gui
 
+    config = get_config()
     choicewin = tk.Tk()
     choicewin.resizable(False, False)
     choicewin.lift()
@@ -678,252 +671,374 @@ def convert(file_names: list):  # sourcery skip: low-code-quality
     choicewin.minsize(width, height)
     choicewin.maxsize(width, height)
     choicewin.title("Choose Material")
-    t_materials = materials
-    t_materials.insert(0, "304 SS")
+    t_materials = ["304 SS"] + config.materials
     app = SelectionDialog(choicewin, t_materials)
     choicewin.mainloop()
     if material_selection == "":
         return
 
-    Path(f"{program_directory}/images").mkdir(parents=True, exist_ok=True)
+    # Started now, so work orders left in the outbox by an earlier run are sent while this one is made.
+    outbox = get_outbox()
     today = datetime.now()
     current_time = today.strftime("%Y-%m-%d-%H-%M-%S")
 
-    with alive_bar(
-        2 + (len(file_names) * 4),
-        dual_line=True,
-        title="Generating",
-        force_tty=True,
-        theme="smooth",
-    ) as progress_bar:
-        part_dictionary = {}
-        part_names = []
-        quantity_numbers = []
-        machining_times_numbers = []
-        weights_numbers = []
-        part_numbers = []
-        surface_areas_numbers = []
-        cutting_lengths_numbers = []
-        piercing_time_numbers = []
-        material_for_parts = []
-        gauge_for_parts = []
-        quantity_multiplier: int = 1
-        scrap_percentage: float = 0
-        total_sheet_count: int = 0
-
-        progress_bar.text = "-> Getting images, please wait..."
-        extract_images_from_pdf(file_names, progress_bar)
-        progress_bar()
-
-        for file_name in file_names:
-            progress_bar.text = "-> Getting text, please wait..."
-
-            progress_bar.text = "-> Getting all data, please wait..."
-            convert_pdf_to_text([file_name], progress_bar)
+    # Closed however this ends, also when the window is closed, so a batch it claimed is given back.
+    try:
+        with alive_bar(
+            3 + len(file_names),
+            dual_line=True,
+            title="Generating",
+            force_tty=True,
+            theme="smooth",
+        ) as progress_bar:
+            progress_bar.text = "-> Getting images and text, please wait..."
+            quote, thumbnails = build_quote(
+                file_names, material_selection, progress_bar, debug_output_directory, use_cache
+            )
             progress_bar()
 
-            quantity_multiplier = get_table_value_from_text(regex=sheet_quantity_regex)[0]
-            quantity_multiplier = int(
-                quantity_multiplier.replace("PROGRAMME RUNS:  /  SCRAP: ", "").replace(
-                    "PROGRAM RUNS:  /  SCRAP: ", ""
-                )
-            )
-            total_sheet_count += quantity_multiplier
-            scrap_percentage_string = get_table_value_from_text(regex=sheet_scrap_percentage_regex)[0]
-            scrap_percentage: float = float(get_value_from_string(regex=scrap_percentage_regex, text=scrap_percentage_string)[0])
-            sheet_dim: str = get_table_value_from_text(regex=sheet_dim_regex)[0].replace(
-                " ", ""
-            )
-            # material_for_part = convert_material_id_to_name(
-            # material=get_table_value_from_text(regex=material_id_regex)[0]
-            # )
-            material_for_part = material_selection
-            gauge_for_part = convert_material_id_to_number(
-                number_id=get_table_value_from_text(regex=gauge_regex)[0],
+            json_file_path = f"{program_directory}/excel files/{current_time}.json"
+            quote.save(json_file_path)
+
+            with profiler.stage("review"):
+                decision = gui.load_gui(quote, json_file_path, material_selection, thumbnails)
+            if decision is None:  # The window was closed without making anything
+                return
+            decision.apply(quote)
+            if decision.action == "go":
+                # It is sent in the background while the work order is made.
+                outbox.add("laser_parts_list_upload", json_file_path)
+
+            progress_bar.text = "-> Generating excel sheet, please wait..."
+            progress_bar()
+
+            pricing = generate_excel_file(
+                quote,
+                decision.action,
+                file_name=current_time,
+                thumbnails=thumbnails,
+                constant_memory=len(quote) >= config.constant_memory_part_count,
             )
 
-            if (
-                int(get_table_value_from_text(regex=gauge_regex)[0]) >= 50
-            ):  # More than 1/2 inch
-                material_for_part = "Laser Grade Plate"
-            cutting_with = get_cutting_method(
-                material=get_table_value_from_text(regex=material_id_regex)[0]
+            print(f"[+] {pricing.total_parts} parts, total price ${pricing.total_price:,.2f}")
+            print(f'Opening "{program_directory}/excel files/{current_time}.xlsm"')
+
+            progress_bar()
+            progress_bar.text = "-> Finished! :)"
+
+            if decision.action == "go":
+                os.startfile(f'"{config.path_to_save_workorders}/{current_time}.xlsm"')
+    finally:
+        if not outbox.close(timeout=config.upload_flush_seconds):
+            print(
+                "[-] Some work orders could not be sent to inventory yet, they are sent the next time a quote "
+                "is made."
             )
-            part_dictionary["_" + file_name] = {
-                "quantity_multiplier": quantity_multiplier,
-                "gauge": gauge_for_part,
-                "material": material_for_part,
-                "sheet_dim": sheet_dim,
-            }
-            part_file_paths = get_table_value_from_text(regex=geofile_name_regex)
-
-            for part_name in part_file_paths:
-                part_name = (
-                    part_name.split("\\")[-1]
-                    .replace("\n", "")
-                    .replace(".GEO", "")
-                    .strip()
-                )
-                part_dictionary[part_name] = {
-                    "quantity": 0,
-                    "machine_time": 0.0,
-                    "weight": 0.0,
-                    "part_number": 0,
-                    "image_index": 0,
-                    "surface_area": 0,
-                    "cutting_length": 0,
-                    "file_name": file_name,
-                    "piercing_time": 0.0,
-                    "gauge": gauge_for_part,
-                    "material": material_for_part,
-                    "recut": False,
-                    "sheet_dim": sheet_dim,
-                }
-
-                part_names.append(part_name)
-
-            quantities = get_table_value_from_text(regex=quantity_regex)
-            for quantity in quantities:
-                quantity = quantity.replace("  NUMBER: ", "")
-                quantity_numbers.append((int(quantity) * quantity_multiplier))
-
-            machining_times = get_table_value_from_text(regex=machining_time_regex)
-            for machining_time in machining_times:
-                machining_time = machining_time.replace("MACHINING TIME: ", "").replace(
-                    " min", ""
-                )
-                machining_times_numbers.append(float(machining_time))
-
-            weights = get_table_value_from_text(regex=weight_regex)
-            for weight in weights:
-                weight = weight.replace("WEIGHT: ", "").replace(" lb", "")
-                weights_numbers.append(float(weight))
-
-            surface_areas = get_table_value_from_text(regex=surface_area_regex)
-            for surface_area in surface_areas:
-                surface_area = surface_area.replace("SURFACE: ", "").replace("  in2", "")
-                surface_areas_numbers.append(float(surface_area))
-
-            cutting_lengths = get_table_value_from_text(regex=cutting_length_regex)
-            for cutting_length in cutting_lengths:
-                cutting_length = cutting_length.replace("CUTTING LENGTH: ", "").replace(
-                    "  in", ""
-                )
-                cutting_lengths_numbers.append(float(cutting_length))
 
-            piercing_times = get_table_value_from_text(regex=piercing_time_regex)
-            for piercing_time in piercing_times:
-                piercing_time = piercing_time.replace("PIERCING TIME ", "").replace(
-                    "  s", ""
-                )
-                piercing_time_numbers.append(float(piercing_time))
-
-            part_numbers_string = get_table_value_from_text(regex=part_number_regex)
-            for part_number in part_numbers_string:
-                part_number = part_number.replace("PART NUMBER: ", "")
-                part_numbers.append(int(part_number))
-
-        for i, part_name in enumerate(part_names):
-            part_dictionary[part_name]["quantity"] += quantity_numbers[i]
-            part_dictionary[part_name]["machine_time"] = machining_times_numbers[i]
-            part_dictionary[part_name]["weight"] = weights_numbers[i]
-            part_dictionary[part_name]["part_number"] = part_numbers[i]
-            part_dictionary[part_name]["image_index"] = i
-            part_dictionary[part_name]["surface_area"] = surface_areas_numbers[i]
-            part_dictionary[part_name]["cutting_length"] = cutting_lengths_numbers[i]
-            part_dictionary[part_name]["piercing_time"] = piercing_time_numbers[i]
-
-        part_names.clear()
-        machining_times_numbers.clear()
-        part_numbers.clear()
-        quantity_numbers.clear()
-        weights_numbers.clear()
-        piercing_time_numbers.clear()
-        surface_areas_numbers.clear()
-        cutting_lengths_numbers.clear()
-        image_index = []
-
-        save_json_file(dictionary=part_dictionary, file_name=current_time)
-
-        gui.load_gui(
-            f"{program_directory}/excel files/{current_time}.json", material_selection
+
+class QuoteJob:
+    """A quote to make without any window, what the review window would have been told is given up front."""
+
+    __slots__ = ("name", "file_names", "material", "action", "quantities", "recuts")
+
+    def __init__(
+        self,
+        name: str,
+        file_names: list[str],
+        material: str,
+        action: str = "quote",
+        quantities: dict[str, int] | None = None,
+        recuts: list[str] | None = None,
+    ) -> None:
+        self.name = name
+        self.file_names = file_names
+        self.material = material
+        self.action = action
+        self.quantities = quantities or {}
+        self.recuts = recuts or []
+
+    @classmethod
+    def from_dict(cls, data: dict, name: str) -> "QuoteJob":
+        """
+        Args:
+          data (dict): A job from a job file, such as {"pdfs": ["a.pdf"], "material": "Mild Steel",
+        "action": "quote", "quantities": {"BRACKET": 10}, "recuts": ["BRACKET"]}. "name" is optional.
+          name (str): The name to use when the job does not have one.
+        """
+        return cls(
+            name=data.get("name", name),
+            file_names=list(data["pdfs"]),
+            material=data["material"],
+            action=data.get("action", "quote"),
+            quantities={part_name: int(quantity) for part_name, quantity in data.get("quantities", {}).items()},
+            recuts=list(data.get("recuts", [])),
         )
-        with open(f"{program_directory}/excel files/{current_time}.json", "r") as f:
-            part_dictionary = json.load(f)
 
-        for part_name in part_dictionary:
-            if part_name[0] != "_":
-                part_names.append(part_name)
 
-        for part in part_dictionary:
-            try:
-                machining_times_numbers.append(part_dictionary[part]["machine_time"])
-                part_numbers.append(part_dictionary[part]["part_number"])
-                quantity_numbers.append(part_dictionary[part]["quantity"])
-                weights_numbers.append(part_dictionary[part]["weight"])
-                image_index.append(part_dictionary[part]["image_index"])
-                material_for_parts.append(part_dictionary[part]["material"])
-                gauge_for_parts.append(part_dictionary[part]["gauge"])
-                piercing_time_numbers.append(part_dictionary[part]["piercing_time"])
-                cutting_lengths_numbers.append(part_dictionary[part]['cutting_length'])
-                surface_areas_numbers.append(part_dictionary[part]['surface_area'])
-            except KeyError:
-                continue
-
-        progress_bar.text = "-> Generating excel sheet, please wait..."
-        progress_bar()
+def parse_quantities(overrides: list[str]) -> dict[str, int]:
+    """
+    Args:
+      overrides (list[str]): Such as ["BRACKET=10", "GUSSET=4"].
 
-        try:
-            with open(f"{program_directory}/action", "r") as f:
-                action = f.read()
-        except Exception:
-            return
-
-        generate_excel_file(
-            part_names,                 #0
-            machining_times_numbers,    #1
-            weights_numbers,            #2
-            quantity_numbers,           #3
-            image_index,                #4
-            file_names,                 #5
-            surface_areas_numbers,      #6
-            cutting_lengths_numbers,    #7
-            gauge_for_parts,            #8
-            material_for_parts,         #9
-            cutting_with,               #10
-            piercing_time_numbers,      #11
-            action,                     #12 'go' or 'quote'
-            total_sheet_count,          #13
-            scrap_percentage,           #14
-            sheet_dim,                  #15
-            file_name=current_time,
-        )
+    Returns:
+      dict[str, int]: Such as {"BRACKET": 10, "GUSSET": 4}.
+    """
+    quantities: dict[str, int] = {}
+    for override in overrides:
+        part_name, separator, quantity = override.rpartition("=")
+        if not separator or not part_name:
+            raise ValueError(f'"{override}" is not PART=QUANTITY.')
+        quantities[part_name] = int(quantity)
+    return quantities
+
+
+def load_jobs(job_paths: list[str]) -> list[QuoteJob]:
+    """
+    Args:
+      job_paths (list[str]): JSON files holding one job or a list of jobs, see `QuoteJob.from_dict`.
+
+    Returns:
+      list[QuoteJob]: Every job of every file, in order.
+    """
+    jobs: list[QuoteJob] = []
+    for job_path in job_paths:
+        with open(job_path, "r") as f:
+            data = json.load(f)
+        job_list = data if isinstance(data, list) else [data]
+        for i, job in enumerate(job_list, start=1):
+            name = Path(job_path).stem if len(job_list) == 1 else f"{Path(job_path).stem}-{i}"
+            jobs.append(QuoteJob.from_dict(job, name))
+    return jobs
+
+
+def run_job(
+    job: QuoteJob,
+    use_cache: bool = True,
+    executor: "Executor | None" = None,
+    ingested_nests: list[tuple[Nest, list[tuple[bytes, str, str]]]] | None = None,
+) -> dict:
+    """
+    It makes a quote or a work order the way the review window would, with no windows at all
+
+    Args:
+      job (QuoteJob): What to quote.
+      use_cache (bool): look up and store parsed PDFs in the nest cache. Defaults to True.
+      executor (Executor | None): worker processes that are already running to parse the PDFs in.
+    Defaults to None, to start them for this job.
+      ingested_nests (list | None): the PDFs of the job, already parsed, see `build_quote`. Defaults to
+    None.
+
+    Raises:
+      ValueError: If the job has an unknown material or action, or changes a part that is not in the
+    quote.
+
+    Returns:
+      dict: A summary of what was made, for other programs to read. A work order is only put in the
+    outbox, "upload_batch" is its batch ID and `run_jobs` fills in how the upload went.
+    """
+    config = get_config()
+    if job.material not in ["304 SS"] + config.materials:
+        raise ValueError(f'Unknown material "{job.material}", expected one of {", ".join(config.materials)}.')
+    if job.action not in ("quote", "go"):
+        raise ValueError(f'Unknown action "{job.action}", expected "quote" or "go".')
+
+    quote, thumbnails = build_quote(
+        job.file_names,
+        job.material,
+        lambda: None,
+        use_cache=use_cache,
+        executor=executor,
+        ingested_nests=ingested_nests,
+    )
+    ReviewDecision(job.action, job.material, job.quantities, job.recuts).apply(quote)
+
+    json_file_path = f"{program_directory}/excel files/{job.name}.json"
+    quote.save(json_file_path)
+    pricing = generate_excel_file(
+        quote,
+        job.action,
+        file_name=job.name,
+        thumbnails=thumbnails,
+        constant_memory=len(quote) >= config.constant_memory_part_count,
+    )
 
-        print(f'Opening "{program_directory}/excel files/{current_time}.xlsm"')
+    upload_batch = None
+    if job.action == "go":
+        upload_batch = get_outbox().add("laser_parts_list_upload", json_file_path)
+    save_directory = config.path_to_save_workorders if job.action == "go" else config.path_to_save_quotes
+    return {
+        "name": job.name,
+        "ok": True,
+        "action": job.action,
+        "material": job.material,
+        "pdfs": job.file_names,
+        "workbook": f"{save_directory}/{job.name}.xlsm",
+        "json": json_file_path,
+        "parts": pricing.total_parts,
+        "quantity": pricing.total_quantity,
+        "sheets": quote.total_sheet_count,
+        "total_price": round(pricing.total_price, 2),
+        "total_cost": round(pricing.total_cost_sum, 2),
+        "sheet_cost": None if math.isnan(pricing.sheet_cost) else round(pricing.sheet_cost, 2),
+        "upload_batch": upload_batch,
+        "upload_status": None,
+        "upload_response": None,
+    }
+
+
+def run_jobs(jobs: list[QuoteJob], use_cache: bool = True) -> list[dict]:
+    """
+    It runs every job in this process, one after the other. A job that fails does not stop the others,
+    its summary has "ok" set to False and the error instead.
 
-        progress_bar()
-        progress_bar.text = "-> Finished! :)"
+    Work orders are uploaded in the background while the next jobs run. At the end it waits at most
+    upload_flush_seconds for the uploads, a job whose work order was not taken by inventory by then has
+    "ok" set to False, and it stays in the outbox to be sent the next time.
 
-        if action == 'go':
-            os.startfile(f'"{path_to_save_workorders}/{current_time}.xlsm"')
-        shutil.rmtree(f"{program_directory}/images")
+    Returns:
+      list[dict]: The summary of every job, see `run_job`.
+    """
+    outbox = get_outbox()
+    summaries: list[dict] = []
+    for job in jobs:
+        print(f'[ ] Running job "{job.name}"')
+        try:
+            summaries.append(run_job(job, use_cache))
+        except Exception as error:
+            print(f'[-] Job "{job.name}" failed: {error}')
+            summaries.append({"name": job.name, "ok": False, "error": f"{type(error).__name__}: {error}"})
+
+    # Closed rather than flushed, so a batch still being retried is given back for the next run.
+    outbox.close(timeout=get_config().upload_flush_seconds)
+    for summary in summaries:
+        if summary.get("upload_batch") is not None:
+            summary["upload_status"], summary["upload_response"] = outbox.statuses[summary["upload_batch"]]
+            summary["ok"] = summary["upload_status"] == "sent"
+    return summaries
+
+
+@contextlib.contextmanager
+def profiling(report_path: str | None, use_cprofile: bool = False):
+    """
+    It writes the instrumentation report of what runs inside it, when there is a report path
+
+    Args:
+      report_path (str | None): Where to write the JSON report, "" for the profiles folder of the
+    program directory, None to write nothing.
+      use_cprofile (bool): also profile every function with cProfile, and dump the stats next to the
+    report with a .pstats extension. Defaults to False.
+    """
+    if report_path is None:
+        yield
+        return
+    if report_path == "":
+        Path(f"{program_directory}/profiles").mkdir(parents=True, exist_ok=True)
+        report_path = f"{program_directory}/profiles/{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.json"
+    if use_cprofile:
+        import cProfile
+
+        function_profiler = cProfile.Profile()
+        function_profiler.enable()
+    profiler.reset()
+    try:
+        yield
+    finally:
+        if use_cprofile:
+            function_profiler.disable()
+            function_profiler.dump_stats(f"{os.path.splitext(report_path)[0]}.pstats")
+        report = profiler.save_report(report_path)
+        print(f'[+] Profile of {report["wall_seconds"]:.2f}s written to "{report_path}"', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    import argparse
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+
+    arg_parser = argparse.ArgumentParser(
+        description="Generate quotes at the speed of light :) Without PDFs or --job, the PDFs are picked "
+        "in a file dialog and reviewed in a window. With them, everything runs without any window and a "
+        "JSON summary of every job is printed to stdout."
+    )
+    arg_parser.add_argument("pdfs", nargs="*", help="nest reports to make one quote from, without any window")
+    arg_parser.add_argument(
+        "--job", action="append", default=[], help="JSON file with one job or a list of jobs, can be repeated"
+    )
+    arg_parser.add_argument("--material", help="material of the quote made from the PDFs, such as \"Mild Steel\"")
+    arg_parser.add_argument(
+        "--action", choices=["quote", "go"], default="quote", help='"go" makes a work order and sends it to inventory'
+    )
+    arg_parser.add_argument(
+        "--quantity", action="append", default=[], metavar="PART=QTY", help="change the quantity of a part, can be repeated"
+    )
+    arg_parser.add_argument("--recut", action="append", default=[], metavar="PART", help="mark a part as a recut, can be repeated")
+    arg_parser.add_argument("--name", help="name of the files made from the PDFs, defaults to the time")
+    arg_parser.add_argument(
+        "--no-cache", action="store_true", help="parse every PDF again instead of using the nest cache"
+    )
+    arg_parser.add_argument(
+        "--clear-cache", action="store_true", help="delete every cached nest report before starting"
+    )
+    arg_parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="REPORT",
+        help="write the time of every stage, counters and peak memory to a JSON report, in the profiles folder "
+        "if no path is given",
+    )
+    arg_parser.add_argument(
+        "--cprofile", action="store_true", help="with --profile, also dump cProfile stats next to the report"
+    )
+    args = arg_parser.parse_args()
+    if args.cprofile and args.profile is None:
+        arg_parser.error("--cprofile needs --profile")
+    if args.clear_cache:
+        get_nest_cache().clear()
 
+    Path(f"{program_directory}/excel files").mkdir(parents=True, exist_ok=True)
 
-file_names: str = sys.argv[-1].split("\\")[-1]
-directory_of_file: str = os.getcwd()
+    if args.pdfs or args.job:
+        jobs = load_jobs(args.job)
+        if args.pdfs:
+            try:
+                quantities = parse_quantities(args.quantity)
+            except ValueError as error:
+                arg_parser.error(str(error))
+            if args.material is None:
+                arg_parser.error("--material is required to quote PDFs without the review window")
+            jobs.append(
+                QuoteJob(
+                    name=args.name or datetime.now().strftime("%Y-%m-%d-%H-%M-%S"),
+                    file_names=args.pdfs,
+                    material=args.material,
+                    action=args.action,
+                    quantities=quantities,
+                    recuts=args.recut,
+                )
+            )
+        # Progress goes to stderr so stdout is only the summary.
+        with contextlib.redirect_stdout(sys.stderr), profiling(args.profile, args.cprofile):
+            summaries = run_jobs(jobs, use_cache=not args.no_cache)
+        sys.stdout.write(json.dumps(summaries, indent=4) + "\n")
+        sys.exit(0 if all(summary["ok"] for summary in summaries) else 1)
 
-root = tk.Tk()
-root.withdraw()
+    import tkinter as tk
+    from tkinter import filedialog
 
+    directory_of_file: str = os.getcwd()
 
-Path(f"{program_directory}/excel files").mkdir(parents=True, exist_ok=True)
+    root = tk.Tk()
+    root.withdraw()
 
 
-filetypes = (("pdf files", "*.pdf"),)
-file_paths = filedialog.askopenfilenames(
-    parent=root, title="Select files", initialdir=directory_of_file, filetypes=filetypes
-)
+    filetypes = (("pdf files", "*.pdf"),)
+    file_paths = filedialog.askopenfilenames(
+        parent=root, title="Select files", initialdir=directory_of_file, filetypes=filetypes
+    )
 
-if len(file_paths) > 0:
-    root.destroy()
-    convert(file_paths)
+    if len(file_paths) > 0:
+        root.destroy()
+        with profiling(args.profile, args.cprofile):
+            convert(file_paths, use_cache=not args.no_cache)
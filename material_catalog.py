@@ -0,0 +1,106 @@
+import json
+import os
+import time
+
+
+class MaterialCatalogError(ValueError):
+    """Raised when material_id.json is malformed or does not know a code."""
+
+
+class MaterialCatalog:
+    """The material and thickness codes of material_id.json, loaded once and indexed by code.
+
+    The file is only parsed again when its modification time changes, and the modification time is
+    checked at most once every `check_interval` seconds.
+    """
+
+    def __init__(self, path: str, check_interval: float = 1.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._modified_time: float | None = None
+        self._last_checked: float = 0.0
+        self._names: dict[str, str] = {}
+        self._cutting_methods: dict[str, str] = {}
+        self._thicknesses: dict[str, str] = {}
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._modified_time is not None and now - self._last_checked < self.check_interval:
+            return
+        self._last_checked = now
+        modified_time = os.stat(self.path).st_mtime
+        if modified_time != self._modified_time:
+            self.load()
+            self._modified_time = modified_time
+
+    def load(self) -> None:
+        """
+        It parses and validates material_id.json
+
+        Raises:
+          MaterialCatalogError: If a material has no name or cutting method, or the thickness table is
+        missing.
+        """
+        with open(self.path, "r") as material_id_file:
+            data = json.load(material_id_file)
+
+        thicknesses = data.pop("thickness", None)
+        if not isinstance(thicknesses, dict):
+            raise MaterialCatalogError(f'"{self.path}" has no "thickness" table.')
+
+        names: dict[str, str] = {}
+        cutting_methods: dict[str, str] = {}
+        for material, material_data in data.items():
+            try:
+                names[material] = material_data["name"]
+                cutting_methods[material] = material_data["cut"]
+            except (KeyError, TypeError) as error:
+                raise MaterialCatalogError(
+                    f'Material "{material}" in "{self.path}" needs a "name" and a "cut".'
+                ) from error
+
+        self._names = names
+        self._cutting_methods = cutting_methods
+        self._thicknesses = {str(number_id): str(thickness) for number_id, thickness in thicknesses.items()}
+
+    def get_name(self, material: str) -> str:
+        """
+        Args:
+          material (str): The material ID, such as "ST".
+
+        Returns:
+          str: The name of the material, such as "Mild Steel".
+        """
+        self._refresh()
+        try:
+            return self._names[material]
+        except KeyError as error:
+            raise MaterialCatalogError(f'Unknown material ID "{material}".') from error
+
+    def get_cutting_method(self, material: str) -> str:
+        """
+        Args:
+          material (str): The material ID, such as "ST".
+
+        Returns:
+          str: The gas it is cut with, "Nitrogen" or "CO2".
+        """
+        self._refresh()
+        try:
+            return self._cutting_methods[material]
+        except KeyError as error:
+            raise MaterialCatalogError(f'Unknown material ID "{material}".') from error
+
+    def get_thickness(self, number_id: str) -> str:
+        """
+        Args:
+          number_id (str): The gauge code, such as "025".
+
+        Returns:
+          str: The thickness of the material, such as '1/4"'.
+        """
+        self._refresh()
+        try:
+            return self._thicknesses[number_id]
+        except KeyError as error:
+            raise MaterialCatalogError(f'Unknown thickness ID "{number_id}".') from error
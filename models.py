@@ -0,0 +1,305 @@
+import contextlib
+import json
+import os
+import tempfile
+
+
+class Part:
+    """One part of a quote, from its part block on a nest report to its row on the excel sheet.
+
+    The parser fills in what is printed on the report, `Quote.add_nest` fills in the rest.
+    """
+
+    __slots__ = (
+        "part_name",
+        "quantity",
+        "machining_time",
+        "weight",
+        "surface_area",
+        "cutting_length",
+        "piercing_time",
+        "part_number",
+        "image_index",
+        "file_name",
+        "material",
+        "gauge",
+        "sheet_dim",
+        "recut",
+    )
+
+    def __init__(
+        self,
+        part_name: str,
+        quantity: int,
+        machining_time: float,
+        weight: float,
+        surface_area: float,
+        cutting_length: float,
+        piercing_time: float,
+        part_number: int,
+        image_index: int = 0,
+        file_name: str = "",
+        material: str = "",
+        gauge: str = "",
+        sheet_dim: str = "",
+        recut: bool = False,
+    ) -> None:
+        self.part_name = part_name
+        # How many are nested on one sheet, until `Quote.add_nest` makes it how many are quoted.
+        self.quantity = quantity
+        self.machining_time = machining_time
+        self.weight = weight
+        self.surface_area = surface_area
+        self.cutting_length = cutting_length
+        self.piercing_time = piercing_time
+        self.part_number = part_number
+        self.image_index = image_index
+        self.file_name = file_name
+        self.material = material
+        self.gauge = gauge
+        self.sheet_dim = sheet_dim
+        self.recut = recut
+
+    def __repr__(self) -> str:
+        return f"Part({self.part_name!r}, quantity={self.quantity}, part_number={self.part_number})"
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+          dict: The part the way it is saved in the quote's JSON file and sent to inventory.
+        """
+        return {
+            "quantity": self.quantity,
+            "machine_time": self.machining_time,
+            "weight": self.weight,
+            "part_number": self.part_number,
+            "image_index": self.image_index,
+            "surface_area": self.surface_area,
+            "cutting_length": self.cutting_length,
+            "file_name": self.file_name,
+            "piercing_time": self.piercing_time,
+            "gauge": self.gauge,
+            "material": self.material,
+            "recut": self.recut,
+            "sheet_dim": self.sheet_dim,
+        }
+
+
+class Nest:
+    """The sheet information of a nest report and the parts nested on it."""
+
+    __slots__ = (
+        "quantity_multiplier",
+        "scrap_percentage",
+        "sheet_dim",
+        "material_id",
+        "gauge_id",
+        "parts",
+        "file_name",
+        "material",
+        "gauge",
+        "cutting_with",
+    )
+
+    def __init__(
+        self,
+        quantity_multiplier: int,
+        scrap_percentage: float,
+        sheet_dim: str,
+        material_id: str,
+        gauge_id: str,
+        parts: list[Part],
+        file_name: str = "",
+        material: str = "",
+        gauge: str = "",
+        cutting_with: str = "",
+    ) -> None:
+        self.quantity_multiplier = quantity_multiplier
+        self.scrap_percentage = scrap_percentage
+        self.sheet_dim = sheet_dim
+        self.material_id = material_id
+        self.gauge_id = gauge_id
+        self.parts = parts
+        self.file_name = file_name
+        self.material = material
+        self.gauge = gauge
+        self.cutting_with = cutting_with
+
+    def __repr__(self) -> str:
+        return f"Nest({self.sheet_dim!r}, {self.material_id}-{self.gauge_id}, runs={self.quantity_multiplier}, parts={len(self.parts)})"
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+          dict: The sheet the way it is saved in the quote's JSON file, under "_{file_name}".
+        """
+        return {
+            "quantity_multiplier": self.quantity_multiplier,
+            "gauge": self.gauge,
+            "material": self.material,
+            "sheet_dim": self.sheet_dim,
+        }
+
+
+class Quote:
+    """Every nest report of a quote and their parts, merged by part name.
+
+    A part that is nested on several sheets is quoted once, with the quantities of every sheet added
+    up and everything else taken from the last sheet it is on.
+    """
+
+    __slots__ = ("nests", "parts", "_part_count")
+
+    def __init__(self) -> None:
+        self.nests: list[Nest] = []
+        self.parts: dict[str, Part] = {}
+        self._part_count: int = 0
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    def add_nest(self, nest: Nest, file_name: str, material: str, gauge: str, cutting_with: str) -> None:
+        """
+        It adds a parsed nest report to the quote. Image indexes are given out in the order parts are
+        added, so nests have to be added in the same order as their thumbnails.
+
+        Args:
+          nest (Nest): What the parser returned for the report.
+          file_name (str): The path to the nest report.
+          material (str): The name of the material, such as "Mild Steel".
+          gauge (str): The thickness of the sheet, such as '1/4"'.
+          cutting_with (str): The gas it is cut with, "Nitrogen" or "CO2".
+        """
+        nest.file_name = file_name
+        nest.material = material
+        nest.gauge = gauge
+        nest.cutting_with = cutting_with
+        self.nests.append(nest)
+        for part in nest.parts:
+            part.quantity *= nest.quantity_multiplier
+            part.image_index = self._part_count
+            part.file_name = file_name
+            part.material = material
+            part.gauge = gauge
+            part.sheet_dim = nest.sheet_dim
+            self._part_count += 1
+            if (previous_part := self.parts.pop(part.part_name, None)) is not None:
+                part.quantity += previous_part.quantity
+            self.parts[part.part_name] = part
+
+    def get_parts(self) -> list[Part]:
+        """
+        Returns:
+          list[Part]: The parts sorted by name, the order they are listed in on the sheet.
+        """
+        return [self.parts[part_name] for part_name in sorted(self.parts)]
+
+    def set_material(self, material: str) -> None:
+        """It changes the material of every sheet and every part of the quote."""
+        for nest in self.nests:
+            nest.material = material
+        for part in self.parts.values():
+            part.material = material
+
+    @property
+    def file_names(self) -> list[str]:
+        return [nest.file_name for nest in self.nests]
+
+    @property
+    def total_sheet_count(self) -> int:
+        return sum(nest.quantity_multiplier for nest in self.nests)
+
+    @property
+    def last_nest(self) -> Nest:
+        """The nest report added last, the sheet size, scrap and gas of the quote are taken from it."""
+        return self.nests[-1]
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+          dict: The quote the way it is saved in its JSON file and sent to inventory, the sheets under
+        "_{file_name}" and the parts under their name.
+        """
+        data = {f"_{nest.file_name}": nest.to_dict() for nest in self.nests}
+        data |= {part_name: part.to_dict() for part_name, part in self.parts.items()}
+        return data
+
+    def save(self, json_file_path: str) -> None:
+        """
+        It writes the quote to its JSON file atomically, so inventory or a crash never sees half a file
+
+        Args:
+          json_file_path (str): The path to the JSON file of the quote.
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(json_file_path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump(self.to_dict(), f, sort_keys=True, ensure_ascii=False, indent=4)
+            os.replace(temporary_path, json_file_path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
+
+
+class ReviewDecision:
+    """What a quote was reviewed into: a work order or a quote, in which material, and the quantities and
+    recuts of its parts.
+
+    The review window returns one when a button is pressed, and a headless job is turned into one, so
+    both make the same changes to the quote.
+    """
+
+    __slots__ = ("action", "material", "quantities", "recuts")
+
+    def __init__(
+        self, action: str, material: str, quantities: dict[str, int] | None = None, recuts: list[str] | None = None
+    ) -> None:
+        # "go" for a work order that is sent to inventory, "quote" for a quote.
+        self.action = action
+        self.material = material
+        # Only the parts listed are changed, the others keep the quantity of their nest reports.
+        self.quantities: dict[str, int] = quantities or {}
+        self.recuts: list[str] = recuts or []
+
+    def __repr__(self) -> str:
+        return f"ReviewDecision({self.action!r}, {self.material!r}, quantities={len(self.quantities)}, recuts={len(self.recuts)})"
+
+    @classmethod
+    def from_quote(cls, action: str, material: str, quote: Quote) -> "ReviewDecision":
+        """
+        Args:
+          action (str): "go" or "quote".
+          material (str): The material that was picked.
+          quote (Quote): The quote as it was reviewed.
+
+        Returns:
+          ReviewDecision: The decision with the quantity of every part and every part marked as a recut.
+        """
+        return cls(
+            action,
+            material,
+            {part_name: part.quantity for part_name, part in quote.parts.items()},
+            [part_name for part_name, part in quote.parts.items() if part.recut],
+        )
+
+    def apply(self, quote: Quote) -> None:
+        """
+        It changes the material, quantities and recuts of the quote to the ones decided on
+
+        Args:
+          quote (Quote): The quote that was reviewed.
+
+        Raises:
+          ValueError: If a quantity or recut is given for a part that is not in the quote.
+        """
+        for part_name in list(self.quantities) + self.recuts:
+            if part_name not in quote.parts:
+                raise ValueError(f'There is no part named "{part_name}" in {", ".join(quote.file_names)}.')
+        for part_name, quantity in self.quantities.items():
+            quote.parts[part_name].quantity = quantity
+        for part_name, part in quote.parts.items():
+            part.recut = part_name in self.recuts
+        quote.set_material(self.material)
@@ -0,0 +1,110 @@
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from nest_parser import PARSER_VERSION
+
+# Bump when what ingest_nest_pdf returns changes shape, so old entries are never unpickled.
+CACHE_VERSION: int = 3
+
+
+class NestCache:
+    """A size-bounded, least-recently-used on-disk cache of ingested nest reports.
+
+    Entries are keyed by a hash of the PDF bytes, the parser version and the thumbnail size, so an
+    edited PDF or a new parser never gets a stale result. The modification time of an entry is bumped
+    every time it is read and the oldest entries are evicted once the cache grows past `max_size`.
+    """
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get_key(self, pdf_path: str, size_of_picture: int) -> str:
+        """
+        It hashes the PDF bytes together with everything else the cached result depends on
+
+        Args:
+          pdf_path (str): The path to the nest report.
+          size_of_picture (int): The width and height of the thumbnails.
+
+        Returns:
+          str: The hex digest naming the cache entry.
+        """
+        digest = hashlib.sha256(f"{CACHE_VERSION}-{PARSER_VERSION}-{size_of_picture}-".encode())
+        with open(pdf_path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
+
+    def get(self, key: str):
+        """
+        Args:
+          key (str): See `get_key`.
+
+        Returns:
+          The cached result, or None if there is none or it could not be read.
+        """
+        entry_path = self._get_entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            with contextlib.suppress(OSError):
+                entry_path.unlink()
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(entry_path)
+        return result
+
+    def put(self, key: str, result) -> None:
+        """
+        It writes the result atomically so a crash or a second quote never sees half an entry, then
+        evicts the least recently used entries if the cache is too big.
+
+        Args:
+          key (str): See `get_key`.
+          result: What `ingest_nest_pdf` returned.
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._get_entry_path(key))
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """It deletes the least recently used entries until the cache fits in `max_size`."""
+        entries = []
+        total_size: int = 0
+        for entry_path in self.directory.glob("*.pickle"):
+            with contextlib.suppress(OSError):
+                stat = entry_path.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry_path))
+                total_size += stat.st_size
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                entry_path.unlink()
+                total_size -= size
+
+    def clear(self) -> None:
+        """It deletes every entry in the cache."""
+        for entry_path in self.directory.glob("*.pickle"):
+            with contextlib.suppress(OSError):
+                entry_path.unlink()
@@ -0,0 +1,150 @@
+import contextlib
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from rich import print
+
+from instrumentation import call_profiled, profiler
+from nest_cache import NestCache
+from models import Nest
+from nest_parser import NestReportStream
+from nest_pdf import iter_nest_pages
+
+
+def ingest_nest_pdf(
+    pdf_path: str, size_of_picture: int, debug_output_directory: str | None = None
+) -> tuple[Nest, list[tuple[bytes, str, str]]]:
+    """
+    It visits every page of a nest report once and gets both its parsed parts and its thumbnails. This
+    runs in the worker processes so everything it returns has to be picklable.
+
+    Args:
+      pdf_path (str): The path to the nest report.
+      size_of_picture (int): The width and height of the thumbnails.
+      debug_output_directory (str | None): if given, the report text is also written to
+    "{debug_output_directory}/{pdf name}.txt". Defaults to None.
+
+    Returns:
+      tuple[Nest, list[tuple[bytes, str, str]]]: The parsed report and its thumbnails.
+    """
+    with contextlib.ExitStack() as stack:
+        on_text = None
+        if debug_output_directory is not None:
+            on_text = stack.enter_context(
+                open(f"{debug_output_directory}/{os.path.basename(pdf_path)}.txt", "w")
+            ).write
+        # Each page is parsed as soon as it is read, the text of the whole report is never joined.
+        stream = NestReportStream(on_text=on_text)
+        thumbnails: list[tuple[bytes, str, str]] = []
+        for nest_page in iter_nest_pages(pdf_path, size_of_picture):
+            thumbnails.extend(nest_page.thumbnails)
+            with profiler.stage("parse"):
+                stream.feed(nest_page.text)
+        with profiler.stage("parse"):
+            nest = stream.close()
+    profiler.count("pdfs")
+    profiler.count("parts", len(nest.parts))
+    return nest, thumbnails
+
+
+def warm_up() -> None:
+    """It does nothing, running it makes a worker process import this module, PyMuPDF and Pillow."""
+
+
+def get_worker_count(workers: int, job_count: int) -> int:
+    """
+    It works out how many worker processes to start
+
+    Args:
+      workers (int): The configured worker count, 0 means one per core.
+      job_count (int): How many PDFs there are to process.
+
+    Returns:
+      int: Never more workers than PDFs and never less than one.
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, job_count))
+
+
+def ingest_nest_pdfs(
+    pdf_paths: list[str],
+    size_of_picture: int,
+    workers: int,
+    progress_bar,
+    debug_output_directory: str | None = None,
+    cache: NestCache | None = None,
+    executor: Executor | None = None,
+) -> list[tuple[Nest, list[tuple[bytes, str, str]]]]:
+    """
+    It runs `ingest_nest_pdf` over every nest report that is not already cached, in parallel when there
+    is more than one worker
+
+    Args:
+      pdf_paths (list[str]): list of paths to the PDF files
+      size_of_picture (int): The width and height of the thumbnails.
+      workers (int): The configured worker count, 0 means one per core.
+      progress_bar: a function that will be called after each PDF is processed.
+      debug_output_directory (str | None): See `ingest_nest_pdf`, cached PDFs are not dumped. Defaults
+    to None.
+      cache (NestCache | None): Where to look up and store results, None to parse everything. Defaults
+    to None.
+      executor (Executor | None): Worker processes that are already running, such as the ones of the
+    quote daemon, to parse in instead of starting new ones. `workers` is then ignored. Defaults to None.
+
+    Returns:
+      The results in the same order as `pdf_paths`, no matter which worker finished first, so image
+    indexes stay the same from run to run.
+    """
+    results: list[tuple[Nest, list[tuple[bytes, str, str]]] | None] = [None] * len(pdf_paths)
+    cache_keys: list[str | None] = [None] * len(pdf_paths)
+    pending: list[int] = []
+    for i, pdf_path in enumerate(pdf_paths):
+        if cache is not None:
+            with profiler.stage("cache.get"):
+                cache_keys[i] = cache.get_key(pdf_path, size_of_picture)
+                result = cache.get(cache_keys[i])
+            if result is not None:
+                profiler.count("cache_hits")
+                results[i] = result
+                print(f'[+] Loaded "{pdf_path}" from cache\t{i + 1}/{len(pdf_paths)}')
+                progress_bar()
+                continue
+        pending.append(i)
+
+    def store(i: int, result: tuple[Nest, list[tuple[bytes, str, str]]]) -> None:
+        results[i] = result
+        if cache is not None:
+            with profiler.stage("cache.put"):
+                cache.put(cache_keys[i], result)
+        print(f'[+] Finished "{pdf_paths[i]}"\t{i + 1}/{len(pdf_paths)}')
+        progress_bar()
+
+    def submit_all(executor: Executor) -> None:
+        # Each worker times its own stages, they are added up here.
+        futures = [
+            executor.submit(
+                call_profiled, ingest_nest_pdf, pdf_paths[i], size_of_picture, debug_output_directory
+            )
+            for i in pending
+        ]
+        for i, future in zip(pending, futures):
+            result, stats = future.result()
+            profiler.merge(stats)
+            store(i, result)
+
+    if executor is not None:
+        submit_all(executor)
+        return results
+
+    workers = get_worker_count(workers, len(pending))
+    if workers == 1:
+        for i in pending:
+            print(f'[ ] Processing "{pdf_paths[i]}"\t{i + 1}/{len(pdf_paths)}')
+            store(i, ingest_nest_pdf(pdf_paths[i], size_of_picture, debug_output_directory))
+        return results
+
+    print(f"[ ] Processing {len(pending)} files with {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        submit_all(executor)
+    return results
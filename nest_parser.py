@@ -0,0 +1,268 @@
+import re
+from collections import deque
+from typing import Callable, Iterable
+
+from models import Nest, Part
+
+PARSER_VERSION: int = 3
+
+# Every field of a TRUMPF nest report in one alternation. The first letter of each label sits outside
+# its named group so the regex engine can skip ahead to the next candidate letter instead of trying
+# every alternative at every position. The named group says which field matched and the "_value"
+# groups hold what we keep. " \n" is replaced with " " before scanning, so a field can share its line
+# with the next one; the material ID stops where the next label starts.
+NEST_REPORT_REGEX = re.compile(
+    r"G(?P<geofile_name>EOFILE NAME: (?P<geofile_name_value>[a-zA-Z]:\\[\w\W]{1,300}?\.(?:geo|GEO)))"
+    r"|M(?P<machining_time>ACHINING TIME: (?P<machining_time_value>\d+.\d+) min)"
+    r"|W(?P<weight>EIGHT: (?P<weight_value>\d+.\d+) lb)"
+    r"|S(?P<surface_area>URFACE: (?P<surface_area_value>\d+.\d+)  in2)"
+    r"|C(?P<cutting_length>UTTING LENGTH: (?P<cutting_length_value>\d+.\d+|\d+)  in)"
+    r"|N(?P<quantity>UMBER: (?<=  NUMBER: )(?P<quantity_value>\d+))"
+    r"|P(?P<part_number>ART NUMBER: (?P<part_number_value>\d+))"
+    r"|P(?P<piercing_time>IERCING TIME (?P<piercing_time_value>\d+.\d+)  s)"
+    r"|P(?P<program_runs>ROGRAM(?:ME)? RUNS:  /  SCRAP: (?P<program_runs_value>\d+)(?:  /  (?P<scrap_percentage_value>\d+.\d+) %)?)"
+    r"|M(?P<material_id>ATERIAL ID \(SHEET\): (?P<material_id_value>[^\n]{0,200}?)(?= +[A-Z][A-Z ()]*: |\n|$))"
+    r"|B(?P<sheet_dim>LANK: (?P<sheet_dim_value>\d+\.\d+ x \d+\.\d+) x \d+\.\d+)"
+)
+MATERIAL_CODE_REGEX = re.compile(r".*(ST|SS|AL)-")
+GAUGE_REGEX = re.compile(r".+ ?-(\d+)")
+
+# Text at the end of what was fed that is not scanned yet, because a field there may continue on the
+# next page. It is longer than the longest field, a GEOFILE NAME of 300 characters.
+STREAM_TAIL_SIZE: int = 512
+# Text kept before the scan position, for the lookbehind of "  NUMBER: ".
+STREAM_LOOKBEHIND_SIZE: int = 16
+
+PART_FIELDS: tuple[str, ...] = (
+    "geofile_name",
+    "quantity",
+    "machining_time",
+    "weight",
+    "surface_area",
+    "cutting_length",
+    "piercing_time",
+    "part_number",
+)
+
+
+class NestReportError(ValueError):
+    """Raised when a nest report is missing information we need to quote it."""
+
+
+def get_part_name(geofile_name: str) -> str:
+    """
+    It turns the geofile path printed on the report into the part name
+
+    Args:
+      geofile_name (str): Such as "C:\\Parts\\Job\\BRACKET.GEO", may be wrapped over several lines.
+
+    Returns:
+      "BRACKET"
+    """
+    return geofile_name.split("\\")[-1].replace("\n", "").replace(".GEO", "").strip()
+
+
+class NestReportStream:
+    """Parses a nest report page by page, as the pages are read from the PDF.
+
+    Only the end of what was fed, `STREAM_TAIL_SIZE` characters, is kept between pages, so a field that
+    a page break splits is still found, and memory does not grow with the length of the report. A part
+    is returned by `feed` as soon as every one of its fields was found, and the sheet information is
+    checked once the whole report was fed, by `close`.
+    """
+
+    def __init__(self, regex: re.Pattern = NEST_REPORT_REGEX, on_text: Callable[[str], object] | None = None) -> None:
+        """
+        Args:
+          regex (re.Pattern, optional): The fields to look for. Defaults to NEST_REPORT_REGEX.
+          on_text (Callable[[str], object] | None, optional): Called with the normalized text, piece by
+        piece, such as the `write` of the debug output file. Defaults to None.
+        """
+        self.regex = regex
+        self.on_text = on_text
+        self.parts: list[Part] = []
+        self._buffer = ""
+        self._position = 0
+        # A space at the end of a page, " \n" is normalized to " " even when a page break splits it.
+        self._held_space = ""
+        self._values: dict[str, deque[str]] = {field: deque() for field in PART_FIELDS}
+        self.quantity_multiplier: int | None = None
+        self.scrap_percentage: float | None = None
+        self.sheet_dim: str | None = None
+        self.material_id: str | None = None
+        self.gauge_id: str | None = None
+
+    def feed(self, page_text: str) -> list[Part]:
+        """
+        Args:
+          page_text (str): The text of the next page, as `fitz` returned it.
+
+        Returns:
+          list[Part]: The parts completed by this page, in the order they appear on the report.
+        """
+        text = self._held_space + page_text
+        self._held_space = ""
+        if text.endswith(" "):
+            self._held_space = " "
+            text = text[:-1]
+        return self.feed_normalized(text.replace(" \n", " "))
+
+    def feed_normalized(self, text: str) -> list[Part]:
+        """
+        It is `feed` for text where " \n" was already replaced with " "
+
+        Returns:
+          list[Part]: The parts completed by this text.
+        """
+        if self.on_text is not None:
+            self.on_text(text)
+        self._buffer += text
+        self._scan(final=False)
+        return self._take_parts()
+
+    def close(self) -> Nest:
+        """
+        It scans what is left of the report and checks that nothing is missing
+
+        Raises:
+          NestReportError: If the sheet information is missing, or a part field was not found exactly
+        once for every part, since the values of the parts would then no longer line up.
+
+        Returns:
+          Nest: The sheet information with all of its parts, in the order they appear on the report.
+        """
+        if self._held_space:
+            self.feed_normalized(self._held_space)
+            self._held_space = ""
+        self._scan(final=True)
+        self._take_parts()
+
+        for name, value in (
+            ("PROGRAM RUNS / SCRAP", self.quantity_multiplier),
+            ("SCRAP %", self.scrap_percentage),
+            ("BLANK", self.sheet_dim),
+            ("MATERIAL ID (SHEET)", self.material_id),
+            ("MATERIAL ID (SHEET) gauge", self.gauge_id),
+        ):
+            if value is None:
+                raise NestReportError(f"Could not find {name} in the nest report.")
+
+        # Every field was found as often as there are complete parts, plus what is left over.
+        part_count = len(self.parts) + len(self._values["geofile_name"])
+        for field, values in self._values.items():
+            if (count := len(self.parts) + len(values)) != part_count:
+                raise NestReportError(f"Found {part_count} parts but {count} {field.replace('_', ' ')} values.")
+
+        return Nest(
+            quantity_multiplier=self.quantity_multiplier,
+            scrap_percentage=self.scrap_percentage,
+            sheet_dim=self.sheet_dim,
+            material_id=self.material_id,
+            gauge_id=self.gauge_id,
+            parts=self.parts,
+        )
+
+    def _scan(self, final: bool) -> None:
+        # A match that ends in the tail may still grow, or not be there at all, once the next page is fed.
+        limit = len(self._buffer) if final else len(self._buffer) - STREAM_TAIL_SIZE
+        position = self._position
+        next_start = None
+        add_match = self._add_match
+        for match in self.regex.finditer(self._buffer, position):
+            end = match.end()
+            if end > limit:
+                next_start = match.start()
+                break
+            add_match(match)
+            position = end
+        # Nothing before the limit can match anymore, except where the unfinished match starts.
+        keep_from = max(position, limit)
+        if next_start is not None:
+            keep_from = min(next_start, keep_from)
+
+        trim = max(0, keep_from - STREAM_LOOKBEHIND_SIZE)
+        self._buffer = self._buffer[trim:]
+        self._position = keep_from - trim
+
+    def _add_match(self, match: re.Match) -> None:
+        field = match.lastgroup
+        value = match[f"{field}_value"]
+        if (values := self._values.get(field)) is not None:
+            values.append(value)
+        elif field == "program_runs":
+            if self.quantity_multiplier is None:
+                self.quantity_multiplier = int(value)
+            if self.scrap_percentage is None and match["scrap_percentage_value"] is not None:
+                self.scrap_percentage = float(match["scrap_percentage_value"])
+        elif field == "material_id":
+            if self.material_id is None and (material_match := MATERIAL_CODE_REGEX.match(value)):
+                self.material_id = material_match[1]
+            if self.gauge_id is None and (gauge_match := GAUGE_REGEX.match(value)):
+                self.gauge_id = gauge_match[1]
+        elif field == "sheet_dim" and self.sheet_dim is None:
+            self.sheet_dim = value.replace(" ", "")
+
+    def _take_parts(self) -> list[Part]:
+        values = self._values
+        geofile_names = values["geofile_name"]
+        quantities = values["quantity"]
+        machining_times = values["machining_time"]
+        weights = values["weight"]
+        surface_areas = values["surface_area"]
+        cutting_lengths = values["cutting_length"]
+        piercing_times = values["piercing_time"]
+        part_numbers = values["part_number"]
+        parts = [
+            Part(
+                part_name=get_part_name(geofile_names.popleft()),
+                quantity=int(quantities.popleft()),
+                machining_time=float(machining_times.popleft()),
+                weight=float(weights.popleft()),
+                surface_area=float(surface_areas.popleft()),
+                cutting_length=float(cutting_lengths.popleft()),
+                piercing_time=float(piercing_times.popleft()),
+                part_number=int(part_numbers.popleft()),
+            )
+            for _ in range(min(map(len, values.values())))
+        ]
+        self.parts.extend(parts)
+        return parts
+
+
+class NestReportParser:
+    """Parses the text of a nest report in a single scan with one precompiled regex."""
+
+    def __init__(self) -> None:
+        self.regex = NEST_REPORT_REGEX
+
+    def parse(self, text: str) -> Nest:
+        """
+        It scans the normalized report text once and collects every field it finds
+
+        Args:
+          text (str): The text of the whole nest report, with " \n" replaced with " ".
+
+        Raises:
+          NestReportError: See `NestReportStream.close`.
+
+        Returns:
+          Nest: The sheet information with all of its parts, in the order they appear on the report.
+        """
+        stream = NestReportStream(self.regex)
+        stream.feed_normalized(text)
+        return stream.close()
+
+    def parse_pages(self, pages_text: Iterable[str]) -> Nest:
+        """
+        It parses the report page by page, without joining the pages, see `NestReportStream`
+
+        Args:
+          pages_text (Iterable[str]): The text of every page, as `fitz` returned it.
+
+        Returns:
+          Nest: The sheet information with all of its parts.
+        """
+        stream = NestReportStream(self.regex)
+        for page_text in pages_text:
+            stream.feed(page_text)
+        return stream.close()
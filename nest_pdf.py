@@ -0,0 +1,126 @@
+import hashlib
+import io
+from typing import Iterator
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from instrumentation import profiler
+
+MAX_CACHED_THUMBNAILS: int = 4096
+
+# Thumbnails already made by this process, keyed by the digest of the original image and the size, so
+# a bracket repeated across many nest reports is only decoded and resized once per worker.
+thumbnails_by_digest: dict[tuple[str, int], tuple[bytes, str, str]] = {}
+
+
+class NestPage:
+    """The text and thumbnails of one page of a nest report."""
+
+    __slots__ = ("page_index", "text", "thumbnails")
+
+    def __init__(self, page_index: int, text: str, thumbnails: list[tuple[bytes, str, str]]) -> None:
+        self.page_index = page_index
+        self.text = text
+        self.thumbnails = thumbnails
+
+
+def make_thumbnail(image_bytes: bytes, size_of_picture: int) -> bytes:
+    """
+    It decodes an image and resizes it to a specific size
+
+    Args:
+      image_bytes (bytes): The image as it is embedded in the PDF.
+      size_of_picture (int): The width and height of the thumbnail.
+
+    Returns:
+      bytes: The thumbnail, encoded in the same format as the original.
+    """
+    with profiler.stage("extract.resize"):
+        image = Image.open(io.BytesIO(image_bytes))
+        image_format = image.format
+        image = image.resize((size_of_picture, size_of_picture), Image.Resampling.LANCZOS)
+        image_buffer = io.BytesIO()
+        image.save(image_buffer, format=image_format)
+    profiler.count("images_resized")
+    return image_buffer.getvalue()
+
+
+def extract_thumbnails_from_page(
+    pdf_file: fitz.Document,
+    page: fitz.Page,
+    size_of_picture: int,
+    thumbnails_by_xref: dict[int, tuple[bytes, str, str] | None],
+) -> list[tuple[bytes, str, str]]:
+    """
+    It extracts all the images of a page and resizes them to a specific size. Every image is decoded
+    once per document thanks to `thumbnails_by_xref`, and once per process for identical images in
+    different documents thanks to `thumbnails_by_digest`.
+
+    Args:
+      pdf_file (fitz.Document): The opened nest report the page belongs to.
+      page (fitz.Page): The page to get the images from.
+      size_of_picture (int): The width and height of the thumbnails.
+      thumbnails_by_xref (dict[int, tuple[bytes, str, str] | None]): The thumbnails already made for
+    this document, None for the ones that were skipped.
+
+    Returns:
+      list[tuple[bytes, str, str]]: The encoded thumbnails, their file extension and the digest of the
+    original image, one for each time an image is drawn. 48x48 icons are skipped.
+    """
+    thumbnails: list[tuple[bytes, str, str]] = []
+    for img in page.get_images():
+        xref = img[0]
+        if xref not in thumbnails_by_xref:
+            thumbnails_by_xref[xref] = get_thumbnail(pdf_file.extract_image(xref), size_of_picture)
+        if (thumbnail := thumbnails_by_xref[xref]) is not None:
+            thumbnails.append(thumbnail)
+    return thumbnails
+
+
+def get_thumbnail(base_image: dict, size_of_picture: int) -> tuple[bytes, str, str] | None:
+    """
+    Args:
+      base_image (dict): What `fitz.Document.extract_image` returned.
+      size_of_picture (int): The width and height of the thumbnail.
+
+    Returns:
+      tuple[bytes, str, str] | None: The thumbnail, its file extension and the digest of the original
+    image, or None for 48x48 icons.
+    """
+    if base_image["width"] == 48 and base_image["height"] == 48:
+        return None
+    image_bytes = base_image["image"]
+    digest = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    key = (digest, size_of_picture)
+    if key not in thumbnails_by_digest:
+        if len(thumbnails_by_digest) >= MAX_CACHED_THUMBNAILS:
+            thumbnails_by_digest.clear()
+        thumbnails_by_digest[key] = (make_thumbnail(image_bytes, size_of_picture), base_image["ext"], digest)
+    return thumbnails_by_digest[key]
+
+
+def iter_nest_pages(pdf_path: str, size_of_picture: int) -> Iterator[NestPage]:
+    """
+    It opens a nest report and visits every page once, getting its text and its thumbnails together.
+    The document is closed as soon as the last page is visited, or when the generator is closed.
+
+    Args:
+      pdf_path (str): The path to the nest report.
+      size_of_picture (int): The width and height of the thumbnails.
+
+    Yields:
+      NestPage: One page at a time, in page order.
+    """
+    thumbnails_by_xref: dict[int, tuple[bytes, str, str] | None] = {}
+    with profiler.stage("extract.open"):
+        pdf_file = fitz.open(pdf_path)
+    with pdf_file:
+        for page in pdf_file:
+            with profiler.stage("extract.text"):
+                text = page.get_text("text")
+            with profiler.stage("extract.images"):
+                thumbnails = extract_thumbnails_from_page(pdf_file, page, size_of_picture, thumbnails_by_xref)
+            profiler.count("pages")
+            profiler.count("images", len(thumbnails))
+            yield NestPage(page_index=page.number, text=text, thumbnails=thumbnails)
@@ -0,0 +1,264 @@
+import contextlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+from upload_client import SUCCESS_MESSAGE
+
+# The status of a batch, as reported to `on_status`.
+QUEUED: str = "queued"
+SENT: str = "sent"
+RETRYING: str = "retrying"
+FAILED: str = "failed"
+
+
+class Outbox:
+    """Uploads batches to inventory in the background, from a directory that survives restarts.
+
+    A batch is written to the outbox directory before it is queued, and only deleted once the server
+    has taken it. A worker thread sends the batches in the order they were added, and waits before
+    trying again when the server can not be reached, `retry_seconds`, then twice as long, and so on up
+    to `max_retry_seconds`. Batches left over from a run that ended before they were sent are queued
+    again when the outbox starts. A batch the server answers with an error is moved to "failed" in the
+    outbox directory, sending it again would not change the answer.
+
+    Several runs of the program can share one outbox. A batch is claimed before it is sent, by moving it
+    to "sending" under a name only this outbox uses, and whoever moves it first sends it. A claim is
+    touched at every try and given back when the outbox stops, one left behind by a run that crashed
+    is queued again by the next outbox to start once it has not been touched for `stale_claim_seconds`. A batch is always sent with its batch
+    ID, so the server can tell a batch it already took from a new one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        send: Callable[[str, str, bytes, str], str],
+        on_status: Callable[[str, str, str], None] | None = None,
+        retry_seconds: float = 2.0,
+        max_retry_seconds: float = 300.0,
+        stale_claim_seconds: float = 900.0,
+    ) -> None:
+        """
+        Args:
+          directory (str): Where the batches are kept until they are sent.
+          send (Callable[[str, str, bytes, str], str]): Sends a command, file name, payload and batch
+        ID, and returns the server's answer, such as `upload_client.send_batch`.
+          on_status (Callable[[str, str, str], None] | None, optional): Called from the worker thread
+        with the batch ID, its status and a message every time the status of a batch changes.
+          retry_seconds (float, optional): How long to wait before the first retry. Defaults to 2.
+          max_retry_seconds (float, optional): The longest wait between retries. Defaults to 300.
+          stale_claim_seconds (float, optional): How long a claim has to be left alone to be taken from
+        a run that crashed, longer than `max_retry_seconds` and a send. Defaults to 900.
+        """
+        self.directory = Path(directory)
+        self.failed_directory = self.directory / "failed"
+        self.failed_directory.mkdir(parents=True, exist_ok=True)
+        self.sending_directory = self.directory / "sending"
+        self.sending_directory.mkdir(parents=True, exist_ok=True)
+        self.send = send
+        self.on_status = on_status
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.stale_claim_seconds = stale_claim_seconds
+        self.statuses: dict[str, tuple[str, str]] = {}
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counter: int = 0
+        self._lock = threading.Lock()
+        self._claim_name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def _get_entry_path(self, batch_id: str) -> Path:
+        return self.directory / f"{batch_id}.json"
+
+    def _get_claim_path(self, batch_id: str) -> Path:
+        return self.sending_directory / f"{batch_id}.{self._claim_name}.json"
+
+    def _set_status(self, batch_id: str, status: str, message: str = "") -> None:
+        self.statuses[batch_id] = (status, message)
+        if self.on_status is not None:
+            self.on_status(batch_id, status, message)
+
+    def start(self) -> None:
+        """It queues the batches left in the outbox by an earlier run and starts sending."""
+        if self._thread is not None:
+            return
+        self._requeue_stale_claims()
+        for entry_path in sorted(self.directory.glob("*.json")):
+            if entry_path.stem in self.statuses:
+                continue  # added to this outbox before it started, it is queued already
+            self._queue.put(entry_path.stem)
+            self._set_status(entry_path.stem, QUEUED, "left over from an earlier run")
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._thread.start()
+
+    def _requeue_stale_claims(self) -> None:
+        now = time.time()
+        for claim_path in self.sending_directory.glob("*.json"):
+            batch_id = claim_path.name.split(".", 1)[0]
+            try:
+                if now - claim_path.stat().st_mtime >= self.stale_claim_seconds:
+                    os.replace(claim_path, self._get_entry_path(batch_id))
+            except FileNotFoundError:
+                continue  # sent, or taken back by another run of the program
+
+    def _claim(self, batch_id: str) -> bool:
+        """
+        Returns:
+          bool: False if another run of the program claimed the batch first, or already sent it.
+        """
+        claim_path = self._get_claim_path(batch_id)
+        try:
+            os.replace(self._get_entry_path(batch_id), claim_path)
+            # Moving keeps the time the batch was added, which would make the claim look stale.
+            os.utime(claim_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _release(self, batch_id: str) -> None:
+        """It gives the claim on a batch back, so the next run of the program sends it."""
+        with contextlib.suppress(FileNotFoundError):
+            os.replace(self._get_claim_path(batch_id), self._get_entry_path(batch_id))
+
+    def add(self, command: str, json_file_path: str) -> str:
+        """
+        It keeps a copy of the batch in the outbox and queues it, it returns before anything is sent
+
+        Args:
+          command (str): What the server is to do with the batch, such as "laser_parts_list_upload".
+          json_file_path (str): The batch's JSON file, copied as it is now.
+
+        Returns:
+          str: The batch ID, the key of the batch in `statuses`.
+        """
+        with open(json_file_path, "r", encoding="utf-8") as f:
+            payload = f.read()
+        with self._lock:
+            self._counter += 1
+            batch_id = f"{time.time_ns()}-{os.getpid()}-{self._counter}"
+        entry = {"command": command, "file_name": json_file_path, "payload": payload}
+
+        # Written atomically, a batch is either in the outbox whole or not at all.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temporary_path, self._get_entry_path(batch_id))
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
+        self._set_status(batch_id, QUEUED)
+        self._queue.put(batch_id)
+        return batch_id
+
+    def _run(self) -> None:
+        retry_seconds = self.retry_seconds
+        while not self._stopping.is_set():
+            try:
+                batch_id = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if not self._claim(batch_id):
+                if self.statuses.get(batch_id, (QUEUED,))[0] == QUEUED:
+                    self._set_status(batch_id, QUEUED, "sent by another run of the program")
+                self._queue.task_done()
+                continue
+            # The batches after it wait while the server can not be reached, so they are sent in order.
+            while not self._send_entry(batch_id):
+                if self._stopping.wait(retry_seconds):
+                    self._release(batch_id)  # it stays in the outbox for the next run
+                    break
+                retry_seconds = min(retry_seconds * 2, self.max_retry_seconds)
+            else:
+                retry_seconds = self.retry_seconds
+            self._queue.task_done()
+
+    def _send_entry(self, batch_id: str) -> bool:
+        """
+        Returns:
+          bool: False if the batch should be tried again later.
+        """
+        claim_path = self._get_claim_path(batch_id)
+        failed_path = self.failed_directory / f"{batch_id}.json"
+        try:
+            os.utime(claim_path)  # the claim is still used
+            with open(claim_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            command, file_name, payload = entry["command"], entry["file_name"], entry["payload"].encode("utf-8")
+        except FileNotFoundError:
+            return True  # taken back by another run of the program, as if this one had crashed
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            os.replace(claim_path, failed_path)
+            self._set_status(batch_id, FAILED, f"The outbox entry is damaged: {error}")
+            return True
+
+        try:
+            response = self.send(command, file_name, payload, batch_id)
+        except OSError as error:
+            self._set_status(batch_id, RETRYING, f"{type(error).__name__}: {error}")
+            return False
+        except Exception as error:
+            # The server answered something that is not understood, such as a garbled legacy answer.
+            # Sending it again would get the same answer, and the worker thread must keep going.
+            os.replace(claim_path, failed_path)
+            self._set_status(batch_id, FAILED, f"{type(error).__name__}: {error}")
+            return True
+        if response == SUCCESS_MESSAGE:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(claim_path)
+            self._set_status(batch_id, SENT, response)
+        else:
+            os.replace(claim_path, failed_path)
+            self._set_status(batch_id, FAILED, response)
+        return True
+
+    @property
+    def pending_count(self) -> int:
+        """How many batches are still waiting to be sent."""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float) -> bool:
+        """
+        It waits for the queued batches to be sent, for at most `timeout` seconds
+
+        Returns:
+          bool: True if nothing is left to send. What is left stays in the outbox for the next run.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending_count and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.pending_count
+
+    def wait_for(self, batch_id: str, timeout: float) -> tuple[str, str]:
+        """
+        It waits for one batch to be sent or refused, for at most `timeout` seconds
+
+        Returns:
+          tuple[str, str]: The status of the batch and its message, see `statuses`.
+        """
+        deadline = time.monotonic() + timeout
+        while self.statuses[batch_id][0] not in (SENT, FAILED) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.statuses[batch_id]
+
+    def close(self, timeout: float = 0.0) -> bool:
+        """
+        It flushes for at most `timeout` seconds and stops the worker thread
+
+        Returns:
+          bool: True if nothing was left to send.
+        """
+        flushed = self.flush(timeout)
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return flushed
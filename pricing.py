@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+
+from models import Part
+
+# Excel gives up on a circular reference after 100 iterations by default.
+MAX_ITERATIONS: int = 100
+
+
+class PriceList:
+    """The rates a quote is priced with, from global_variables.cfg and the price of steel files."""
+
+    __slots__ = ("price_per_pound", "cost_per_hour", "overhead", "profit_margin", "pounds_per_square_foot")
+
+    def __init__(
+        self,
+        price_per_pound: dict[str, float],
+        cost_per_hour: dict[str, float],
+        overhead: float,
+        profit_margin: float,
+        pounds_per_square_foot: dict[str, dict[str, float]],
+    ) -> None:
+        self.price_per_pound = price_per_pound
+        self.cost_per_hour = cost_per_hour
+        self.overhead = overhead
+        self.profit_margin = profit_margin
+        self.pounds_per_square_foot = pounds_per_square_foot
+
+
+def ceiling(values: np.ndarray) -> np.ndarray:
+    """
+    It rounds up to the next cent like Excel's CEILING(value, 0.01), without rounding 1.10 up to 1.11
+    because it is stored as 1.1000000000000001.
+    """
+    return np.ceil(np.round(values * 100, 9)) / 100
+
+
+class QuotePricing:
+    """The price of every part of a quote, one array per column of the sheet, and the totals.
+
+    The arrays are in the same order as the parts they were priced from. Parts whose material has no
+    price per pound have NaN costs, just like the sheet shows #N/A for them.
+    """
+
+    __slots__ = (
+        "cogs",
+        "overhead",
+        "unit_price",
+        "price",
+        "total_cost",
+        "total_parts",
+        "total_quantity",
+        "total_machining_time",
+        "total_weight",
+        "total_surface_area",
+        "total_cutting_length",
+        "total_piercing_time",
+        "total_cogs",
+        "total_overhead",
+        "total_price",
+        "total_cost_sum",
+        "sheet_cost",
+    )
+
+    def __init__(self, parts: list[Part], cutting_with: str, price_list: PriceList) -> None:
+        """
+        It prices all the parts at once
+
+        Args:
+          parts (list[Part]): The parts of the quote, in the order they are on the sheet.
+          cutting_with (str): The gas the quote is cut with, "Nitrogen" or "CO2".
+          price_list (PriceList): The rates to price with.
+        """
+        quantity = np.array([part.quantity for part in parts], dtype=float)
+        machining_time = np.array([part.machining_time for part in parts], dtype=float)
+        weight = np.array([part.weight for part in parts], dtype=float)
+        price_per_pound = np.array(
+            [price_list.price_per_pound.get(part.material, math.nan) for part in parts], dtype=float
+        )
+        cost_per_minute = price_list.cost_per_hour.get(cutting_with, math.nan) / 60
+
+        self.cogs = price_per_pound * weight + cost_per_minute * machining_time
+
+        # Overhead is a share of the unit price, and the unit price is marked up from the cost that
+        # includes the overhead. The sheet has these as a circular reference, so they are solved the
+        # way Excel's iterative calculation does it, starting from nothing.
+        unit_price = np.zeros(len(parts))
+        for _ in range(MAX_ITERATIONS):
+            overhead = unit_price * price_list.overhead
+            total_cost = ceiling(self.cogs + overhead)
+            next_unit_price = ceiling(total_cost / (1 - price_list.profit_margin))
+            if np.array_equal(next_unit_price, unit_price, equal_nan=True):
+                break
+            unit_price = next_unit_price
+        self.unit_price = unit_price
+        self.overhead = unit_price * price_list.overhead
+        self.total_cost = ceiling(self.cogs + self.overhead)
+        self.price = ceiling(quantity * unit_price)
+
+        self.total_parts = len(parts)
+        self.total_quantity = float(quantity.sum())
+        self.total_machining_time = float(machining_time @ quantity)
+        self.total_weight = float(weight @ quantity)
+        self.total_surface_area = float(np.array([part.surface_area for part in parts], dtype=float) @ quantity)
+        self.total_cutting_length = float(np.array([part.cutting_length for part in parts], dtype=float) @ quantity)
+        self.total_piercing_time = float(np.array([part.piercing_time for part in parts], dtype=float) @ quantity)
+        self.total_cogs = float(self.cogs.sum())
+        self.total_overhead = float(self.overhead.sum())
+        self.total_price = float(self.price.sum())
+        self.total_cost_sum = float(self.total_cost.sum())
+        self.sheet_cost: float = math.nan
+
+    def price_sheets(
+        self, sheet_dim: str, sheet_count: int, material: str, gauge: str, price_list: PriceList
+    ) -> float:
+        """
+        It works out what the sheets of the quote cost, and keeps it as `sheet_cost`
+
+        Args:
+          sheet_dim (str): The size of the sheets in inches, such as "120.000x60.000".
+          sheet_count (int): How many sheets are cut.
+          material (str): The material of the sheets, such as "Mild Steel".
+          gauge (str): The thickness of the sheets, such as "16 Gauge".
+          price_list (PriceList): The rates to price with.
+
+        Returns:
+          float: The cost of the sheets, NaN if the material or gauge is not in the price list.
+        """
+        length, width = (float(side) for side in sheet_dim.split("x"))
+        price_per_pound = price_list.price_per_pound.get(material, math.nan)
+        pounds_per_square_foot = price_list.pounds_per_square_foot.get(material, {}).get(gauge, math.nan)
+        self.sheet_cost = length * width / 144 * price_per_pound * pounds_per_square_foot * sheet_count
+        return self.sheet_cost
+
+    def get_row(self, index: int) -> tuple[float, float, float, float, float]:
+        """
+        Returns:
+          tuple[float, float, float, float, float]: The COGS, overhead, unit price, price and total cost
+        of one part.
+        """
+        return (
+            float(self.cogs[index]),
+            float(self.overhead[index]),
+            float(self.unit_price[index]),
+            float(self.price[index]),
+            float(self.total_cost[index]),
+        )
@@ -0,0 +1,410 @@
+"""
+Keeps the quoting pipeline running in the background and makes quotes and work orders as jobs come in,
+without starting the program, reading the settings and prices, or starting worker processes for every
+quote. Several jobs run at the same time, and every job is what `main.py --job` takes:
+
+    {"pdfs": ["C:/nests/a.pdf"], "material": "Mild Steel", "action": "quote"}
+
+A job is given by dropping a JSON file in the inbox folder, write it under another name and rename it
+to .json once it is whole. The summary of its jobs is written to inbox/done/{name}.result.json and the
+file itself is moved there too. With --port, jobs can also be sent over a local connection, framed the
+way upload_client.py frames batches, and the summaries are sent back once the jobs are done:
+
+    python quote_daemon.py --port 8766 --jobs 2
+    python quote_daemon.py --port 8766 --submit job.json
+
+With --watch, the nest reports the CAM station drops in a folder are quoted as they land, without any
+job file, see `QuoteDaemon.watch`. Their summaries are written to inbox/done too:
+
+    python quote_daemon.py --watch "Z:/CAM/Nests"
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import main
+from config import get_config, program_directory
+from main import print
+from upload_client import receive_frame, send_frame
+
+if TYPE_CHECKING:
+    from hot_folder import HotFolder
+    from models import Nest
+
+
+class QuoteDaemon:
+    """Runs quote jobs on the same settings, prices and worker processes until it is stopped.
+
+    Every job runs `main.run_job` in a thread of its own, at most `job_count` at a time, and the PDFs of
+    every job are parsed by one pool of worker processes that is started once. The price files are read
+    again when they change. A work order is sent to inventory through the outbox, its job waits at most
+    upload_flush_seconds for it to be taken.
+    """
+
+    def __init__(
+        self, inbox_directory: str, job_count: int = 2, poll_seconds: float = 1.0, use_cache: bool = True
+    ) -> None:
+        """
+        Args:
+          inbox_directory (str): Where job files are dropped.
+          job_count (int, optional): How many jobs run at the same time. Defaults to 2.
+          poll_seconds (float, optional): How often the inbox is looked at. Defaults to 1.
+          use_cache (bool, optional): Look up and store parsed PDFs in the nest cache. Defaults to True.
+        """
+        from nest_ingest import get_worker_count
+
+        self.config = get_config()
+        self.inbox_directory = Path(inbox_directory)
+        self.running_directory = self.inbox_directory / "running"
+        self.done_directory = self.inbox_directory / "done"
+        for directory in (self.running_directory, self.done_directory):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.poll_seconds = poll_seconds
+        self.use_cache = use_cache
+        self.worker_count = get_worker_count(self.config.workers, os.cpu_count() or 1)
+        self.workers = ProcessPoolExecutor(max_workers=self.worker_count)
+        self.jobs = ThreadPoolExecutor(max_workers=job_count, thread_name_prefix="job")
+        # Parses the PDFs of the hot folder as they land, apart from the jobs so a job waiting for its
+        # PDFs never holds up the parsing it waits for.
+        self.preparing = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix="prepare")
+        self.outbox = main.get_outbox()
+        self.hot_folder: "HotFolder | None" = None
+        self._prepared: dict[str, Future] = {}
+        self._stopping = threading.Event()
+        self._inbox_thread: threading.Thread | None = None
+        self._job_numbers = itertools.count(1)
+
+    def start(self) -> None:
+        """It starts the worker processes, reads the prices and starts watching the inbox."""
+        from nest_ingest import warm_up
+
+        print(f"[ ] Starting {self.worker_count} workers")
+        for future in [self.workers.submit(warm_up) for _ in range(self.worker_count)]:
+            future.result()
+        self.config.refresh_prices()
+        main.get_price_list()
+        # The first job would import them otherwise.
+        import excel_file  # noqa: F401
+        import thumbnails  # noqa: F401
+
+        # Jobs that were running when the daemon was stopped are run again, under their own name unless a
+        # job file with that name was dropped in the meantime.
+        for running_path in self.running_directory.glob("*.json"):
+            job_path = self.inbox_directory / self._get_job_file_name(running_path)
+            if job_path.exists():
+                job_path = self.inbox_directory / running_path.name
+            os.replace(running_path, job_path)
+        self._inbox_thread = threading.Thread(target=self._watch_inbox, name="inbox", daemon=True)
+        self._inbox_thread.start()
+        print(f'[+] Watching "{self.inbox_directory}" for jobs')
+
+    def stop(self) -> None:
+        """It stops taking jobs, waits for the running ones and for their work orders to be sent."""
+        self._stopping.set()
+        if self._inbox_thread is not None:
+            self._inbox_thread.join()
+        if self.hot_folder is not None:
+            self.hot_folder.stop()
+        self.preparing.shutdown(wait=True)
+        self.jobs.shutdown(wait=True)
+        self.workers.shutdown(wait=True)
+        if not self.outbox.close(timeout=self.config.upload_flush_seconds):
+            print("[-] Some work orders could not be sent to inventory yet, they are sent the next time.")
+
+    def watch(
+        self, directory: str, settle_seconds: float = 5.0, group_seconds: float = 30.0, include_existing: bool = False
+    ) -> None:
+        """
+        It quotes the nest reports dropped in a hot folder, see `hot_folder.HotFolder`. Every PDF is
+        parsed and put in the nest cache as soon as it landed, so its job only has to make the workbook.
+        The material of a job comes from the material ID on its nest reports, a job with several
+        materials is one quote per material.
+
+        Args:
+          directory (str): The folder the CAM station drops nest reports in.
+          settle_seconds (float, optional): How long a PDF has to stay the same to be quoted. Defaults to 5.
+          group_seconds (float, optional): How long to wait for more PDFs of a job. Defaults to 30.
+          include_existing (bool, optional): Also quote the PDFs that are already in the folder the first
+        time it is watched. Defaults to False.
+        """
+        from hot_folder import HotFolder
+
+        self.hot_folder = HotFolder(
+            directory,
+            str(self.inbox_directory / "hot_folder.state"),
+            on_ready=self._prepare,
+            on_group=lambda name, file_names: self.jobs.submit(self._quote_group, name, file_names),
+            settle_seconds=settle_seconds,
+            group_seconds=group_seconds,
+            include_existing=include_existing,
+        )
+        self.hot_folder.start()
+        how = "as it changes" if self.hot_folder.uses_watchdog else "by scanning it, install watchdog to be told"
+        print(f'[+] Watching "{directory}" for nest reports {how}')
+
+    def _parse(self, file_names: list[str]) -> list[tuple["Nest", list[tuple[bytes, str, str]]]]:
+        from nest_ingest import ingest_nest_pdfs
+
+        return ingest_nest_pdfs(
+            file_names,
+            self.config.size_of_picture,
+            self.config.workers,
+            lambda: None,
+            cache=main.get_nest_cache() if self.use_cache else None,
+            executor=self.workers,
+        )
+
+    def _prepare(self, file_name: str) -> None:
+        if self.use_cache:
+            self._prepared[file_name] = self.preparing.submit(self._parse, [file_name])
+
+    def _quote_group(self, name: str, file_names: list[str]) -> None:
+        # Waits for the PDFs that are still being parsed, one that could not be parsed fails the job below.
+        for file_name in file_names:
+            if (future := self._prepared.pop(file_name, None)) is not None:
+                future.exception()
+        try:
+            # Parsed once here and handed to the jobs, without the nest cache they would parse them again.
+            ingested_nests_by_material: dict[str, tuple[list[str], list]] = {}
+            for file_name, ingested_nest in zip(file_names, self._parse(file_names)):
+                material = main.convert_material_id_to_name(ingested_nest[0].material_id)
+                material_file_names, ingested_nests = ingested_nests_by_material.setdefault(material, ([], []))
+                material_file_names.append(file_name)
+                ingested_nests.append(ingested_nest)
+        except Exception as error:
+            print(f'[-] Could not quote "{name}": {error}')
+            error_message = f"{type(error).__name__}: {error}"
+            summaries = [{"name": name, "ok": False, "pdfs": file_names, "error": error_message}]
+        else:
+            summaries = []
+            for material, (material_file_names, ingested_nests) in ingested_nests_by_material.items():
+                job_name = name if len(ingested_nests_by_material) == 1 else f"{name}-{material}"
+                summaries.append(self.run(main.QuoteJob(job_name, material_file_names, material), ingested_nests))
+        self._write_summaries(name, summaries)
+        # Only now, a job that was stopped before its summary was written is quoted again the next time.
+        self.hot_folder.done(name)
+
+    def request_stop(self) -> None:
+        self._stopping.set()
+
+    def wait(self) -> None:
+        """It waits until `request_stop` is called, or Ctrl+C is pressed."""
+        with contextlib.suppress(KeyboardInterrupt):
+            while not self._stopping.wait(0.5):
+                pass
+
+    def make_jobs(self, data: dict | list) -> list[main.QuoteJob]:
+        """
+        Args:
+          data (dict | list): One job or a list of jobs, see `main.QuoteJob.from_dict`.
+
+        Returns:
+          list[main.QuoteJob]: The jobs, the ones without a name are named after the time and a number,
+        so jobs sent at the same time do not write over each other.
+        """
+        job_list = data if isinstance(data, list) else [data]
+        timestamp = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        return [main.QuoteJob.from_dict(job, f"{timestamp}-{next(self._job_numbers)}") for job in job_list]
+
+    def submit(self, jobs: list[main.QuoteJob]) -> list[Future]:
+        """
+        Returns:
+          list[Future]: The summary of every job, see `main.run_job`, once it is done.
+        """
+        return [self.jobs.submit(self.run, job) for job in jobs]
+
+    def run(self, job: main.QuoteJob, ingested_nests: list | None = None) -> dict:
+        """
+        It runs one job, a job that fails has "ok" set to False and the error in its summary
+
+        Args:
+          job (main.QuoteJob): What to quote.
+          ingested_nests (list | None, optional): The PDFs of the job, already parsed, see
+        `main.build_quote`. Defaults to None, to parse them.
+
+        Returns:
+          dict: The summary of the job, see `main.run_job`.
+        """
+        print(f'[ ] Running job "{job.name}"')
+        if self.config.refresh_prices():
+            print("[+] The price files changed, they were read again")
+        try:
+            summary = main.run_job(job, self.use_cache, executor=self.workers, ingested_nests=ingested_nests)
+        except Exception as error:
+            print(f'[-] Job "{job.name}" failed: {error}')
+            return {"name": job.name, "ok": False, "error": f"{type(error).__name__}: {error}"}
+        if summary["upload_batch"] is not None:
+            summary["upload_status"], summary["upload_response"] = self.outbox.wait_for(
+                summary["upload_batch"], self.config.upload_flush_seconds
+            )
+            summary["ok"] = summary["upload_status"] == "sent"
+        print(f'[+] Finished job "{job.name}"')
+        return summary
+
+    def _watch_inbox(self) -> None:
+        while not self._stopping.is_set():
+            self.poll_inbox()
+            self._stopping.wait(self.poll_seconds)
+
+    def poll_inbox(self) -> None:
+        """It starts the jobs of every job file in the inbox, the oldest first."""
+        try:
+            job_paths = sorted(self.inbox_directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        except FileNotFoundError:
+            return  # one was taken while looking, the rest are started the next time
+        for job_path in job_paths:
+            # Made unique, a job file dropped under the name of one that is still running must not replace it.
+            running_path = self.running_directory / f"{time.time_ns()}.{job_path.name}"
+            try:
+                os.replace(job_path, running_path)
+            except OSError:
+                continue  # taken by someone else, or not closed by whoever is writing it yet
+            try:
+                futures = self.submit(main.load_jobs([str(running_path)]))
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                print(f'[-] "{job_path.name}" is not a job file: {error}')
+                summary = {"name": job_path.stem, "ok": False, "error": f"{type(error).__name__}: {error}"}
+                self._finish_job_file(running_path, [summary])
+                continue
+            self._when_done(futures, lambda summaries, path=running_path: self._finish_job_file(path, summaries))
+
+    def _when_done(self, futures: list[Future], callback) -> None:
+        """It calls `callback` with the results of every future, once the last one is done."""
+        if not futures:
+            callback([])
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def future_done(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            callback([future.result() for future in futures])
+
+        for future in futures:
+            future.add_done_callback(future_done)
+
+    def _write_summaries(self, name: str, summaries: list[dict]) -> None:
+        result_path = self.done_directory / f"{name}.result.json"
+        with open(result_path, "w") as f:
+            json.dump(summaries, f, indent=4)
+        print(f'[+] Wrote "{result_path}"')
+
+    @staticmethod
+    def _get_job_file_name(running_path: Path) -> str:
+        """The name the job file of a running job was dropped under, without what made it unique."""
+        return running_path.name.split(".", 1)[1]
+
+    def _finish_job_file(self, running_path: Path, summaries: list[dict]) -> None:
+        job_file_name = self._get_job_file_name(running_path)
+        self._write_summaries(Path(job_file_name).stem, summaries)
+        os.replace(running_path, self.done_directory / job_file_name)
+
+
+class JobRequestHandler(socketserver.BaseRequestHandler):
+    """Runs the jobs of every request sent over one connection and sends back their summaries."""
+
+    def handle(self) -> None:
+        quote_daemon: QuoteDaemon = self.server.quote_daemon
+        while True:
+            try:
+                request = receive_frame(self.request)
+            except ConnectionError:
+                return  # the client closed the connection between requests
+            try:
+                futures = quote_daemon.submit(quote_daemon.make_jobs(json.loads(request)))
+            except (ValueError, KeyError, TypeError) as error:
+                summaries = [{"name": None, "ok": False, "error": f"{type(error).__name__}: {error}"}]
+            else:
+                summaries = [future.result() for future in futures]
+            send_frame(self.request, json.dumps(summaries).encode("utf-8"))
+
+
+class JobServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], quote_daemon: QuoteDaemon) -> None:
+        super().__init__(address, JobRequestHandler)
+        self.quote_daemon = quote_daemon
+
+
+def submit_jobs(data: dict | list, host: str, port: int) -> list[dict]:
+    """
+    It sends jobs to a running quote daemon and waits for them to be done
+
+    Args:
+      data (dict | list): One job or a list of jobs, the paths of their PDFs as the daemon sees them.
+      host (str): Where the daemon runs.
+      port (int): The port it was started with.
+
+    Returns:
+      list[dict]: The summary of every job, see `main.run_job`.
+    """
+    with socket.create_connection((host, port)) as connection:
+        send_frame(connection, json.dumps(data).encode("utf-8"))
+        return json.loads(receive_frame(connection))
+
+
+def run() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--inbox", default=f"{program_directory}/inbox", help="the folder job files are dropped in")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="the address to take jobs on, only this computer by default")
+    arg_parser.add_argument("--port", type=int, help="also take jobs over a local connection on this port")
+    arg_parser.add_argument("--jobs", type=int, default=2, help="how many jobs run at the same time")
+    arg_parser.add_argument("--poll-seconds", type=float, default=1.0, help="how often the inbox is looked at")
+    arg_parser.add_argument("--no-cache", action="store_true", help="parse every PDF again instead of using the nest cache")
+    arg_parser.add_argument("--watch", metavar="FOLDER", help="quote the nest reports dropped in this folder")
+    arg_parser.add_argument("--settle-seconds", type=float, default=5.0, help="how long a PDF has to stay the same to be quoted")
+    arg_parser.add_argument("--group-seconds", type=float, default=30.0, help="how long to wait for more PDFs of a job")
+    arg_parser.add_argument(
+        "--quote-existing", action="store_true", help="also quote the PDFs already in the folder the first time it is watched"
+    )
+    arg_parser.add_argument("--submit", metavar="JOB", help="send a job file to the daemon running on --port and print the summaries")
+    args = arg_parser.parse_args()
+
+    if args.submit:
+        if args.port is None:
+            arg_parser.error("--submit needs --port")
+        with open(args.submit, "r") as f:
+            data = json.load(f)
+        summaries = submit_jobs(data, args.host, args.port)
+        sys.stdout.write(json.dumps(summaries, indent=4) + "\n")
+        return
+
+    quote_daemon = QuoteDaemon(args.inbox, args.jobs, args.poll_seconds, use_cache=not args.no_cache)
+    quote_daemon.start()
+    if args.watch:
+        quote_daemon.watch(args.watch, args.settle_seconds, args.group_seconds, args.quote_existing)
+    signal.signal(signal.SIGTERM, lambda *_: quote_daemon.request_stop())
+    job_server = None
+    if args.port is not None:
+        job_server = JobServer((args.host, args.port), quote_daemon)
+        threading.Thread(target=job_server.serve_forever, name="jobs", daemon=True).start()
+        print(f"[+] Taking jobs on {args.host}:{job_server.server_address[1]}")
+    quote_daemon.wait()
+    print("[ ] Stopping, waiting for the running jobs")
+    if job_server is not None:
+        job_server.shutdown()
+        job_server.server_close()
+    quote_daemon.stop()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    run()
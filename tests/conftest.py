@@ -0,0 +1,9 @@
+import os
+import sys
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# The modules live at the top of the repository, next to main.py, not in a package. The synthetic nest
+# reports of the benchmarks are used by the parser tests.
+sys.path.insert(0, REPOSITORY_DIRECTORY)
+sys.path.insert(0, os.path.join(REPOSITORY_DIRECTORY, "benchmarks"))
@@ -0,0 +1,92 @@
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from excel_file import ExcelFile
+
+
+def write_part_rows(excel_file: ExcelFile, first_row: int, row_count: int) -> None:
+    for row in range(first_row, first_row + row_count):
+        excel_file.write_row(
+            row,
+            0,
+            ["", f"Part {row}", row % 7 + 1, row * 0.25, f"=C{row + 1}*D{row + 1}", "Laser", None, 1.5],
+            number_formats=[None, None, None, "$#,##0.00", "$#,##0.00", None, None, "0.00"],
+            values=[None, None, None, None, (row % 7 + 1) * row * 0.25, None, None, None],
+        )
+        excel_file.write_item_to_sheet(row, 0, f"Part {row}")
+        excel_file.write_item_to_sheet(row, 1, row * 0.5)
+
+
+def test_formats_do_not_grow_with_the_rows(tmp_path):
+    excel_file = ExcelFile(str(tmp_path / "quote.xlsx"), str(tmp_path))
+    write_part_rows(excel_file, 4, 10)
+    format_count = len(excel_file.workbook.formats)
+
+    write_part_rows(excel_file, 14, 1000)
+
+    assert len(excel_file.workbook.formats) == format_count
+    excel_file.save()
+
+
+def test_get_format_shares_formats_with_the_same_properties(tmp_path):
+    excel_file = ExcelFile(str(tmp_path / "quote.xlsx"), str(tmp_path))
+
+    cell_format = excel_file.get_format({"bold": True, "font_name": excel_file.FONT_NAME})
+
+    assert excel_file.get_format({"font_name": excel_file.FONT_NAME, "bold": True}) is cell_format
+    assert excel_file.get_format({"bold": False, "font_name": excel_file.FONT_NAME}) is not cell_format
+    excel_file.save()
+
+
+def read_row(path: str, sheet_number: int, row: int) -> dict[str, str]:
+    """The formula or text of every cell of a saved row, by cell name, read from the workbook's XML."""
+    namespace = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    with zipfile.ZipFile(path) as workbook:
+        shared_strings = []
+        if "xl/sharedStrings.xml" in workbook.namelist():
+            strings = ElementTree.fromstring(workbook.read("xl/sharedStrings.xml"))
+            shared_strings = ["".join(si.itertext()) for si in strings.findall("main:si", namespace)]
+        sheet = ElementTree.fromstring(workbook.read(f"xl/worksheets/sheet{sheet_number}.xml"))
+    cells = {}
+    for cell in sheet.findall(f"main:sheetData/main:row[@r='{row}']/main:c", namespace):
+        if (formula := cell.find("main:f", namespace)) is not None:
+            cells[cell.get("r")] = f"={formula.text}"
+        elif cell.get("t") == "s":
+            cells[cell.get("r")] = shared_strings[int(cell.find("main:v", namespace).text)]
+        elif cell.get("t") == "inlineStr":
+            cells[cell.get("r")] = "".join(cell.find("main:is", namespace).itertext())
+        elif (value := cell.find("main:v", namespace)) is not None:
+            cells[cell.get("r")] = value.text
+    return cells
+
+
+@pytest.mark.parametrize("constant_memory", [False, True])
+def test_write_row_to_sheet_keeps_the_items_without_values(tmp_path, constant_memory):
+    path = str(tmp_path / "quote.xlsx")
+    excel_file = ExcelFile(path, str(tmp_path), constant_memory=constant_memory)
+    items = ["Total machine time (min): ", "", "", "=1+1", "Total machine time (hour):", "", "", "=$D$6/60"]
+    items += ["As of: ", "=NOW()", "done at: ", "=NOW()+($D$6/1440)"]
+
+    excel_file.add_list_to_sheet(cell="A8", items=items, values=[None, None, None, 2])
+    excel_file.save()
+
+    row = read_row(path, 2, 8)  # the info sheet
+    assert row["D8"] == "=1+1"
+    assert row["E8"] == "Total machine time (hour):"
+    assert row["H8"] == "=$D$6/60"
+    assert row["I8"] == "As of: "
+    assert row["J8"] == "=NOW()"
+    assert row["K8"] == "done at: "
+    assert row["L8"] == "=NOW()+($D$6/1440)"
+
+
+def test_write_row_keeps_the_items_without_number_formats_or_values(tmp_path):
+    path = str(tmp_path / "quote.xlsx")
+    excel_file = ExcelFile(path, str(tmp_path))
+
+    excel_file.write_row(4, 0, ["Part", 2, "=B5*2", "Laser"], number_formats=["@"], values=[None, None, 4])
+    excel_file.save()
+
+    assert read_row(path, 1, 5) == {"A5": "Part", "B5": "2", "C5": "=B5*2", "D5": "Laser"}
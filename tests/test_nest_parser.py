@@ -0,0 +1,117 @@
+import pytest
+
+from nest_parser import (
+    STREAM_LOOKBEHIND_SIZE,
+    STREAM_TAIL_SIZE,
+    NestReportError,
+    NestReportParser,
+    NestReportStream,
+)
+from synthetic_nest import make_nest_report_pages
+
+REPORT = (
+    "PRODUCTION PACKAGE\n"
+    "PROGRAM RUNS:  /  SCRAP: 3  /  12.50 %\n"
+    "MATERIAL ID (SHEET): SS-018 \n"
+    "BLANK: 120.000 x 60.000 x 0.048 in\n"
+    "PART NUMBER: 1\n"
+    "GEOFILE NAME: C:\\TRUMPF\\Parts\\Job\\BRACKET.GEO\n"
+    "  NUMBER: 4\n"
+    "MACHINING TIME: 1.25 min\n"
+    "WEIGHT: 2.500 lb\n"
+    "SURFACE: 40.00  in2\n"
+    "CUTTING LENGTH: 30.50  in\n"
+    "PIERCING TIME 0.75  s\n"
+    "PART NUMBER: 2\n"
+    "GEOFILE NAME: C:\\TRUMPF\\Parts\\Job\\PLATE 2.GEO\n"
+    "  NUMBER: 10\n"
+    "MACHINING TIME: 0.50 min\n"
+    "WEIGHT: 1.000 lb\n"
+    "SURFACE: 12.00  in2\n"
+    "CUTTING LENGTH: 8.25  in\n"
+    "PIERCING TIME 0.10  s\n"
+)
+
+
+def describe(nest) -> tuple:
+    """Everything that was parsed, in a form that can be compared."""
+    sheet = (nest.quantity_multiplier, nest.scrap_percentage, nest.sheet_dim, nest.material_id, nest.gauge_id)
+    return sheet, [part.to_dict() for part in nest.parts]
+
+
+def split_every(text: str, size: int) -> list[str]:
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+def test_parse():
+    nest = NestReportParser().parse(REPORT.replace(" \n", " "))
+
+    assert (nest.quantity_multiplier, nest.scrap_percentage) == (3, 12.5)
+    assert (nest.material_id, nest.gauge_id, nest.sheet_dim) == ("SS", "018", "120.000x60.000")
+    first, second = nest.parts
+    assert (first.part_name, first.quantity, first.machining_time, first.weight) == ("BRACKET", 4, 1.25, 2.5)
+    assert (first.surface_area, first.cutting_length, first.piercing_time, first.part_number) == (40.0, 30.5, 0.75, 1)
+    assert (second.part_name, second.quantity, second.part_number) == ("PLATE 2", 10, 2)
+
+
+def test_blank_on_the_material_id_line():
+    nest = NestReportParser().parse(REPORT.replace("SS-018 \nBLANK", "SS-018 BLANK"))
+
+    assert (nest.material_id, nest.gauge_id, nest.sheet_dim) == ("SS", "018", "120.000x60.000")
+
+
+@pytest.mark.parametrize("blank_on_material_line", [False, True])
+@pytest.mark.parametrize("parts_per_page", [1, 6, 25])
+def test_parse_pages_finds_what_parse_finds(parts_per_page, blank_on_material_line):
+    pages = make_nest_report_pages(60, parts_per_page, blank_on_material_line=blank_on_material_line)
+    parser = NestReportParser()
+
+    nest = parser.parse("".join(pages).replace(" \n", " "))
+
+    assert len(nest.parts) == 60
+    assert describe(parser.parse_pages(pages)) == describe(nest)
+
+
+@pytest.mark.parametrize(
+    "page_size",
+    [1, 7, STREAM_LOOKBEHIND_SIZE - 1, STREAM_LOOKBEHIND_SIZE, STREAM_LOOKBEHIND_SIZE + 1, 100]
+    + [STREAM_TAIL_SIZE - 1, STREAM_TAIL_SIZE, STREAM_TAIL_SIZE + 1, 3 * STREAM_TAIL_SIZE + 5],
+)
+def test_fields_split_by_a_page_break_are_found(page_size):
+    # The pages break in the middle of part records, labels and values, and between " " and "\n".
+    text = "".join(make_nest_report_pages(40, seed=3))
+    expected = describe(NestReportParser().parse(text.replace(" \n", " ")))
+
+    assert describe(NestReportParser().parse_pages(split_every(text, page_size))) == expected
+
+
+def test_feed_returns_the_parts_as_they_are_completed():
+    pages = make_nest_report_pages(30, parts_per_page=5)
+    normalized_text = []
+    stream = NestReportStream(on_text=normalized_text.append)
+
+    completed = [stream.feed(page) for page in pages]
+    nest = stream.close()
+
+    assert sum(map(len, completed)) <= len(nest.parts) == 30
+    assert [part.to_dict() for parts in completed for part in parts] == [
+        part.to_dict() for part in nest.parts[: sum(map(len, completed))]
+    ]
+    # The parts of the first pages are returned before the report ends.
+    assert sum(map(len, completed[:3])) >= 5
+    assert "".join(normalized_text) == "".join(pages).replace(" \n", " ")
+
+
+def test_a_missing_part_field_raises():
+    text = REPORT.replace("WEIGHT: 1.000 lb\n", "")
+
+    with pytest.raises(NestReportError, match="weight"):
+        NestReportParser().parse(text.replace(" \n", " "))
+    with pytest.raises(NestReportError, match="weight"):
+        NestReportParser().parse_pages(split_every(text, 50))
+
+
+@pytest.mark.parametrize("line", ["BLANK: 120.000 x 60.000 x 0.048 in\n", "PROGRAM RUNS:  /  SCRAP: 3  /  12.50 %\n"])
+def test_missing_sheet_information_raises(line):
+    with pytest.raises(NestReportError):
+        NestReportParser().parse(REPORT.replace(line, "").replace(" \n", " "))
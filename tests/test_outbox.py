@@ -0,0 +1,124 @@
+import json
+import os
+import time
+
+import pytest
+
+from outbox import FAILED, QUEUED, SENT, Outbox
+from upload_client import SUCCESS_MESSAGE
+
+
+class FakeServer:
+    """A `send` for the outbox that remembers what it was sent, and can be down for a number of tries."""
+
+    def __init__(self, down_for: int = 0) -> None:
+        self.down_for = down_for
+        self.batch_ids: list[str] = []
+
+    def send(self, command: str, file_name: str, payload: bytes, batch_id: str) -> str:
+        if self.down_for:
+            self.down_for -= 1
+            raise ConnectionRefusedError("the server is down")
+        self.batch_ids.append(batch_id)
+        return SUCCESS_MESSAGE
+
+
+@pytest.fixture
+def batch_file(tmp_path) -> str:
+    path = tmp_path / "batch.json"
+    path.write_text('{"parts": []}', encoding="utf-8")
+    return str(path)
+
+
+def get_outbox(directory, send, **kwargs) -> Outbox:
+    return Outbox(str(directory), send, retry_seconds=0.01, max_retry_seconds=0.05, **kwargs)
+
+
+def test_batches_are_sent_in_order_while_the_server_comes_back(tmp_path, batch_file):
+    server = FakeServer(down_for=3)
+    outbox = get_outbox(tmp_path / "outbox", server.send)
+    outbox.start()
+
+    batch_ids = [outbox.add("laser_parts_list_upload", batch_file) for _ in range(5)]
+
+    assert outbox.close(timeout=5.0)
+    assert server.batch_ids == batch_ids
+    assert all(outbox.statuses[batch_id][0] == SENT for batch_id in batch_ids)
+    assert list((tmp_path / "outbox").glob("**/*.json")) == []
+
+
+def test_batches_that_were_not_sent_are_sent_by_the_next_run(tmp_path, batch_file):
+    outbox = get_outbox(tmp_path / "outbox", FakeServer(down_for=1000).send)
+    outbox.start()
+    batch_ids = [outbox.add("laser_parts_list_upload", batch_file) for _ in range(3)]
+    assert not outbox.close(timeout=0.2)
+    assert list((tmp_path / "outbox" / "sending").iterdir()) == []  # the claim was given back
+
+    server = FakeServer()
+    outbox = get_outbox(tmp_path / "outbox", server.send)
+    outbox.start()
+
+    assert outbox.close(timeout=5.0)
+    assert server.batch_ids == batch_ids
+    assert outbox.statuses[batch_ids[0]] == (SENT, SUCCESS_MESSAGE)
+
+
+def test_a_claim_left_by_a_run_that_crashed_is_sent_once_it_is_stale(tmp_path):
+    sending_directory = tmp_path / "outbox" / "sending"
+    sending_directory.mkdir(parents=True)
+    entry = {"command": "laser_parts_list_upload", "file_name": "a.json", "payload": "{}"}
+    for name, age in (("1-1-1.crashed.json", 1000.0), ("2-2-2.running.json", 10.0)):
+        (sending_directory / name).write_text(json.dumps(entry), encoding="utf-8")
+        os.utime(sending_directory / name, (time.time() - age, time.time() - age))
+
+    server = FakeServer()
+    outbox = get_outbox(tmp_path / "outbox", server.send, stale_claim_seconds=600.0)
+    outbox.start()
+
+    assert outbox.close(timeout=5.0)
+    assert server.batch_ids == ["1-1-1"]
+    assert [path.name for path in sending_directory.iterdir()] == ["2-2-2.running.json"]
+
+
+def test_two_outboxes_on_one_directory_send_every_batch_once(tmp_path, batch_file):
+    batch_ids = [get_outbox(tmp_path / "outbox", None).add("laser_parts_list_upload", batch_file) for _ in range(20)]
+    server = FakeServer()
+    outboxes = [get_outbox(tmp_path / "outbox", server.send) for _ in range(2)]
+    for outbox in outboxes:
+        outbox.start()
+
+    for outbox in outboxes:
+        assert outbox.close(timeout=5.0)
+    assert sorted(server.batch_ids) == sorted(batch_ids)
+
+
+def test_an_answer_that_is_not_understood_fails_the_batch_and_the_next_one_is_sent(tmp_path, batch_file):
+    server = FakeServer()
+
+    def send(command: str, file_name: str, payload: bytes, batch_id: str) -> str:
+        if not server.batch_ids:
+            server.batch_ids.append(batch_id)
+            b"\xff".decode("utf-8")  # a garbled answer of the legacy protocol
+        return server.send(command, file_name, payload, batch_id)
+
+    outbox = get_outbox(tmp_path / "outbox", send)
+    outbox.start()
+    first, second = (outbox.add("laser_parts_list_upload", batch_file) for _ in range(2))
+
+    assert outbox.close(timeout=5.0)
+    assert outbox.statuses[first][0] == FAILED
+    assert outbox.statuses[second][0] == SENT
+    assert [path.stem for path in (tmp_path / "outbox" / "failed").iterdir()] == [first]
+
+
+def test_a_batch_added_before_the_outbox_started_is_sent_once(tmp_path, batch_file):
+    server = FakeServer()
+    outbox = get_outbox(tmp_path / "outbox", server.send)
+    batch_id = outbox.add("laser_parts_list_upload", batch_file)
+    assert outbox.statuses[batch_id][0] == QUEUED
+
+    outbox.start()
+
+    assert outbox.close(timeout=5.0)
+    assert server.batch_ids == [batch_id]
+    assert outbox.statuses[batch_id] == (SENT, SUCCESS_MESSAGE)
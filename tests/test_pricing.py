@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+import pytest
+
+import pricing
+from models import Part
+from pricing import PriceList, QuotePricing, ceiling
+
+
+def make_part(quantity: int, machining_time: float, weight: float, material: str = "Mild Steel") -> Part:
+    return Part("BRACKET", quantity, machining_time, weight, 10.0, 20.0, 1.5, 1, material=material)
+
+
+def make_price_list(overhead: float = 0.1, profit_margin: float = 0.2) -> PriceList:
+    return PriceList(
+        price_per_pound={"Mild Steel": 1.0},
+        cost_per_hour={"CO2": 60.0, "Nitrogen": 120.0},
+        overhead=overhead,
+        profit_margin=profit_margin,
+        pounds_per_square_foot={"Mild Steel": {"16 Gauge": 2.5}},
+    )
+
+
+def test_ceiling_rounds_up_to_the_next_cent():
+    assert list(ceiling(np.array([1.1, 1.101, 9.125, 0.0]))) == [1.1, 1.11, 9.13, 0.0]
+
+
+def test_the_circular_formulas_are_solved_like_excel():
+    # COGS is 2 lb at $1.00 and 6 minutes at $1.00 a minute, so 8.00. The unit price J then goes
+    # 0 -> CEILING(8/0.8) = 10.00 -> CEILING(CEILING(8+1.00)/0.8) = 11.25 -> CEILING(9.13/0.8) = 11.42
+    # -> CEILING(9.15/0.8) = 11.44 -> CEILING(CEILING(8+1.144)/0.8) = 11.44, where it stays.
+    quote_pricing = QuotePricing([make_part(3, 6.0, 2.0)], "CO2", make_price_list())
+
+    cogs, overhead, unit_price, price, total_cost = quote_pricing.get_row(0)
+
+    assert cogs == pytest.approx(8.0)
+    assert unit_price == pytest.approx(11.44)  # J
+    assert overhead == pytest.approx(1.144)  # I = J * 10%
+    assert total_cost == pytest.approx(9.15)  # O = CEILING(H + I)
+    assert price == pytest.approx(34.32)  # K = CEILING(G * J)
+    assert unit_price == pytest.approx(math.ceil(round(total_cost / 0.8 * 100, 9)) / 100)
+
+
+def test_the_totals():
+    parts = [make_part(3, 6.0, 2.0), make_part(2, 1.0, 0.5)]
+
+    quote_pricing = QuotePricing(parts, "CO2", make_price_list())
+
+    assert quote_pricing.total_parts == 2
+    assert quote_pricing.total_quantity == 5
+    assert quote_pricing.total_machining_time == pytest.approx(3 * 6.0 + 2 * 1.0)
+    assert quote_pricing.total_weight == pytest.approx(3 * 2.0 + 2 * 0.5)
+    assert quote_pricing.total_price == pytest.approx(quote_pricing.price.sum())
+
+
+def test_a_material_without_a_price_is_not_a_number():
+    quote_pricing = QuotePricing([make_part(1, 6.0, 2.0, material="Unobtainium")], "CO2", make_price_list())
+
+    assert all(math.isnan(value) for value in quote_pricing.get_row(0))
+
+
+def test_formulas_that_never_settle_stop_after_max_iterations(monkeypatch):
+    # With an overhead of 90% of the unit price and a 50% margin, every round almost doubles the unit
+    # price, it never converges.
+    iterations = []
+    original_ceiling = pricing.ceiling
+
+    def counting_ceiling(values):
+        iterations.append(None)
+        return original_ceiling(values)
+
+    monkeypatch.setattr(pricing, "ceiling", counting_ceiling)
+
+    quote_pricing = QuotePricing([make_part(1, 6.0, 2.0)], "CO2", make_price_list(overhead=0.9, profit_margin=0.5))
+
+    # Two CEILINGs every round, then the total cost and the price once more.
+    assert len(iterations) == 2 * pricing.MAX_ITERATIONS + 2
+    assert quote_pricing.unit_price[0] > 8.0 * 1.8 ** (pricing.MAX_ITERATIONS - 1)
@@ -0,0 +1,103 @@
+import json
+import socket
+import threading
+
+import pytest
+
+import upload_client
+from upload_client import SUCCESS_MESSAGE, UploadClient, UploadProtocolError, receive_frame, send_frame
+from upload_server import UploadHandler, UploadServer
+
+
+class AnswerLostHandler(UploadHandler):
+    """Keeps the first batch but closes the connection instead of answering, like an answer lost on the way."""
+
+    def handle(self) -> None:
+        if not self.server.answer_lost:
+            self.server.answer_lost = True
+            header = json.loads(receive_frame(self.request))
+            self.server.save_batch(header, receive_frame(self.request))
+            return
+        super().handle()
+
+
+@pytest.fixture
+def server():
+    upload_server = UploadServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=upload_server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield upload_server
+    upload_server.shutdown()
+    upload_server.server_close()
+    thread.join()
+
+
+def get_client(upload_server: UploadServer, **kwargs) -> UploadClient:
+    return UploadClient("127.0.0.1", upload_server.server_address[1], timeout=5.0, backoff=0.01, **kwargs)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_send(server, compress):
+    with get_client(server, compress=compress) as client:
+        assert client.send("laser_parts_list_upload", "C:\\work orders\\a.json", b'{"a": 1}') == SUCCESS_MESSAGE
+        assert client.send("laser_parts_list_upload", "b.json", b'{"b": 2}') == SUCCESS_MESSAGE
+
+    assert [(header["file_name"], payload) for header, payload in server.batches] == [
+        ("C:\\work orders\\a.json", b'{"a": 1}'),
+        ("b.json", b'{"b": 2}'),
+    ]
+
+
+def test_a_batch_sent_again_after_its_answer_was_lost_is_kept_once(server):
+    server.RequestHandlerClass = AnswerLostHandler
+    server.answer_lost = False
+
+    with get_client(server, retries=2) as client:
+        assert client.send("laser_parts_list_upload", "a.json", b"{}", batch_id="batch-1") == SUCCESS_MESSAGE
+        # Sent again later by the outbox, under the same batch ID.
+        assert client.send("laser_parts_list_upload", "a.json", b"{}", batch_id="batch-1") == SUCCESS_MESSAGE
+        assert client.send("laser_parts_list_upload", "b.json", b"{}", batch_id="batch-2") == SUCCESS_MESSAGE
+
+    assert server.answer_lost
+    assert [header["batch_id"] for header, _ in server.batches] == ["batch-1", "batch-2"]
+
+
+def test_a_payload_bigger_than_a_frame_is_not_sent(server, monkeypatch):
+    monkeypatch.setattr(upload_client, "MAX_FRAME_SIZE", 512)  # the header frame still fits
+
+    with get_client(server) as client:
+        with pytest.raises(UploadProtocolError):
+            client.send("laser_parts_list_upload", "a.json", b"x" * 513)
+        assert client.send("laser_parts_list_upload", "b.json", b"x" * 512) == SUCCESS_MESSAGE
+
+    assert [header["file_name"] for header, _ in server.batches] == ["b.json"]
+
+
+def test_the_server_refuses_a_frame_that_is_too_big(server, monkeypatch):
+    monkeypatch.setattr(upload_client, "MAX_FRAME_SIZE", 1024)
+
+    with socket.create_connection(server.server_address, timeout=5.0) as connection:
+        send_frame(connection, json.dumps({"command": "upload", "file_name": "a.json", "size": 2048}).encode())
+        connection.sendall(upload_client.FRAME_HEADER.pack(2048))
+        response = json.loads(receive_frame(connection))
+
+    assert response["ok"] is False
+    assert server.batches == []
+
+
+def test_an_answer_that_is_not_understood_is_not_retried(server):
+    class NotADictHandler(UploadHandler):
+        def handle(self) -> None:
+            receive_frame(self.request)
+            receive_frame(self.request)
+            self.server.tries += 1
+            send_frame(self.request, b"[1, 2, 3]")
+
+    server.RequestHandlerClass = NotADictHandler
+    server.tries = 0
+
+    with get_client(server, retries=3) as client:
+        with pytest.raises(UploadProtocolError):
+            client.send("laser_parts_list_upload", "a.json", b"{}")
+
+    assert server.tries == 1
@@ -0,0 +1,77 @@
+import io
+
+from PIL import Image
+
+PREVIEW_SIZE: tuple[int, int] = (64, 64)
+
+
+class ThumbnailStore:
+    """Keeps the part thumbnails of a quote in memory, indexed by the part's image_index.
+
+    Identical images, such as the same bracket nested on many sheets, are stored once and shared by
+    every image index that shows them. The encoded bytes go straight to XlsxWriter and the review
+    window gets a preview that is resized once, the first time it is asked for.
+    """
+
+    def __init__(self, preview_size: tuple[int, int] = PREVIEW_SIZE) -> None:
+        self.preview_size = preview_size
+        self._images: list[tuple[bytes, str]] = []
+        self._image_ids: list[int] = []
+        self._image_ids_by_digest: dict[str, int] = {}
+        self._previews: dict[int, Image.Image] = {}
+
+    def __len__(self) -> int:
+        return len(self._image_ids)
+
+    @property
+    def unique_count(self) -> int:
+        """How many different images are stored."""
+        return len(self._images)
+
+    def add(self, image_bytes: bytes, image_ext: str, digest: str | None = None) -> int:
+        """
+        Args:
+          image_bytes (bytes): The encoded thumbnail.
+          image_ext (str): Its file extension, such as "jpeg".
+          digest (str | None, optional): The digest of the original image, thumbnails with the same
+        digest are only stored once. Defaults to None.
+
+        Returns:
+          int: The image index of the thumbnail.
+        """
+        if digest is None or digest not in self._image_ids_by_digest:
+            self._images.append((image_bytes, image_ext))
+            image_id = len(self._images) - 1
+            if digest is not None:
+                self._image_ids_by_digest[digest] = image_id
+        else:
+            image_id = self._image_ids_by_digest[digest]
+        self._image_ids.append(image_id)
+        return len(self._image_ids) - 1
+
+    def get_file_name(self, index: int) -> str:
+        """
+        Returns:
+          str: A file name for the thumbnail, such as "3.jpeg", XlsxWriter uses it to name the image.
+        Image indexes that share an image share its file name.
+        """
+        image_id = self._image_ids[index]
+        return f"{image_id}.{self._images[image_id][1]}"
+
+    def get_image_data(self, index: int) -> io.BytesIO:
+        """
+        Returns:
+          io.BytesIO: A new buffer over the encoded thumbnail, for XlsxWriter's image_data option.
+        """
+        return io.BytesIO(self._images[self._image_ids[index]][0])
+
+    def get_preview(self, index: int) -> Image.Image:
+        """
+        Returns:
+          Image.Image: The thumbnail resized to `preview_size` for the review window.
+        """
+        image_id = self._image_ids[index]
+        if image_id not in self._previews:
+            image = Image.open(io.BytesIO(self._images[image_id][0]))
+            self._previews[image_id] = image.resize(self.preview_size, Image.Resampling.LANCZOS)
+        return self._previews[image_id]
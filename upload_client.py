@@ -0,0 +1,260 @@
+import functools
+import json
+import socket
+import struct
+import threading
+import time
+import uuid
+import zlib
+
+from config import get_config
+
+# Every frame is its length as a 4 byte big-endian integer followed by that many bytes. A batch is a
+# JSON header frame and a payload frame, the server answers with one JSON frame. The header carries the
+# batch ID, a batch that is sent again after its answer was lost is answered without being applied twice.
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE: int = 256 * 1024 * 1024
+SUCCESS_MESSAGE: str = "Batch sent successfully"
+
+
+class UploadError(OSError):
+    """Raised when a batch could not be sent after every retry, it can be tried again later."""
+
+
+class UploadProtocolError(Exception):
+    """Raised when a frame is too big or an answer is not understood, sending again would not help.
+
+    It is not an OSError on purpose, so whoever retries on connection errors does not retry this.
+    """
+
+
+def send_frame(connection: socket.socket, data: bytes) -> None:
+    connection.sendall(FRAME_HEADER.pack(len(data)) + data)
+
+
+def receive_exactly(connection: socket.socket, size: int) -> bytes:
+    """
+    Returns:
+      bytes: Exactly `size` bytes from the connection.
+
+    Raises:
+      ConnectionError: If the connection is closed first.
+    """
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("The connection was closed in the middle of a frame.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def receive_frame(connection: socket.socket) -> bytes:
+    """
+    Returns:
+      bytes: The next frame.
+
+    Raises:
+      ConnectionError: If the connection is closed before or in the middle of the frame.
+      UploadProtocolError: If the frame is bigger than `MAX_FRAME_SIZE`.
+    """
+    (size,) = FRAME_HEADER.unpack(receive_exactly(connection, FRAME_HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise UploadProtocolError(f"A frame of {size} bytes is bigger than the {MAX_FRAME_SIZE} byte limit.")
+    return receive_exactly(connection, size)
+
+
+class UploadClient:
+    """Sends batches to the inventory server over one connection that is kept open between batches.
+
+    A batch that fails because the connection dropped or timed out is sent again on a new connection,
+    waiting `backoff`, then twice as long, and so on between tries. Every try carries the same batch ID,
+    so the server applies a batch once even when only its answer was lost. Sends are serialized, so one
+    client can be shared by threads.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        compress: bool = False,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.compress = compress
+        self._connection: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "UploadClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def connect(self) -> socket.socket:
+        """
+        Returns:
+          socket.socket: The open connection, connecting first if there is none.
+        """
+        if self._connection is None:
+            self._connection = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            finally:
+                self._connection = None
+
+    def send(self, command: str, file_name: str, payload: bytes, batch_id: str | None = None) -> str:
+        """
+        It sends one batch and waits for the server's answer
+
+        Args:
+          command (str): What the server is to do with the batch, such as "laser_parts_list_upload".
+          file_name (str): The name of the batch's file.
+          payload (bytes): The content of the file.
+          batch_id (str | None, optional): What the server knows the batch by, pass the same one when the
+        same batch is sent again later. Defaults to a new one.
+
+        Raises:
+          UploadError: If it could not be sent after every retry.
+          UploadProtocolError: If the payload is bigger than `MAX_FRAME_SIZE`, or the server's answer is
+        not understood.
+
+        Returns:
+          str: What the server answered, "Batch sent successfully" when it worked.
+        """
+        header = {
+            "batch_id": batch_id or uuid.uuid4().hex,
+            "command": command,
+            "file_name": file_name,
+            "size": len(payload),
+            "compression": "zlib" if self.compress else None,
+        }
+        if self.compress:
+            payload = zlib.compress(payload)
+        header_bytes = json.dumps(header).encode("utf-8")
+        if len(payload) > MAX_FRAME_SIZE:
+            raise UploadProtocolError(
+                f"{file_name} is {len(payload)} bytes, bigger than the {MAX_FRAME_SIZE} byte frame limit."
+            )
+
+        with self._lock:
+            for attempt in range(self.retries + 1):
+                try:
+                    connection = self.connect()
+                    send_frame(connection, header_bytes)
+                    send_frame(connection, payload)
+                    response = json.loads(receive_frame(connection))
+                    return response["message"]
+                except UploadProtocolError:
+                    self.close()
+                    raise
+                except OSError as error:
+                    self.close()
+                    if attempt == self.retries:
+                        raise UploadError(
+                            f"Could not send {file_name} to {self.host}:{self.port} after {attempt + 1} "
+                            f"tries: {error}"
+                        ) from error
+                    time.sleep(self.backoff * 2**attempt)
+                except (ValueError, KeyError, TypeError) as error:
+                    self.close()
+                    raise UploadProtocolError(
+                        f"{self.host}:{self.port} sent back an answer that is not understood."
+                    ) from error
+
+    def send_file(self, command: str, file_path: str) -> str:
+        """
+        Args:
+          command (str): What the server is to do with the batch.
+          file_path (str): The file to send, its path is sent as its name.
+
+        Returns:
+          str: What the server answered.
+        """
+        with open(file_path, "rb") as f:
+            return self.send(command, file_path, f.read())
+
+
+def send_batch_legacy(command: str, file_name: str, payload: bytes, host: str, port: int) -> str:
+    """
+    It sends a command, a file name, and a file size to the server, then sends the file in chunks of
+    8192 bytes, the way inventory servers without framing expect it
+
+    Args:
+      command (str): str = "upload"
+      file_name (str): The path of the file that is sent.
+      payload (bytes): The content of the file.
+      host (str): The inventory server.
+      port (int): Its port.
+
+    Returns:
+      str: What the server answered, "Batch sent successfully" when it worked.
+    """
+    BUFFER_SIZE: int = 8192
+    SEPARATOR = "<SEPARATOR>"
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.settimeout(15)
+    s.connect((host, port))
+
+    s.send(f"{command}{SEPARATOR}{file_name}{SEPARATOR}{len(payload)}".encode())
+    time.sleep(1)  # ! IMPORTANT
+    for start in range(0, len(payload), BUFFER_SIZE):
+        s.sendall(payload[start : start + BUFFER_SIZE])
+    # file transmitting is done
+    time.sleep(1)  # ! IMPORTANT
+    s.sendall("FINSIHED!".encode("utf-8"))
+    response = s.recv(1024).decode("utf-8")
+    s.shutdown(2)
+    s.close()
+    return response
+
+
+@functools.cache
+def get_upload_client() -> UploadClient:
+    """
+    Returns:
+      UploadClient: The client for the inventory server in global_variables.cfg, shared by every upload.
+    """
+    config = get_config()
+    return UploadClient(
+        config.upload_host,
+        config.upload_port,
+        retries=config.upload_retries,
+        compress=config.upload_compress,
+    )
+
+
+def send_batch(command: str, file_name: str, payload: bytes, batch_id: str | None = None) -> str:
+    """
+    It sends a batch to the inventory server with the protocol set in global_variables.cfg
+
+    Args:
+      command (str): What the server is to do with the batch, such as "laser_parts_list_upload".
+      file_name (str): The path of the batch's JSON file, the server is told it as its name.
+      payload (bytes): The content of the file.
+      batch_id (str | None, optional): The batch's ID, so the framed protocol applies it once however
+    often it is sent. The legacy protocol has no room for it. Defaults to a new one.
+
+    Raises:
+      OSError: If it could not be sent, it can be tried again later.
+      UploadProtocolError: If it is too big or the answer is not understood, see `UploadClient.send`.
+
+    Returns:
+      str: What the server answered, "Batch sent successfully" when it worked.
+    """
+    config = get_config()
+    if config.upload_protocol == "legacy":
+        return send_batch_legacy(command, file_name, payload, config.upload_host, config.upload_port)
+    return get_upload_client().send(command, file_name, payload, batch_id)
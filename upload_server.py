@@ -0,0 +1,94 @@
+"""
+A stand-in for the inventory server that speaks the framed protocol of upload_client.py, for trying
+uploads without the real server. Every batch is saved to a directory under the name it was sent with,
+a batch whose ID was seen before is answered without being saved again.
+
+    python upload_server.py --port 8765 --directory received
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+import zlib
+
+from upload_client import SUCCESS_MESSAGE, UploadProtocolError, receive_frame, send_frame
+
+
+class UploadHandler(socketserver.BaseRequestHandler):
+    """Answers every batch sent over one connection, until the client closes it."""
+
+    def handle(self) -> None:
+        while True:
+            try:
+                header = json.loads(receive_frame(self.request))
+                payload = receive_frame(self.request)
+            except ConnectionError:
+                return  # the client closed the connection, between batches or in the middle of one
+            except UploadProtocolError as error:
+                # The frame is not read, so the connection can not be used for another batch.
+                send_frame(self.request, json.dumps({"ok": False, "message": str(error)}).encode("utf-8"))
+                return
+            if header.get("compression") == "zlib":
+                payload = zlib.decompress(payload)
+            if len(payload) != header["size"]:
+                response = {"ok": False, "message": f"Expected {header['size']} bytes, got {len(payload)}."}
+            else:
+                # A batch it already kept is answered the same, it was only sent again because the answer
+                # was lost.
+                self.server.save_batch(header, payload)
+                response = {"ok": True, "message": SUCCESS_MESSAGE}
+            send_frame(self.request, json.dumps(response).encode("utf-8"))
+
+
+class UploadServer(socketserver.ThreadingTCPServer):
+    """Keeps the batches it receives, in `batches` and in `directory` if one is given.
+
+    The IDs of the batches it kept are remembered while it runs, so a batch a client sends again because
+    the answer was lost is kept once.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], directory: str | None = None) -> None:
+        super().__init__(address, UploadHandler)
+        self.directory = directory
+        self.batches: list[tuple[dict, bytes]] = []
+        self.batch_ids: set[str] = set()
+        self._lock = threading.Lock()
+
+    def save_batch(self, header: dict, payload: bytes) -> bool:
+        """
+        Returns:
+          bool: False if a batch with the same ID was already kept, and this one was not.
+        """
+        with self._lock:
+            if (batch_id := header.get("batch_id")) is not None:
+                if batch_id in self.batch_ids:
+                    return False
+                self.batch_ids.add(batch_id)
+            self.batches.append((header, payload))
+            if self.directory is not None:
+                # The client sends the path of the file, only its name is kept.
+                file_name = os.path.basename(header["file_name"].replace("\\", "/"))
+                with open(os.path.join(self.directory, file_name), "wb") as f:
+                    f.write(payload)
+        return True
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--directory", default="received", help="where to save the batches")
+    args = arg_parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    with UploadServer((args.host, args.port), args.directory) as server:
+        print(f"Listening on {args.host}:{server.server_address[1]}, saving batches to {args.directory}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()